@@ -1,14 +1,17 @@
 from ast import expr
-import sympy as sp
-from sympy.calculus.util import continuous_domain
-from sympy.solvers import solveset
-from sympy import S, Union, FiniteSet, Interval, oo
-from Model import grafico
+from PyQt6.QtCore import QTimer
+from Model import traza
+from Controller.worker import AnalisisWorker
+
+# SymPy y el modelo se importan al usarse (o en el precalentamiento), no al
+# arrancar: así la ventana aparece sin esperar a SymPy ni a matplotlib
 
 
 def conversion_numeros(val):
+        import sympy as sp
         try:
-            val_eval = sp.N(val)
+            # float primero: int() de un Float enorme construiría el entero completo
+            val_eval = float(sp.N(val))
             if val_eval == int(val_eval):
                 return str(int(val_eval))
             else:
@@ -18,12 +21,36 @@ def conversion_numeros(val):
 
 
 class Controller:
+    PREVIEW_DELAY_MS = 300
+
     def __init__(self, view):
         self.view = view
-        self.model = grafico
+        self._worker = None
+        self._workers = set()  # hilos vivos (incluye los cancelados que aún no terminan)
+        self._ultima_traza = None
+
+        # Vista previa: un disparo tras la última tecla
+        self._preview_timer = QTimer()
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(self.PREVIEW_DELAY_MS)
+        self._preview_timer.timeout.connect(self._live_preview)
+        self._preview_entry = None  # expresión de la última vista previa/análisis
+        self._preview_worker = None  # vista previa que todavía no termina de parsear
         self._connect_signals()
         
 
+    @property
+    def model(self):
+        from Model import grafico
+        return grafico
+
+    def warm_up(self):
+        """Importa SymPy y el modelo en segundo plano mientras la ventana ya está visible."""
+        import threading
+        from Model.precarga import precalentar
+        self._warm_up_thread = threading.Thread(target=precalentar, name="precalentamiento", daemon=True)
+        self._warm_up_thread.start()
+
     def _connect_signals(self):
         self.view.analyze_button.clicked.connect(self.run_analysis)
 
@@ -66,6 +93,8 @@ class Controller:
         self.view.clear_button.clicked.connect(self.view.function_input.clear)
         self.view.del_button.clicked.connect(self.view.function_input.backspace)
         self.view.steptostep_button.clicked.connect(self.show_step_by_step)
+        self.view.diagnostic_button.clicked.connect(self.show_diagnostics)
+        self.view.function_input.textChanged.connect(self._schedule_preview)
 
 
     def _insert_text_at_cursor(self, text):
@@ -77,6 +106,8 @@ class Controller:
 
     def _format_domain(self, domain):
             """Convierte el objeto de dominio de sympy en un string legible."""
+            import sympy as sp
+            from sympy import S, Union, FiniteSet, Interval, oo
 
             def format_endpoint(p):
                 if p == oo: return "∞"
@@ -91,9 +122,9 @@ class Controller:
                 points_str = ", ".join([format_endpoint(p) for p in points])
                 return f"Todos los reales excepto x = {points_str}"
 
-            if isinstance(domain, Union):
+            if isinstance(domain, (Union, Interval)):
                 parts = []
-                for interval in domain.args:
+                for interval in (domain.args if isinstance(domain, Union) else [domain]):
                     if isinstance(interval, Interval):
                         start = format_endpoint(interval.start)
                         end = format_endpoint(interval.end)
@@ -103,7 +134,45 @@ class Controller:
                 return " U ".join(parts)
             return str(domain)
 
+    def _format_range(self, rango):
+            """Convierte el recorrido (conjunto de sympy) en un string legible."""
+            from sympy import S, Union, FiniteSet, Interval, oo
+
+            def format_endpoint(p):
+                if p == oo: return "∞"
+                if p == -oo: return "-∞"
+                return f"{float(p):.4g}"
+
+            def format_interval(interval):
+                left_bracket = "(" if interval.left_open else "["
+                right_bracket = ")" if interval.right_open else "]"
+                return f"{left_bracket}{format_endpoint(interval.start)}, {format_endpoint(interval.end)}{right_bracket}"
+
+            if rango == S.Reals or rango == Interval(-oo, oo):
+                return "Todos los reales ℝ"
+            if rango.is_empty:
+                return "Vacío"
+
+            partes = rango.args if isinstance(rango, Union) else (rango,)
+            # ℝ menos puntos aislados: (-∞, a) U (a, b) U ... U (c, ∞)
+            if all(isinstance(p, Interval) and p.left_open and p.right_open for p in partes) \
+                    and partes[0].start == -oo and partes[-1].end == oo \
+                    and all(a.end == b.start for a, b in zip(partes, partes[1:])):
+                puntos = ", ".join(format_endpoint(p.end) for p in partes[:-1])
+                return f"Todos los reales excepto y = {puntos}"
+
+            textos = []
+            for parte in partes:
+                if isinstance(parte, Interval):
+                    textos.append(format_interval(parte))
+                elif isinstance(parte, FiniteSet):
+                    textos.append("{" + ", ".join(format_endpoint(p) for p in parte) + "}")
+                else:
+                    textos.append(str(parte))
+            return " U ".join(textos)
+
     def generar_pasos(self, expr, valor_x):
+        import sympy as sp
         pasos = []
         x = sp.symbols('x')
 
@@ -116,8 +185,12 @@ class Controller:
         pasos.append(f"Sustituimos x = {conversion_numeros(valor_x)}: {expr_sust_str}")
 
         # Paso 3: Calcular paso a paso usando sympy para simplificar
-        expr_calc = sp.sympify(expr_sust_str)
-        if expr_calc != sp.sympify(expr_str):
+        # Se sustituye sin evaluar y se acota antes de calcular: (2)**10000000000
+        # no debe construir el entero completo
+        with sp.evaluate(False):
+            sustituida = expr.subs(x, sp.sympify(conversion_numeros(valor_x)))
+        expr_calc = self.model.costo.acotar(sustituida).doit()
+        if expr_calc != expr:
             pasos.append(f"Calculamos: {conversion_numeros(expr_calc)}")
 
         # Paso 4: Resultado final
@@ -136,7 +209,7 @@ class Controller:
 
         try:
             expr = self.model.analizar_funcion(function_text)
-            valor_x = float(sp.sympify(x_text).evalf())
+            valor_x = self.model.valor_numerico(x_text)
         except Exception:
             self.view.error_label.setText("⚠️ Valor de x inválido.")
             return
@@ -157,73 +230,175 @@ class Controller:
             self.view.error_label.setText("⚠️ Error: La función no puede estar vacía.")
             return
 
-        try:
-            expr = self.model.analizar_funcion(function_text)
-            x = sp.symbols('x')
+        # Un análisis nuevo deja obsoleto al que esté en curso (y a la vista previa pendiente)
+        self._cancel_preview()
+        self._cancel_analysis()
+        self._worker = self._start_worker(function_text, x_value_text)
+        self._show_progress_bar()
+
+    def _start_worker(self, function_text, x_value_text):
+        # El parseo corre en el hilo: acotar el costo de la entrada puede tardar segundos
+        # Densidad de la muestra según el ancho actual del gráfico: se mide aquí
+        # y el hilo la convierte en paso (importar el modelo cargaría SymPy)
+        worker = AnalisisWorker(function_text, texto_x=x_value_text, columnas=self.view.plot_columns(),
+                                traza=traza.Traza(function_text))
+        worker.parseado.connect(lambda entrada, w=worker, t=function_text: self._on_parsed(w, entrada, t))
+        worker.progreso.connect(lambda p, etapa, w=worker: self._show_progress(w, p, etapa))
+        worker.terminado.connect(lambda r, w=worker, t=function_text, xt=x_value_text: self._show_analysis(w, r, t, xt))
+        worker.fallo.connect(lambda msg, w=worker: self._show_analysis_error(w, msg))
+        worker.finished.connect(lambda w=worker: self._workers.discard(w))
+        self._workers.add(worker)
+        worker.start()
+        return worker
+
+    def _show_progress_bar(self):
+        self.view.progress_bar.setValue(0)
+        self.view.progress_bar.setFormat("Analizando… %p%")
+        self.view.progress_bar.show()
+
+    def _schedule_preview(self, _text=None):
+        if self.view.live_preview_checkbox.isChecked():
+            self._preview_timer.start()  # reinicia la espera en cada tecla
+
+    def _live_preview(self):
+        # Sin importar SymPy en el hilo de la interfaz: se espera al precalentamiento
+        hilo = getattr(self, "_warm_up_thread", None)
+        if hilo is not None and hilo.is_alive():
+            self._preview_timer.start()
+            return
 
-            domain = continuous_domain(expr, x, sp.S.Reals)
-            domain_str = self._format_domain(domain)
-            self.view.domain_label.setText(f"<b>Dominio:</b> {domain_str}")
+        function_text = self.view.function_input.text()
+        if not function_text.strip():
+            return
+        # El análisis en curso sigue hasta saber si la expresión cambió (ver _on_parsed);
+        # mientras tanto un error de parseo (expresión incompleta) no se muestra
+        self._cancel_preview()
+        self._preview_worker = self._start_worker(function_text, self.view.x_value_input.text())
 
-            y_intercept_val = self.model.evaluar_punto(expr, 0)
-            y_intercept_str = f"(0, {y_intercept_val:.4g})" if y_intercept_val is not None else "No existe"
-            
-            x_intercepts = solveset(expr, x, domain=sp.S.Reals)
-            if x_intercepts.is_empty:
-                x_intercept_str = "No existe"
-            else:
-                intercept_points = [f"({float(val.evalf()):.4g}, 0)" for val in x_intercepts]
-                x_intercept_str = ", ".join(intercept_points)
+    def _on_parsed(self, worker, entrada, function_text):
+        if worker is not self._preview_worker:
+            return
+        self._preview_worker = None
+        # Mismo árbol de SymPy ("2x", "2*x", espacios...): no hay nada nuevo que analizar
+        if self._preview_entry is not None and entrada.expr == self._preview_entry.expr:
+            worker.cancelar()
+            return
+        self._preview_entry = entrada
+        self._cancel_analysis()
+        self._worker = worker
+        self.view.error_label.setText("")
 
-            self.view.intercepts_label.setText(f"<b>Intersección Eje Y:</b> {y_intercept_str}<br><b>Intersección Eje X:</b> {x_intercept_str}")
+        # Primero el gráfico grueso (milisegundos), después el análisis completo
+        ok, _ = self.model.grafico_preliminar(entrada, self.view.ax, titulo=f"f(x) = {function_text}")
+        if ok:
+            self.view.canvas.draw_idle()
+        self._show_progress_bar()
 
-            numer, denom = expr.as_numer_denom()
-            range_str = "Todos los reales ℝ"
-
-            try:
-                if x in numer.free_symbols or x in denom.free_symbols:
-                    deg_numer = sp.degree(numer, gen=x)
-                    deg_denom = sp.degree(denom, gen=x)
-
-                    if deg_numer == deg_denom:
-                        lead_numer = numer.coeff(x**deg_numer)
-                        lead_denom = denom.coeff(x**deg_denom)
-                        asymptote = lead_numer / lead_denom
-                        if asymptote != 0:
-                            range_str = f"Todos los reales excepto y = {asymptote}"
-                    elif deg_numer < deg_denom:
-                        range_str = "Todos los reales excepto y = 0"
-            except Exception:
-                range_str = "No se pudo determinar automáticamente."
+    def _plot_mode(self):
+        return "intervalos" if self.view.interval_mode_checkbox.isChecked() else "muestreo"
 
-            self.view.range_label.setText(f"<b>Recorrido:</b> {range_str}")
+    def show_diagnostics(self):
+        if self._ultima_traza is None:
+            return
+        from View.diagnostico import DiagnosticoDialog
+        dialog = DiagnosticoDialog(self._ultima_traza, parent=self.view)
+        dialog.exec()
 
-            x_eval = None
-            if x_value_text:
-                try:
-                    x_eval_expr = sp.sympify(x_value_text)
-                    x_eval_float = float(x_eval_expr.evalf())
+    def shutdown(self):
+        """Cancela y espera los análisis en curso antes de cerrar la aplicación."""
+        self._cancel_analysis()
+        for worker in list(self._workers):
+            worker.cancelar()
+            worker.wait()
+
+    def _cancel_analysis(self):
+        if self._worker is not None:
+            self._worker.cancelar()
+            self._worker = None
+        self.view.progress_bar.hide()
+
+    def _cancel_preview(self):
+        if self._preview_worker is not None:
+            self._preview_worker.cancelar()
+            self._preview_worker = None
+
+    def _show_progress(self, worker, porcentaje, etapa):
+        if worker is not self._worker:
+            return
+        self.view.progress_bar.setValue(porcentaje)
+        self.view.progress_bar.setFormat(f"{etapa.capitalize()}… %p%")
 
-                    y_eval = self.model.evaluar_punto(expr, x_eval_float)
+    def _show_analysis_error(self, worker, mensaje):
+        if worker is not self._worker:
+            return
+        self._worker = None
+        self.view.progress_bar.hide()
+        self.view.error_label.setText(f"⚠️ Error de sintaxis: {mensaje}")
+        self.view.ax.clear()
+        self.view.ax.grid(True, alpha=0.3)
+        self.view.canvas.draw()
+
+    def _show_analysis(self, worker, resultado, function_text, x_value_text):
+        if worker is not self._worker:
+            return
+        self._worker = None
+        self.view.progress_bar.hide()
+        self._preview_entry = resultado["entrada"]
 
-                    if y_eval is not None:
-                        self.view.evaluation_label.setText(f"<b>ƒ({x_value_text})</b> = {y_eval:.4g} &nbsp; → &nbsp; <b>Punto:</b> ({x_eval_float:.4g}, {y_eval:.4g})")
-                    else:
-                        self.view.evaluation_label.setText(f"<b>ƒ({x_value_text})</b> no está definido en el dominio.")
+        try:
+            aprox = " <i>(aprox.)</i>"
+            aproximados = resultado["aproximados"]
 
-                    x_eval = x_eval_float 
+            domain_str = self._format_domain(resultado["dominio"])
+            if "dominio" in aproximados:
+                domain_str += aprox
+            self.view.domain_label.setText(f"<b>Dominio:</b> {domain_str}")
 
-                except (ValueError, sp.SympifyError):
-                    self.view.evaluation_label.setText("Valor de x inválido.")
-                    x_eval = None
+            y_intercept_val = resultado["y_intercepto"]
+            y_intercept_str = f"(0, {y_intercept_val:.4g})" if y_intercept_val is not None else "No existe"
+
+            x_intercepts = resultado["x_interceptos"]
+            if not x_intercepts:
+                x_intercept_str = "No existe"
             else:
+                x_intercept_str = ", ".join(f"({val:.4g}, 0)" for val in x_intercepts)
+            # Siempre numéricos (numerico.raices dentro de la ventana)
+            x_intercept_str += aprox
+
+            self.view.intercepts_label.setText(f"<b>Intersección Eje Y:</b> {y_intercept_str}<br><b>Intersección Eje X:</b> {x_intercept_str}")
+            range_str = resultado["recorrido"]
+            if not isinstance(range_str, str):
+                range_str = self._format_range(range_str)
+                if "recorrido" in aproximados:
+                    range_str += aprox
+            self.view.range_label.setText(f"<b>Recorrido:</b> {range_str}")
+
+            x_eval = resultado["valor_x"]
+            if not x_value_text:
                 self.view.evaluation_label.setText("<b>Evaluación:</b> Ingrese un valor para x.")
-            
-            ok, mensaje = self.model.grafico_funcion(function_text, valor_x=x_eval, ax=self.view.ax)
-            if not ok:
-                self.view.error_label.setText(f"⚠️ Error al graficar: {mensaje}")
-            
-            self.view.canvas.draw()
+            elif x_eval is None:
+                self.view.evaluation_label.setText("Valor de x inválido.")
+            elif resultado["y_eval"] is not None:
+                y_eval = resultado["y_eval"]
+                self.view.evaluation_label.setText(f"<b>ƒ({x_value_text})</b> = {y_eval:.4g} &nbsp; → &nbsp; <b>Punto:</b> ({x_eval:.4g}, {y_eval:.4g})")
+            else:
+                self.view.evaluation_label.setText(f"<b>ƒ({x_value_text})</b> no está definido en el dominio.")
+
+            with traza.activa(worker.traza):
+                with traza.tramo("grafico_funcion"):
+                    ok, mensaje = self.model.grafico_funcion(resultado["entrada"], valor_x=x_eval, ax=self.view.ax,
+                                                             titulo=f"f(x) = {function_text}",
+                                                             ventana=resultado["ventana"],
+                                                             muestra=resultado["muestra"],
+                                                             asintotas=resultado["asintotas"],
+                                                             modo=self._plot_mode())
+                if not ok:
+                    self.view.error_label.setText(f"⚠️ Error al graficar: {mensaje}")
+
+                with traza.tramo("dibujo"):
+                    self.view.canvas.draw()
+            self._ultima_traza = worker.traza
+            self.view.diagnostic_button.setEnabled(True)
 
         except Exception as e:
             self.view.error_label.setText(f"⚠️ Error de sintaxis: {e}")
@@ -0,0 +1,59 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+from Model import traza
+
+
+class AnalisisWorker(QThread):
+    """
+    Ejecuta Model.analisis.analizar fuera del hilo de la interfaz. El parseo
+    (de la función y del valor de x) también corre aquí: acotar su costo
+    puede tardar hasta el presupuesto de Model.presupuesto.
+    """
+
+    progreso = pyqtSignal(int, str)
+    parseado = pyqtSignal(object)
+    terminado = pyqtSignal(object)
+    fallo = pyqtSignal(str)
+
+    def __init__(self, texto_funcion, texto_x="", columnas=None, traza=None, parent=None):
+        super().__init__(parent)
+        self.texto_funcion = texto_funcion
+        self.texto_x = texto_x
+        self.columnas = columnas  # medidas por el controlador: los ejes solo se leen en el hilo de la interfaz
+        self.traza = traza
+        self._cancelado = False
+
+    def cancelar(self):
+        # SymPy no se puede interrumpir a mitad de una llamada: se descarta
+        # el trabajo en la siguiente frontera entre etapas
+        self._cancelado = True
+
+    def esta_cancelado(self):
+        return self._cancelado
+
+    def _valor_x(self, grafico):
+        if not self.texto_x:
+            return None
+        from sympy import SympifyError
+        try:
+            return grafico.valor_numerico(self.texto_x)
+        except (ValueError, TypeError, SympifyError):
+            return None
+
+    def run(self):
+        # SymPy se carga aquí si el precalentamiento no terminó
+        from Model import analisis, grafico
+        paso = None if self.columnas is None else grafico.paso_pantalla((-10, 10), columnas=self.columnas)
+        try:
+            with traza.activa(self.traza), traza.tramo("analisis"):
+                resultado = analisis.analizar(self.texto_funcion, valor_x=self._valor_x(grafico), paso=paso,
+                                              progreso=self.progreso.emit,
+                                              cancelado=self.esta_cancelado,
+                                              parseado=self.parseado.emit)
+        except analisis.AnalisisCancelado:
+            return
+        except Exception as e:
+            if not self._cancelado:
+                self.fallo.emit(str(e))
+            return
+        if not self._cancelado:
+            self.terminado.emit(resultado)
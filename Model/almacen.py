@@ -0,0 +1,166 @@
+"""
+Caché persistente de análisis en disco (SQLite), compartida entre sesiones
+y procesos.
+
+Cada fila guarda el resultado de analizar una expresión en una ventana:
+simplificada, dominio, interceptos, recorrido, asíntotas, aproximados y
+(opcionalmente) la muestra. La clave es la huella estructural de la forma
+canónica (Model.canonico) más la ventana y el paso. Las filas de otra
+versión de SymPy (o de otro formato) se descartan al abrir el archivo, y el
+tamaño total se limita desalojando las filas usadas hace más tiempo. Los
+análisis en que alguna operación agotó su presupuesto no se guardan.
+
+Cualquier error de disco se ignora: sin caché el análisis se calcula igual.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import sympy
+
+from Model import canonico
+
+FORMATO = 5
+VERSION = f"sympy-{sympy.__version__}/{FORMATO}"
+MAX_MB = 64
+
+
+def _ruta_por_defecto():
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "eid_algebra_funciones" / "analisis.sqlite"
+
+
+_config = {"ruta": _ruta_por_defecto(), "max_mb": MAX_MB, "activo": True}
+_preparadas = set()  # rutas ya migradas en este proceso
+_candado = threading.Lock()
+
+
+def configurar(ruta=None, max_mb=None, activo=None):
+    """Cambia el archivo, el tope en MB o desactiva la caché."""
+    if ruta is not None:
+        _config["ruta"] = Path(ruta)
+    if max_mb is not None:
+        _config["max_mb"] = max_mb
+    if activo is not None:
+        _config["activo"] = activo
+
+
+def clave(expr):
+    """Huella estructural de la forma canónica de la expresión."""
+    return canonico.huella(canonico.canonizar(expr))
+
+
+def _ventana(ventana, paso):
+    return f"{float(ventana[0])!r},{float(ventana[1])!r},{float(paso)!r}"
+
+
+def _conectar():
+    ruta = _config["ruta"]
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    conexion = sqlite3.connect(ruta, timeout=5)
+    with _candado:
+        if ruta not in _preparadas:
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("""CREATE TABLE IF NOT EXISTS analisis (
+                                    clave TEXT, ventana TEXT, version TEXT,
+                                    datos BLOB, bytes INTEGER, usado REAL,
+                                    PRIMARY KEY (clave, ventana))""")
+            conexion.execute("DELETE FROM analisis WHERE version != ?", (VERSION,))
+            conexion.commit()
+            _preparadas.add(ruta)
+    return conexion
+
+
+def buscar(expr, ventana, paso):
+    """Retorna: dict guardado o None si no está (o la caché está desactivada)."""
+    if not _config["activo"]:
+        return None
+    try:
+        conexion = _conectar()
+        try:
+            k, v = clave(expr), _ventana(ventana, paso)
+            fila = conexion.execute("SELECT datos FROM analisis WHERE clave = ? AND ventana = ?",
+                                    (k, v)).fetchone()
+            if fila is None:
+                return None
+            try:
+                datos = pickle.loads(fila[0])
+            except Exception:
+                # Fila ilegible (p. ej. escrita por otra versión de NumPy): se descarta
+                conexion.execute("DELETE FROM analisis WHERE clave = ? AND ventana = ?", (k, v))
+                conexion.commit()
+                return None
+            conexion.execute("UPDATE analisis SET usado = ? WHERE clave = ? AND ventana = ?",
+                             (time.time(), k, v))
+            conexion.commit()
+            return datos
+        finally:
+            conexion.close()
+    except (sqlite3.Error, OSError):
+        return None
+
+
+def guardar(expr, ventana, paso, datos):
+    """Guarda (o reemplaza) el resultado y recorta la caché al tope configurado."""
+    if not _config["activo"]:
+        return
+    try:
+        blob = pickle.dumps(datos, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return
+    try:
+        conexion = _conectar()
+        try:
+            conexion.execute("INSERT OR REPLACE INTO analisis VALUES (?, ?, ?, ?, ?, ?)",
+                             (clave(expr), _ventana(ventana, paso), VERSION, blob, len(blob), time.time()))
+            _recortar(conexion)
+            conexion.commit()
+        finally:
+            conexion.close()
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def _recortar(conexion):
+    """Desaloja las filas usadas hace más tiempo hasta quedar bajo el 90 % del tope."""
+    tope = _config["max_mb"] * 1024 * 1024
+    total = conexion.execute("SELECT COALESCE(SUM(bytes), 0) FROM analisis").fetchone()[0]
+    if total <= tope:
+        return
+    sobrante = total - 0.9 * tope
+    desalojar = []
+    for rowid, tamano in conexion.execute("SELECT rowid, bytes FROM analisis ORDER BY usado"):
+        if sobrante <= 0:
+            break
+        desalojar.append((rowid,))
+        sobrante -= tamano
+    conexion.executemany("DELETE FROM analisis WHERE rowid = ?", desalojar)
+
+
+def limpiar():
+    try:
+        conexion = _conectar()
+        try:
+            conexion.execute("DELETE FROM analisis")
+            conexion.commit()
+        finally:
+            conexion.close()
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def estadisticas() -> dict:
+    try:
+        conexion = _conectar()
+        try:
+            filas, total = conexion.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM analisis").fetchone()
+        finally:
+            conexion.close()
+    except (sqlite3.Error, OSError):
+        filas, total = 0, 0
+    return {"ruta": str(_config["ruta"]), "filas": filas, "bytes": total,
+            "max_mb": _config["max_mb"], "version": VERSION, "activo": _config["activo"]}
@@ -0,0 +1,154 @@
+import sympy as sp
+from Model import almacen, grafico, presupuesto, traza
+
+x = grafico.x
+
+
+class AnalisisCancelado(Exception):
+    """Se lanza entre etapas cuando el análisis fue cancelado."""
+
+
+# ------------------ etapas del análisis (en orden, con % de avance) ------------------
+ETAPAS = [
+    ("parseo", 5),
+    ("dominio", 25),
+    ("interceptos", 45),
+    ("recorrido", 60),
+    ("evaluacion", 70),
+    ("muestreo", 95),
+]
+
+
+def _recorrido_heuristico(expr):
+    """
+    Recorrido por comparación de grados (solo tiene sentido para funciones
+    racionales). Respaldo si falla el recorrido numérico.
+    """
+    numer, denom = expr.as_numer_denom()
+    range_str = "Todos los reales ℝ"
+
+    try:
+        if x in numer.free_symbols or x in denom.free_symbols:
+            deg_numer = sp.degree(numer, gen=x)
+            deg_denom = sp.degree(denom, gen=x)
+
+            if deg_numer == deg_denom:
+                lead_numer = numer.coeff(x**deg_numer)
+                lead_denom = denom.coeff(x**deg_denom)
+                asymptote = lead_numer / lead_denom
+                if asymptote != 0:
+                    range_str = f"Todos los reales excepto y = {asymptote}"
+            elif deg_numer < deg_denom:
+                range_str = "Todos los reales excepto y = 0"
+    except Exception:
+        range_str = "No se pudo determinar automáticamente."
+    return range_str
+
+
+# ------------------ análisis completo (sin dependencias de Qt) ------------------
+def analizar(texto_funcion, valor_x=None, ventana=(-10, 10), paso=None,
+             progreso=None, cancelado=None, parseado=None):
+    """
+    Ejecuta todas las etapas del análisis de una función. El paso de la
+    muestra por omisión es el de un lienzo típico (grafico.paso_pantalla);
+    la interfaz pasa el de sus ejes.
+    progreso(porcentaje, etapa) se llama al terminar cada etapa y
+    parseado(entrada) apenas se tiene la expresión compilada; si
+    cancelado() retorna True se interrumpe con AnalisisCancelado.
+    Retorna: dict con entrada, dominio, y_intercepto, x_interceptos,
+             recorrido, y_eval, muestra (xs, ys), asintotas y aproximados
+    """
+    resultado = {"valor_x": valor_x, "ventana": ventana}
+    if paso is None:
+        paso = grafico.paso_pantalla(ventana)
+    try:
+        with presupuesto.cancelable(cancelado):
+            _etapas(resultado, texto_funcion, valor_x, ventana, paso, progreso, cancelado, parseado)
+    except presupuesto.OperacionCancelada:
+        raise AnalisisCancelado()
+    return resultado
+
+
+def _etapas(resultado, texto_funcion, valor_x, ventana, paso, progreso, cancelado, parseado):
+    avance = dict(ETAPAS)
+
+    def etapa(nombre):
+        if cancelado is not None and cancelado():
+            raise AnalisisCancelado(nombre)
+        if progreso is not None:
+            progreso(avance[nombre], nombre)
+
+    with traza.tramo("parseo"):
+        entrada = grafico.obtener_compilada(texto_funcion)
+    resultado["entrada"] = entrada
+    if parseado is not None:
+        parseado(entrada)
+    etapa("parseo")
+
+    # Análisis repetido (en esta u otra sesión): se restaura desde el disco
+    with traza.tramo("almacen"):
+        guardado = almacen.buscar(entrada.expr, ventana, paso)
+        traza.anotar(acierto=guardado is not None)
+    if guardado is not None:
+        _restaurar(resultado, entrada, guardado, valor_x, etapa)
+        return
+
+    with traza.tramo("dominio"):
+        resultado["dominio"] = entrada.dominio
+    etapa("dominio")
+
+    with traza.tramo("interceptos"):
+        resultado["y_intercepto"] = grafico.evaluar_punto(entrada, 0)
+        # Raíces numéricas dentro de la ventana graficada (solveset no lista conjuntos infinitos)
+        resultado["x_interceptos"] = entrada.raices_en(ventana).tolist()
+    etapa("interceptos")
+
+    with traza.tramo("recorrido"):
+        try:
+            resultado["recorrido"] = entrada.recorrido
+        except Exception:
+            resultado["recorrido"] = _recorrido_heuristico(entrada.expr)
+    etapa("recorrido")
+
+    with traza.tramo("evaluacion"):
+        resultado["y_eval"] = grafico.evaluar_punto(entrada, valor_x) if valor_x is not None else None
+    etapa("evaluacion")
+
+    a, b = ventana
+    with traza.tramo("asintotas"):
+        resultado["asintotas"] = grafico.obtener_asintotas_verticales(entrada, ventana=(a, b))
+    with traza.tramo("muestreo"):
+        resultado["muestra"] = grafico.muestrear_funcion(entrada, a, b, paso)
+        traza.anotar(muestras=len(resultado["muestra"][0]))
+    # etapas resueltas con aproximación numérica por agotar su presupuesto
+    resultado["aproximados"] = sorted(entrada.aproximados)
+    with traza.tramo("almacen.guardar"):
+        # Con un presupuesto agotado la aproximación depende de la carga de la
+        # máquina: en otra sesión la etapa exacta puede alcanzar, no se guarda
+        if entrada.agotados:
+            traza.anotar(omitido=sorted(entrada.agotados))
+        else:
+            almacen.guardar(entrada.expr, ventana, paso, {
+                "simplificada": entrada.simplificada,
+                **{campo: resultado[campo] for campo in _GUARDADOS},
+            })
+    etapa("muestreo")
+
+
+_GUARDADOS = ("dominio", "y_intercepto", "x_interceptos", "recorrido", "asintotas",
+              "muestra", "aproximados")
+
+
+def _restaurar(resultado, entrada, guardado, valor_x, etapa):
+    """Completa el resultado con lo guardado; solo la evaluación en valor_x se calcula."""
+    # Se siembran las propiedades cacheadas para que el gráfico no las recalcule
+    entrada.__dict__.setdefault("simplificada", guardado["simplificada"])
+    entrada.__dict__.setdefault("dominio", guardado["dominio"])
+    if not isinstance(guardado["recorrido"], str):
+        entrada.__dict__.setdefault("recorrido", guardado["recorrido"])
+    entrada.aproximados.update(guardado["aproximados"])
+    for campo in _GUARDADOS:
+        resultado[campo] = guardado[campo]
+    resultado["y_eval"] = grafico.evaluar_punto(entrada, valor_x) if valor_x is not None else None
+    for nombre, _ in ETAPAS[1:]:
+        etapa(nombre)
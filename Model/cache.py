@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+
+
+# ------------------ caché LRU acotada con contadores ------------------
+class CacheLRU:
+    """
+    Caché LRU de capacidad fija. Lleva la cuenta de aciertos, fallos y
+    desalojos para poder inspeccionar su efectividad. Con max_bytes y
+    tamano(valor) -> bytes también desaloja cuando la memoria total supera
+    el límite.
+    """
+
+    def __init__(self, capacidad: int = 128, max_bytes: int = None, tamano=None):
+        if capacidad <= 0:
+            raise ValueError("La capacidad debe ser positiva.")
+        if max_bytes is not None and tamano is None:
+            raise ValueError("max_bytes requiere una función tamano(valor).")
+        self.capacidad = capacidad
+        self.max_bytes = max_bytes
+        self._tamano = tamano
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, clave, crear):
+        """Devuelve el valor asociado a la clave; si no existe lo construye con crear()."""
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+
+        # Se construye fuera del lock: crear() puede ser costoso
+        valor = crear()
+
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                return self._datos[clave]
+            self._datos[clave] = valor
+            if self._tamano is not None:
+                self.bytes += self._tamano(valor)
+            self._desalojar()
+        return valor
+
+    def buscar(self, clave, defecto=None):
+        """Devuelve el valor si ya está en la caché (sin construirlo ni contar un fallo)."""
+        with self._lock:
+            if clave not in self._datos:
+                return defecto
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return self._datos[clave]
+
+    def limitar_memoria(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._desalojar()
+
+    def _desalojar(self):
+        # Siempre queda al menos la entrada más reciente
+        while len(self._datos) > 1 and (
+                len(self._datos) > self.capacidad
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            _, valor = self._datos.popitem(last=False)
+            if self._tamano is not None:
+                self.bytes -= self._tamano(valor)
+            self.desalojos += 1
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self.bytes = 0
+            self.aciertos = self.fallos = self.desalojos = 0
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {"tamano": len(self._datos), "capacidad": self.capacidad,
+                    "bytes": self.bytes, "max_bytes": self.max_bytes,
+                    "aciertos": self.aciertos, "fallos": self.fallos,
+                    "desalojos": self.desalojos}
+
+    def __len__(self):
+        return len(self._datos)
+
+    def __contains__(self, clave):
+        return clave in self._datos
@@ -0,0 +1,190 @@
+"""
+Forma canónica de expresiones parseadas (con evaluate=False) y tabla de
+nodos con hash-consing.
+
+La forma canónica solo aplica reescrituras que no cambian el dominio:
+    - aplana sumas y productos anidados y ordena sus argumentos;
+    - pliega las constantes numéricas (2*3*x -> 6*x, x/2 -> x/2 con 1/2 exacto);
+    - junta términos semejantes (x + x -> 2*x); si el coeficiente da 0 el
+      término se conserva tal cual (log(x) - log(x) sigue exigiendo x > 0);
+    - junta potencias enteras de la misma base con el mismo signo
+      (x*x -> x**2, pero x/x no se cancela).
+Cada nodo canónico es único en la tabla (mismo subárbol -> mismo objeto) y
+lleva una huella estructural (SHA-256 de la función y las huellas de sus
+hijos) estable entre procesos.
+"""
+import hashlib
+
+import sympy as sp
+from sympy.core.sorting import default_sort_key
+from sympy.core.sympify import SympifyError
+
+from Model.cache import CacheLRU
+
+# Potencias numéricas que no se pliegan (9**9**9 tendría cientos de millones de dígitos)
+_MAX_DIGITOS_PLEGADO = 1000
+
+_NODOS = CacheLRU(capacidad=8192)  # (func, args) -> (nodo, huella)
+
+
+def _registrar(nodo):
+    """Retorna el representante único de nodo y su huella."""
+    if nodo.args:
+        clave = (nodo.func, nodo.args)
+    else:
+        clave = (nodo.func, sp.srepr(nodo))
+
+    def crear():
+        if nodo.args:
+            partes = [nodo.func.__name__] + [huella(arg) for arg in nodo.args]
+        else:
+            partes = [sp.srepr(nodo)]
+        return nodo, hashlib.sha256("|".join(partes).encode()).hexdigest()
+    return _NODOS.obtener(clave, crear)
+
+
+def huella(expr):
+    """Hash estructural de una expresión canónica."""
+    return _registrar(expr)[1]
+
+
+def _reconstruir(expr, args):
+    if tuple(args) == expr.args:
+        return expr
+    try:
+        return expr.func(*args, evaluate=False)
+    except TypeError:
+        return expr.func(*args)
+
+
+def _coeficiente(termino):
+    """Separa coeficiente numérico y resto de un término canónico."""
+    if termino.is_Number:
+        return termino, sp.Integer(1)
+    if termino.is_Mul and termino.args[0].is_Number:
+        resto = termino.args[1:]
+        return termino.args[0], resto[0] if len(resto) == 1 else sp.Mul(*resto, evaluate=False)
+    return sp.Integer(1), termino
+
+
+def _potencia_entera(factor):
+    """Separa base y exponente entero de un factor canónico."""
+    if factor.is_Pow and factor.args[1].is_Integer:
+        return factor.args[0], int(factor.args[1])
+    return factor, 1
+
+
+def _aplanar(args, tipo):
+    for arg in args:
+        if isinstance(arg, tipo):
+            yield from _aplanar(arg.args, tipo)
+        else:
+            yield arg
+
+
+def _ordenar(args):
+    return sorted(args, key=default_sort_key)
+
+
+def _suma(args):
+    numero = sp.Integer(0)
+    coeficientes = {}
+    for arg in _aplanar(args, sp.Add):
+        if arg.is_Number:
+            numero += arg
+            continue
+        c, resto = _coeficiente(arg)
+        coeficientes.setdefault(resto, []).append((c, arg))
+    terminos = []
+    for resto, partes in coeficientes.items():
+        total = sum((c for c, _ in partes), sp.Integer(0))
+        if len(partes) == 1:
+            terminos.append(partes[0][1])
+        elif total == 0:
+            terminos.extend(arg for _, arg in partes)  # se conserva el dominio
+        else:
+            terminos.append(_producto([total, resto]))
+    if numero != 0 or not terminos:
+        terminos.append(numero)
+    if len(terminos) == 1:
+        return terminos[0]
+    return sp.Add(*_ordenar(terminos), evaluate=False)
+
+
+def _producto(args):
+    numero = sp.Integer(1)
+    exponentes = {}
+    for arg in _aplanar(args, sp.Mul):
+        if arg.is_Number:
+            numero *= arg
+            continue
+        base, n = _potencia_entera(arg)
+        exponentes.setdefault(base, []).append((n, arg))
+    factores = []
+    for base, partes in exponentes.items():
+        signos = {n > 0 for n, _ in partes}
+        if len(partes) == 1 or len(signos) > 1:
+            factores.extend(arg for _, arg in partes)
+        else:
+            n = sum(n for n, _ in partes)
+            factores.append(base if n == 1 else sp.Pow(base, sp.Integer(n), evaluate=False))
+    if numero != 1 or not factores:
+        factores.append(numero)
+    if len(factores) == 1:
+        return factores[0]
+    return sp.Mul(*_ordenar(factores), evaluate=False)
+
+
+def _plegable(base, exponente):
+    """¿Cabe el resultado numérico de base**exponente en un tamaño razonable?"""
+    try:
+        magnitud = abs(float(exponente)) * max(abs(float(sp.log(abs(base), 10))), 1.0)
+    except (TypeError, ValueError, OverflowError):
+        return False
+    return magnitud <= _MAX_DIGITOS_PLEGADO
+
+
+def _exigir_expresion(expr):
+    # Entradas fuera de la gramática ("foo(" -> f*o**2*()) dejan tuplas o
+    # relaciones donde se espera un término: error de sintaxis, no un Mul roto
+    if not isinstance(expr, sp.Expr):
+        raise SympifyError(f"Se esperaba una expresión y se encontró {expr!r}.")
+
+
+def _canonizar(expr):
+    if not expr.args:
+        return _registrar(expr)[0]
+    if expr.is_Add or expr.is_Mul or expr.is_Pow:
+        for arg in expr.args:
+            _exigir_expresion(arg)
+    args = [_canonizar(arg) for arg in expr.args]
+    if expr.is_Add:
+        nuevo = _suma(args)
+    elif expr.is_Mul:
+        nuevo = _producto(args)
+    elif expr.is_Pow:
+        base, exponente = args
+        if exponente == 1:
+            nuevo = base
+        elif base.is_Number and exponente.is_Number and _plegable(base, exponente):
+            nuevo = sp.Pow(base, exponente)  # evaluado: 2**-1 -> 1/2
+        else:
+            nuevo = _reconstruir(expr, args)
+    else:
+        nuevo = _reconstruir(expr, args)
+    return _registrar(nuevo)[0]
+
+
+def canonizar(expr):
+    """
+    Forma canónica de expr: expresiones equivalentes por escritura (2x, x*2,
+    2*x) dan el mismo objeto, con la misma huella.
+    Lanza: SympifyError si expr o un operando aritmético no es una expresión
+    """
+    expr = sp.sympify(expr)
+    _exigir_expresion(expr)
+    return _canonizar(expr)
+
+
+def estadisticas() -> dict:
+    return _NODOS.estadisticas()
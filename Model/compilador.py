@@ -0,0 +1,205 @@
+"""
+Compilación de expresiones a un kernel NumPy fusionado.
+
+1. Eliminación de subexpresiones comunes (sympy.cse + memo por subárbol):
+   cada subtérmino distinto se calcula una sola vez.
+2. El árbol reducido se aplana en una lista de operaciones ufunc de NumPy.
+3. Los temporales se asignan a búferes preasignados, reutilizando un búfer
+   en cuanto su valor deja de usarse (asignación lineal por vida útil).
+4. Se genera el código de una sola función Python y se compila con exec.
+
+El costo de evaluar escala con la cantidad de subtérminos únicos y no con el
+tamaño del árbol. Nodos sin regla lanzan NoSoportado (el llamador usa lambdify).
+"""
+import threading
+
+import numpy as np
+import sympy as sp
+
+
+class NoSoportado(Exception):
+    """La expresión contiene nodos sin traducción a ufuncs de NumPy."""
+
+
+# ------------------ nodos soportados ------------------
+_UFUNCS = {
+    sp.sin: "sin", sp.cos: "cos", sp.tan: "tan",
+    sp.asin: "arcsin", sp.acos: "arccos", sp.atan: "arctan",
+    sp.sinh: "sinh", sp.cosh: "cosh", sp.tanh: "tanh",
+    sp.asinh: "arcsinh", sp.acosh: "arccosh", sp.atanh: "arctanh",
+    sp.exp: "exp", sp.log: "log", sp.Abs: "absolute", sp.sign: "sign",
+    sp.floor: "floor", sp.ceiling: "ceil",
+}
+# Recíprocas: f(u) = 1 / g(u)
+_RECIPROCAS = {sp.sec: "cos", sp.csc: "sin", sp.cot: "tan"}
+
+_MEDIO = sp.Rational(1, 2)
+_MAX_EXPONENTE_ENTERO = 64  # potencias enteras mayores van a np.power
+_MAX_FORMAS = 4  # juegos de búferes guardados por hilo (uno por forma de entrada)
+
+
+class _Programa:
+    """Lista de operaciones en forma SSA: cada valor se escribe una sola vez."""
+
+    def __init__(self, variable):
+        self.variable = variable
+        self.dependientes = {variable}  # x y los símbolos de cse que dependen de x
+        self.operaciones = []  # (ufunc, operandos, destino)
+        self.memo = {}
+        self.valores = 0
+
+    def _emitir(self, ufunc, *operandos):
+        destino = ("v", self.valores)
+        self.valores += 1
+        self.operaciones.append((ufunc, operandos, destino))
+        return destino
+
+    def constante(self, expr):
+        try:
+            valor = complex(expr.evalf())
+        except TypeError:  # zoo, nan
+            raise NoSoportado(f"Constante no finita: {expr}")
+        if valor.imag != 0:
+            raise NoSoportado(f"Constante no real: {expr}")
+        return ("c", valor.real)
+
+    def generar(self, expr):
+        """Retorna el operando que contiene el valor de expr (memo = CSE estructural)."""
+        if expr in self.memo:
+            return self.memo[expr]
+        if expr == self.variable:
+            operando = ("x",)
+        elif not expr.free_symbols & self.dependientes:
+            operando = self.constante(expr)
+        elif expr.is_Add or expr.is_Mul:
+            ufunc = "add" if expr.is_Add else "multiply"
+            # Las constantes primero: se pliegan en una sola operación escalar
+            args = sorted(expr.args, key=lambda a: bool(a.free_symbols & self.dependientes))
+            operando = self.generar(args[0])
+            for arg in args[1:]:
+                operando = self._emitir(ufunc, operando, self.generar(arg))
+        elif expr.is_Pow:
+            operando = self._potencia(*expr.args)
+        elif expr.func in _UFUNCS and len(expr.args) == 1:
+            operando = self._emitir(_UFUNCS[expr.func], self.generar(expr.args[0]))
+        elif expr.func in _RECIPROCAS and len(expr.args) == 1:
+            interno = self._emitir(_RECIPROCAS[expr.func], self.generar(expr.args[0]))
+            operando = self._emitir("divide", ("c", 1.0), interno)
+        else:
+            raise NoSoportado(f"Sin traducción NumPy para {expr.func.__name__}")
+        self.memo[expr] = operando
+        return operando
+
+    def _potencia(self, base, exponente):
+        if exponente.is_Integer and 0 < abs(exponente) <= _MAX_EXPONENTE_ENTERO:
+            n = int(exponente)
+            if n < 0:
+                return self._emitir("divide", ("c", 1.0), self.generar(sp.Pow(base, -n)))
+            if n == 1:
+                return self.generar(base)
+            # Cuadrados sucesivos: las potencias intermedias quedan en el memo
+            mitad = self.generar(sp.Pow(base, n // 2))
+            cuadrado = self._emitir("square", mitad)
+            return cuadrado if n % 2 == 0 else self._emitir("multiply", cuadrado, self.generar(base))
+        b = self.generar(base)
+        if exponente == _MEDIO:
+            return self._emitir("sqrt", b)
+        if exponente == -_MEDIO:
+            return self._emitir("divide", ("c", 1.0), self._emitir("sqrt", b))
+        return self._emitir("power", b, self.generar(exponente))
+
+
+def _asignar_bufers(operaciones, resultado):
+    """
+    Asigna un búfer a cada valor: al terminar la última lectura de un valor
+    su búfer vuelve a quedar libre (las ufuncs admiten out = entrada).
+    Retorna: ({valor: búfer}, cantidad de búferes)
+    """
+    ultima = {}
+    for i, (_, operandos, _) in enumerate(operaciones):
+        for op in operandos:
+            if op[0] == "v":
+                ultima[op] = i
+    bufer, libres, total = {}, [], 0
+    for i, (_, operandos, destino) in enumerate(operaciones):
+        for op in set(operandos):
+            if op[0] == "v" and ultima[op] == i and op != resultado:
+                libres.append(bufer[op])
+        if libres:
+            bufer[destino] = libres.pop()
+        else:
+            bufer[destino] = total
+            total += 1
+    return bufer, total
+
+
+def _codigo(operaciones, resultado, bufer):
+    def nombre(op):
+        if op[0] == "x":
+            return "x"
+        if op[0] == "c":
+            return repr(op[1])
+        return f"b{bufer[op]}"
+
+    lineas = ["def _kernel(x, b):"]
+    for i in sorted(set(bufer.values())):
+        lineas.append(f"    b{i} = b[{i}]")
+    for ufunc, operandos, destino in operaciones:
+        args = ", ".join(nombre(op) for op in operandos)
+        lineas.append(f"    np.{ufunc}({args}, out={nombre(destino)})")
+    lineas.append(f"    return {nombre(resultado)}.copy()")
+    return "\n".join(lineas)
+
+
+class KernelFusionado:
+    """kernel(xs) -> ndarray float. Los búferes son propios de cada hilo."""
+
+    def __init__(self, funcion, n_bufers, codigo):
+        self._funcion = funcion
+        self.n_bufers = n_bufers
+        self.codigo = codigo
+        self._local = threading.local()
+
+    def _bufers(self, forma):
+        juegos = getattr(self._local, "juegos", None)
+        if juegos is None:
+            juegos = self._local.juegos = {}
+        bufers = juegos.get(forma)
+        if bufers is None:
+            if len(juegos) >= _MAX_FORMAS:
+                juegos.clear()
+            bufers = juegos[forma] = [np.empty(forma) for _ in range(self.n_bufers)]
+        return bufers
+
+    def __call__(self, xs):
+        xs = np.asarray(xs, dtype=float)
+        return self._funcion(xs, self._bufers(xs.shape))
+
+
+def compilar(expr, variable):
+    """
+    Kernel fusionado de expr en la variable dada.
+    Retorna: KernelFusionado (o una función equivalente si la expresión es
+             constante o la propia variable)
+    Lanza: NoSoportado
+    """
+    reemplazos, (reducida,) = sp.cse(expr)
+    programa = _Programa(variable)
+    for simbolo, subexpr in reemplazos:
+        # Cada símbolo de cse queda en el memo apuntando al valor de su subexpresión
+        operando = programa.memo[simbolo] = programa.generar(subexpr)
+        if operando[0] != "c":
+            programa.dependientes.add(simbolo)
+    resultado = programa.generar(reducida)
+
+    if resultado[0] == "c":
+        valor = resultado[1]
+        return lambda xs: np.full(np.shape(xs), valor)
+    if resultado[0] == "x":
+        return lambda xs: np.array(xs, dtype=float)
+
+    bufer, total = _asignar_bufers(programa.operaciones, resultado)
+    codigo = _codigo(programa.operaciones, resultado, bufer)
+    espacio = {"np": np, "inf": np.inf}  # repr de constantes desbordadas
+    exec(compile(codigo, "<kernel fusionado>", "exec"), espacio)
+    return KernelFusionado(espacio["_kernel"], total, codigo)
@@ -0,0 +1,204 @@
+"""
+Estimación estática del costo de una expresión parseada, antes de
+canonizarla o evaluarla.
+
+Entradas como 9^9^9 o 2^(10^10) obligan a SymPy a construir enteros de
+cientos de millones de dígitos: un núcleo al 100 % y la memoria agotada.
+Recorriendo el árbol una vez se acota, sin calcularlo, el tamaño de cada
+subexpresión constante (en dígitos, |log10| del valor) y el grado de las
+potencias que SymPy expandiría:
+
+    - constantes de hasta _MAX_DIGITOS dígitos: se dejan exactas;
+    - constantes mayores pero acotables: se reemplazan por su valor en punto
+      flotante de precisión fija (mpmath no construye el entero);
+    - constantes sin cota finita (9^9^9^9): la expresión se rechaza;
+    - constantes con funciones que la estimación no conoce (factorial,
+      fibonacci...): se evalúan en un proceso hijo con presupuesto
+      (Model.presupuesto) y, si lo agotan, la expresión se rechaza;
+    - productos y potencias de sumas que al expandirse darían más de
+      _MAX_TERMINOS términos, o grado mayor que _MAX_DIGITOS: la expresión
+      queda marcada y el análisis no intenta simplify ni la sustitución
+      exacta (usa la aproximación numérica directamente);
+    - funciones desconocidas de x: la sustitución exacta en un punto se
+      hace en el proceso hijo.
+"""
+import math
+
+import sympy as sp
+
+from Model import presupuesto
+
+_MAX_DIGITOS = 1000     # como el plegado de Model.canonico
+_MAX_TERMINOS = 200     # simplify y solveset de (x^2 + x + 1)^200 ya agotan 8 s
+_LOG10_2 = math.log10(2)
+
+# Funciones cuyo costo de evaluación depende solo del tamaño del argumento
+_ACOTADAS = (
+    sp.sin, sp.cos, sp.tan, sp.sec, sp.csc, sp.cot,
+    sp.asin, sp.acos, sp.atan, sp.sinh, sp.cosh, sp.tanh,
+    sp.asinh, sp.acosh, sp.atanh, sp.log, sp.Abs, sp.sign,
+    sp.floor, sp.ceiling, sp.re, sp.im,
+)
+
+
+class CostoExcesivo(ValueError):
+    """La expresión no se puede evaluar con un costo acotado."""
+
+
+def _log10_seguro(valor):
+    """log10 de un número grande sin pasarlo a float."""
+    try:
+        return math.log10(valor)
+    except (OverflowError, ValueError):
+        return valor.bit_length() * _LOG10_2 if valor else 0.0
+
+
+def _digitos_numero(numero):
+    """|log10| aproximado de un número de SymPy."""
+    if numero.is_Integer:
+        return _log10_seguro(abs(int(numero)))
+    if numero.is_Rational:
+        return max(_log10_seguro(abs(numero.p)), _log10_seguro(numero.q))
+    if numero.is_Float:
+        if numero == 0:
+            return 0.0
+        return abs(float(sp.log(abs(numero), 10)))
+    return 1.0  # pi, E, I, oo...
+
+
+def _digitos(expr):
+    """
+    Cota de |log10| del valor de una expresión constante, sin calcularla.
+    Retorna: float (inf si no se puede acotar en float) o None si contiene
+             funciones que la estimación no conoce
+    """
+    if expr.is_Number or not expr.args:
+        return _digitos_numero(expr)
+    partes = [_digitos(arg) for arg in expr.args]
+    if None in partes:
+        return None
+    if expr.is_Add:
+        return max(partes) + math.log10(len(partes))
+    if expr.is_Mul:
+        return sum(partes)
+    if expr.is_Pow:
+        base, exponente = partes
+        return _potencia(base, exponente)
+    if isinstance(expr, sp.exp):
+        # exp(u) = e**u
+        return _potencia(math.log10(math.e), partes[0])
+    if isinstance(expr, _ACOTADAS):
+        # sin(10^(10^5)) exige reducir el argumento con 10^5 dígitos de precisión
+        return partes[0] if partes[0] <= _MAX_DIGITOS else None
+    return None
+
+
+def _potencia(digitos_base, digitos_exponente):
+    # |exponente| <= 10**digitos_exponente
+    if digitos_base == 0:  # (±1)**n
+        return 0.0
+    if digitos_exponente > 300:
+        return math.inf
+    return digitos_base * 10 ** digitos_exponente
+
+
+def _expansion(expr, variable):
+    """
+    Cota de lo que produciría expandir expr en la variable (las funciones de
+    x cuentan como un símbolo más).
+    Retorna: (cantidad de términos, grado)
+    """
+    if expr == variable:
+        return 1, 1
+    if not expr.args:
+        return 1, 0
+    partes = [_expansion(arg, variable) for arg in expr.args]
+    terminos = [t for t, _ in partes]
+    grados = [g for _, g in partes]
+    if expr.is_Add:
+        return sum(terminos), max(grados)
+    if expr.is_Mul:
+        grado = sum(grados)
+        # Un polinomio en una variable tiene a lo más grado + 1 términos
+        return min(math.prod(terminos), grado + 1), grado
+    if expr.is_Pow:
+        base, exponente = expr.args
+        if grados[1]:
+            return 1, 1  # exponente con x: no hay expansión
+        if exponente.is_Number:
+            n = abs(float(exponente))
+        else:
+            digitos = _digitos(exponente)
+            n = math.inf if digitos is None or digitos > 300 else 10 ** digitos
+        grado = grados[0] * n
+        if terminos[0] == 1:
+            return 1, grado  # potencia de un monomio: x^(10^10) sigue siendo un término
+        if n * math.log10(terminos[0]) > 300:
+            return grado + 1, grado
+        return min(terminos[0] ** n, grado + 1), grado
+    return 1, min(max(grados), 1)
+
+
+def _desconocidas(expr):
+    """¿Hay funciones fuera de _ACOTADAS (y de exp) aplicadas a x?"""
+    return any(not isinstance(f, (*_ACOTADAS, sp.exp)) for f in expr.atoms(sp.Function))
+
+
+def _evaluar(expr):
+    return expr.evalf()
+
+
+def _degradar(expr):
+    """Constante grande -> Float de precisión fija (o proceso hijo si no se conoce su costo)."""
+    digitos = _digitos(expr)
+    if digitos is None:
+        try:
+            return presupuesto.ejecutar(_evaluar, expr)
+        except presupuesto.PresupuestoAgotado:
+            raise CostoExcesivo(f"No se pudo evaluar {expr} con un costo acotado.")
+    if not math.isfinite(digitos):
+        raise CostoExcesivo("La expresión genera números demasiado grandes.")
+    if digitos <= _MAX_DIGITOS:
+        return expr
+    return expr.evalf()
+
+
+def _acotar(expr):
+    """Retorna: (expresión acotada, ¿depende de algún símbolo?)"""
+    if not expr.args:
+        return expr, bool(expr.free_symbols)
+    pares = [_acotar(arg) for arg in expr.args]
+    if not any(simbolica for _, simbolica in pares):
+        return expr, False
+    if not (expr.is_Add or expr.is_Mul or expr.is_Pow or expr.is_Function) and not expr.free_symbols:
+        return expr, False  # Sum, Integral... con variables ligadas
+    args = [nuevo if simbolica else _degradar(nuevo) for nuevo, simbolica in pares]
+    if all(nuevo is viejo for nuevo, viejo in zip(args, expr.args)):
+        return expr, True
+    try:
+        return expr.func(*args, evaluate=False), True
+    except TypeError:
+        return expr.func(*args), True
+
+
+def acotar(expr):
+    """
+    Reemplaza las constantes demasiado grandes por su valor aproximado.
+    Retorna: expresión equivalente y segura de canonizar y evaluar
+    Lanza: CostoExcesivo
+    """
+    nuevo, simbolica = _acotar(sp.sympify(expr))
+    return nuevo if simbolica else _degradar(nuevo)
+
+
+def estimar(expr, variable) -> dict:
+    """
+    Retorna: dict con terminos y grado (cotas de la expansión), solo_numerico
+             (simplify o la sustitución exacta no terminarían en
+             presupuesto) y sin_cota (hay funciones de x cuyo costo no se conoce)
+    """
+    terminos, grado = _expansion(expr, variable)
+    # Grado enorme: evaluar exacto en x = 2 ya construye 2^grado
+    solo_numerico = terminos > _MAX_TERMINOS or grado > _MAX_DIGITOS
+    return {"terminos": terminos, "grado": grado, "solo_numerico": solo_numerico,
+            "sin_cota": _desconocidas(expr)}
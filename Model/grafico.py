@@ -1,14 +1,20 @@
 import math
 import re
-import matplotlib.pyplot as plt
-from sympy import symbols, sin, cos, tan, log, sqrt, pi, E, solveset, S, sympify, limit, oo
+import warnings
+from functools import cached_property
+import numpy as np
+from sympy import symbols, Float, nsimplify, sin, cos, tan, sec, csc, cot, log, sqrt, pi, E, S, sympify, limit, oo, lambdify, diff
 from sympy.core.sympify import SympifyError
+from sympy.utilities.exceptions import SymPyDeprecationWarning
+from sympy.calculus.util import continuous_domain
 from sympy.parsing.sympy_parser import (
     parse_expr,
     standard_transformations,
     implicit_multiplication_application,
     convert_xor,
 )
+from Model.cache import CacheLRU
+from Model import canonico, compilador, costo, intervalos, numerico, presupuesto, sintaxis, traza
 
 # ------------------- configuración SymPy -------------------
 x = symbols("x")
@@ -17,11 +23,80 @@ TRANSFORMACIONES = tuple(standard_transformations) + (
     convert_xor,                          # ^ -> **
 )
 # ------------------ zoom mínimo ---------------------------------
-def _zoom_simple(ax):
+# espera (ms) tras el último zoom/arrastre antes de volver a muestrear
+_ESPERA_REMUESTREO_MS = 150
+
+
+def _zoom_simple(ax, remuestrear=None, evaluar=None):
+    """
+    Zoom con la rueda, arrastre con el botón izquierdo y doble clic para
+    volver a la vista inicial. Si se entrega remuestrear(a, b), se llama
+    (con retardo, una sola vez por ráfaga de eventos) con el rango x visible,
+    también cuando cambia el ancho de los ejes en píxeles físicos (ventana
+    redimensionada o pantalla con otro device pixel ratio).
+
+    Si el canvas admite blitting, el arrastre no vuelve a renderizar la
+    figura: desplaza la imagen de los ejes capturada al presionar y solo
+    redibuja todo al soltar. Con evaluar(xs) -> ys se muestra además un
+    marcador animado que sigue al cursor sobre la curva, pintado sobre el
+    fondo cacheado.
+    """
     fig = ax.figure
+    canvas = fig.canvas
+    # Desconectar la interacción de un gráfico anterior sobre los mismos ejes
+    previo = getattr(ax, "_zoom_estado", None)
+    if previo is not None:
+        for cid in previo["cids"]:
+            canvas.mpl_disconnect(cid)
+        if previo["timer"] is not None:
+            previo["timer"].stop()
+        for artista in previo["animados"]:
+            if artista.axes is not None:
+                artista.remove()
+
+    blit = getattr(canvas, "supports_blit", False)
     state = {"drag": False, "x0": None, "y0": None,
              "xlim0": ax.get_xlim(), "ylim0": ax.get_ylim(),
-             "xlim": None, "ylim": None}
+             "xlim": None, "ylim": None, "cids": [], "timer": None,
+             "px0": None, "imagen_ejes": None, "fondo": None, "animados": [],
+             "columnas": _columnas_ejes(ax)}
+    ax._zoom_estado = state
+
+    if remuestrear is not None:
+        timer = canvas.new_timer(interval=_ESPERA_REMUESTREO_MS)
+        timer.single_shot = True
+        timer.add_callback(lambda: remuestrear(*ax.get_xlim()))
+        state["timer"] = timer
+
+    marcador = etiqueta = None
+    if blit and evaluar is not None:
+        marcador, = ax.plot([], [], "o", color="orange", markersize=6, zorder=6, animated=True)
+        etiqueta = ax.annotate("", (0, 0), xytext=(8, 8), textcoords="offset points",
+                               fontsize=9, animated=True,
+                               bbox={"boxstyle": "round", "fc": "white", "alpha": 0.8})
+        marcador.set_visible(False)
+        etiqueta.set_visible(False)
+        state["animados"] = [marcador, etiqueta]
+
+    def programar_remuestreo():
+        if state["timer"] is not None:
+            state["timer"].stop()
+            state["timer"].start()
+
+    def pintar_animados():
+        # Restaura el fondo estático y pinta solo los artistas animados
+        if state["fondo"] is None:
+            return
+        canvas.restore_region(state["fondo"])
+        for artista in state["animados"]:
+            ax.draw_artist(artista)
+        canvas.blit(fig.bbox)
+
+    def on_draw(e):
+        # Tras cada render completo se cachea el fondo (sin artistas animados)
+        state["fondo"] = canvas.copy_from_bbox(fig.bbox)
+        for artista in state["animados"]:
+            ax.draw_artist(artista)
 
     def on_scroll(e):
         if e.inaxes == ax and e.xdata:
@@ -29,59 +104,400 @@ def _zoom_simple(ax):
             x0, x1 = ax.get_xlim(); y0, y1 = ax.get_ylim()
             ax.set_xlim(e.xdata - (e.xdata - x0)*f, e.xdata + (x1 - e.xdata)*f)
             ax.set_ylim(e.ydata - (e.ydata - y0)*f, e.ydata + (y1 - e.ydata)*f)
-            fig.canvas.draw_idle()
+            canvas.draw_idle()
+            programar_remuestreo()
 
     def on_press(e):
         if e.inaxes == ax and e.button == 1 and e.xdata:
-            state.update({"drag": True, "x0": e.xdata, "y0": e.ydata, "xlim": ax.get_xlim(), "ylim": ax.get_ylim()})
-    
+            state.update({"drag": True, "x0": e.xdata, "y0": e.ydata, "xlim": ax.get_xlim(), "ylim": ax.get_ylim(),
+                          "px0": (e.x, e.y), "imagen_ejes": None})
+            if blit and state["fondo"] is not None:
+                for artista in state["animados"]:
+                    artista.set_visible(False)
+                pintar_animados()
+                state["imagen_ejes"] = canvas.copy_from_bbox(ax.bbox)
+
+    def desplazar_imagen(dx, dy):
+        # Copia la imagen capturada desplazada (dx, dy) píxeles, recortada a los ejes.
+        # Las regiones de Agg usan coordenadas de buffer: y crece hacia abajo.
+        imagen = state["imagen_ejes"]
+        x1, y1, x2, y2 = imagen.get_extents()
+        dyb = -dy
+        sx1, sx2 = max(x1, x1 - dx), min(x2, x2 - dx)
+        sy1, sy2 = max(y1, y1 - dyb), min(y2, y2 - dyb)
+        ax.draw_artist(ax.patch)
+        if sx2 > sx1 and sy2 > sy1:
+            canvas.restore_region(imagen, bbox=(sx1, sy1, sx2, sy2), xy=(sx1 + dx, sy1 + dyb))
+        canvas.blit(ax.bbox)
+
     def on_move(e):
-        if not state["drag"] or e.inaxes != ax or e.xdata is None: return
+        if not state["drag"]:
+            if marcador is not None:
+                mostrar_marcador(e)
+            return
+        if state["imagen_ejes"] is not None:
+            # Arrastre por blitting: desplazamiento en píxeles, sin re-render
+            dx, dy = round(e.x - state["px0"][0]), round(e.y - state["px0"][1])
+            x0, x1 = state["xlim"]; y0, y1 = state["ylim"]
+            ancho, alto = ax.bbox.width, ax.bbox.height
+            ax.set_xlim(x0 - dx * (x1 - x0) / ancho, x1 - dx * (x1 - x0) / ancho)
+            ax.set_ylim(y0 - dy * (y1 - y0) / alto, y1 - dy * (y1 - y0) / alto)
+            desplazar_imagen(dx, dy)
+            return
+        if e.inaxes != ax or e.xdata is None: return
         dx, dy = e.xdata - state["x0"], e.ydata - state["y0"]
         x0, x1 = state["xlim"]; y0, y1 = state["ylim"]
         ax.set_xlim(x0 - dx, x1 - dx)
         ax.set_ylim(y0 - dy, y1 - dy)
-        fig.canvas.draw_idle()
+        canvas.draw_idle()
+
+    def mostrar_marcador(e):
+        visible = False
+        if e.inaxes == ax and e.xdata is not None:
+            y = float(evaluar(np.array([e.xdata]))[0])
+            if math.isfinite(y):
+                marcador.set_data([e.xdata], [y])
+                etiqueta.xy = (e.xdata, y)
+                etiqueta.set_text(f"({e.xdata:.4g}, {y:.4g})")
+                visible = True
+        if visible or marcador.get_visible():
+            marcador.set_visible(visible)
+            etiqueta.set_visible(visible)
+            pintar_animados()
 
-    def on_release(e): state["drag"] = False
+    def on_release(e):
+        if state["drag"]:
+            state["imagen_ejes"] = None
+            canvas.draw_idle()
+            programar_remuestreo()
+        state["drag"] = False
 
     def on_dbl(e):
         if e.inaxes == ax and e.dblclick:
             ax.set_xlim(*state["xlim0"])
             ax.set_ylim(*state["ylim0"])
-            fig.canvas.draw_idle()
+            canvas.draw_idle()
+            programar_remuestreo()
 
-    for event, func in [("scroll_event", on_scroll), ("button_press_event", on_press), ("motion_notify_event", on_move), ("button_release_event", on_release), ("button_press_event", on_dbl)]:
-        fig.canvas.mpl_connect(event, func)
+    def on_resize(e):
+        # Solo el ancho cambia la densidad de muestreo
+        columnas = _columnas_ejes(ax)
+        if columnas != state["columnas"]:
+            state["columnas"] = columnas
+            programar_remuestreo()
+
+    eventos = [("scroll_event", on_scroll), ("button_press_event", on_press), ("motion_notify_event", on_move), ("button_release_event", on_release), ("button_press_event", on_dbl), ("resize_event", on_resize)]
+    if blit:
+        eventos.append(("draw_event", on_draw))
+    for event, func in eventos:
+        state["cids"].append(canvas.mpl_connect(event, func))
 
 # ------------------ normalización de texto del usuario ------------------
+_SUPERINDICES = str.maketrans("⁰¹²³⁴⁵⁶⁷⁸⁹⁻", "0123456789-")
+
+
 def _normalizar_texto(s: str) -> str:
     s = s.strip().replace("×", "*").replace("÷", "/").replace("π", "pi").replace("√", "sqrt").replace(",", ".")
-    s = re.sub(r"sqrt\s*([A-Za-z0-9\(])", r"sqrt(\1", s)
+    # x² -> x^(2)
+    s = re.sub(r"[⁰¹²³⁴⁵⁶⁷⁸⁹⁻]+", lambda m: "^(" + m.group().translate(_SUPERINDICES) + ")", s)
+    # √x -> sqrt(x; "sqrt(" ya trae su paréntesis
+    s = re.sub(r"sqrt\s*([A-Za-z0-9])", r"sqrt(\1", s)
     return s + ")" * (s.count("(") - s.count(")")) if s.count("(") > s.count(")") else s
 
 
 # ------------------ convertidor en objeto matematico ---------------------
-def analizar_funcion(texto_funcion: str):
-    if not texto_funcion or not str(texto_funcion).strip():
-        raise SympifyError("Entrada vacía.")
-    texto_funcion = str(texto_funcion).strip()
-    if any(c in texto_funcion for c in [";", "{", "}", "[", "]"]):
-        raise SympifyError("Caracteres no permitidos en la expresión.")
-
+def _parsear_respaldo(texto: str):
+    """
+    parse_expr (o sympify) en el proceso hijo. Las llamadas se evalúan al
+    construir el árbol (200000! arma el entero completo), así que se acota
+    aquí mismo: al volver, el padre reconstruye el árbol evaluándolo.
+    """
+    presupuesto.configurar(en_subproceso=False)  # el hijo ya tiene presupuesto
     locales = {"x": x, "sin": sin, "cos": cos, "tan": tan,
                "log": log, "ln": log, "sqrt": sqrt, "pi": pi, "e": E, "E": E}
     try:
-        texto = _normalizar_texto(texto_funcion)
-        try:
-            return parse_expr(texto, transformations=TRANSFORMACIONES,
-                              local_dict=locales, evaluate=False)
-        except Exception:
-            return sympify(texto, locals=locales, evaluate=False)
+        with warnings.catch_warnings():
+            # SymPy solo avisa cuando un producto recibe algo que no es una
+            # expresión ("foo(" -> f*o**2*()); aquí es un error de sintaxis
+            warnings.simplefilter("error", SymPyDeprecationWarning)
+            try:
+                expr = parse_expr(texto, transformations=TRANSFORMACIONES,
+                                  local_dict=locales, evaluate=False)
+            except SymPyDeprecationWarning:
+                raise
+            except Exception:
+                expr = sympify(texto, locals=locales, evaluate=False)
     except SympifyError:
         raise
+    except SymPyDeprecationWarning:
+        raise SympifyError("Error de sintaxis: hay operandos que no son expresiones.")
     except Exception as e:
         raise SympifyError(f"Error de sintaxis: {e}")
+    return costo.acotar(expr)
+
+
+def _parsear(texto: str):
+    # Gramática de la calculadora: parser propio; el resto lo resuelve parse_expr
+    try:
+        return sintaxis.parsear(texto)
+    except sintaxis.FueraDeGramatica:
+        traza.contar("parseo.respaldo")
+    try:
+        return presupuesto.ejecutar(_parsear_respaldo, texto)
+    except presupuesto.PresupuestoAgotado:
+        raise costo.CostoExcesivo(f"No se pudo interpretar {texto} con un costo acotado.")
+
+
+def analizar_funcion(texto_funcion: str):
+    return obtener_compilada(texto_funcion).expr
+
+
+def valor_numerico(texto: str) -> float:
+    """
+    Valor de una constante escrita por el usuario (p. ej. el valor de x).
+    Retorna: float
+    Lanza: ValueError (incluye costo.CostoExcesivo) o SympifyError
+    """
+    expr = costo.acotar(_parsear(_normalizar_texto(str(texto).strip())))
+    if expr.free_symbols:
+        raise ValueError("Se esperaba un número.")
+    return float(expr.evalf())
+
+
+# ------------------ caché de expresiones compiladas ---------------------
+# Operaciones simbólicas a nivel de módulo para poder ejecutarlas en un
+# proceso hijo con presupuesto de tiempo/memoria (Model.presupuesto)
+def _simplificar(expr):
+    return expr.simplify()
+
+
+def _dominio_continuo(expr):
+    return continuous_domain(expr, x, S.Reals)
+
+
+def _limite(expr, punto):
+    return limit(expr, x, punto)
+
+
+def _sustituir_varios(expr, puntos):
+    """expr.subs en cada punto; None donde falla (polo de gamma en factorial(-1))."""
+    sustituidos = []
+    for punto in puntos:
+        try:
+            sustituidos.append(expr.subs(x, punto))
+        except Exception:
+            sustituidos.append(None)
+    return sustituidos
+
+
+def _toma_valores(expr, puntos, valores):
+    """
+    ¿expr vale exactamente cada valor en su punto? Se sustituye con 30
+    dígitos: 1e-563 no es 0 y 1 - 1e-16 no es 1. Los valores float se
+    leen como el número simple que representan (0.1 -> 1/10).
+    """
+    coincide = []
+    for punto, valor in zip(puntos, valores):
+        try:
+            resultado = expr.subs(x, Float(punto, 30)).evalf(30)
+            if valor == 0:
+                coincide.append(bool(resultado.is_zero))
+            else:
+                objetivo = nsimplify(valor)
+                coincide.append(bool(abs(resultado - objetivo).evalf(30) <= 1e-25 * abs(objetivo)))
+        except Exception:
+            coincide.append(False)
+    return coincide
+
+
+def _denominador(expr):
+    """
+    Denominador de la expresión, con tan/sec/csc/cot reescritas como
+    cocientes de sin y cos para que sus polos también aparezcan en él.
+    """
+    cocientes = expr.replace(tan, lambda u: sin(u) / cos(u)).replace(
+        sec, lambda u: 1 / cos(u)).replace(csc, lambda u: 1 / sin(u)).replace(
+        cot, lambda u: cos(u) / sin(u))
+    return cocientes.as_numer_denom()[1]
+
+
+class ExpresionCompilada:
+    """
+    Expresión parseada junto con sus derivados. Cada derivado se calcula
+    una sola vez, la primera vez que se pide. Las etapas simbólicas corren
+    con presupuesto; si se agota se usa una aproximación numérica y el
+    nombre de la etapa queda en `aproximados`. Las operaciones que agotaron
+    tiempo o memoria quedan además en `agotados`: su resultado depende de la
+    carga de la máquina.
+    """
+
+    def __init__(self, expr):
+        self.expr = expr
+        self.aproximados = set()
+        self.agotados = set()
+
+    def con_presupuesto(self, funcion, *args):
+        """presupuesto.ejecutar que anota la operación en `agotados` si se agota."""
+        try:
+            return presupuesto.ejecutar(funcion, *args)
+        except presupuesto.PresupuestoAgotado:
+            self.agotados.add(funcion.__name__.lstrip("_"))
+            raise
+
+    @cached_property
+    def estimacion(self):
+        """Costo estimado de las etapas exactas (Model.costo)."""
+        return costo.estimar(self.expr, x)
+
+    def _exacta(self, funcion):
+        # Con un grado de expansión enorme simplify agotaría el
+        # presupuesto igual: se pasa directo a la aproximación numérica
+        if self.estimacion["solo_numerico"]:
+            raise presupuesto.PresupuestoAgotado("Grado de expansión demasiado alto.")
+        return self.con_presupuesto(funcion, self.expr)
+
+    def evaluar(self, xs):
+        return evaluar_vector(self.kernel, xs)
+
+    def evaluar_derivada(self, xs):
+        return evaluar_vector(self.kernel_derivada, xs)
+
+    @cached_property
+    def simplificada(self):
+        try:
+            return self._exacta(_simplificar)
+        except Exception:
+            return self.expr
+
+    @cached_property
+    def kernel(self):
+        return _compilar(self.simplificada)
+
+    @cached_property
+    def kernel_crudo(self):
+        """Kernel de la expresión tal como se escribió (sin simplify): barato, para la vista previa."""
+        return _compilar(self.expr)
+
+    @cached_property
+    def kernel_derivada(self):
+        """Kernel de f' (para ubicar los puntos críticos del recorrido)."""
+        try:
+            return _compilar(diff(self.simplificada, x))
+        except Exception:
+            # Derivadas sin traducción a NumPy (p. ej. Abs -> re/im): diferencia central
+            kernel = self.kernel
+
+            def central(t):
+                h = 1e-6 * np.maximum(1.0, np.abs(t))
+                return (kernel(t + h) - kernel(t - h)) / (2 * h)
+            return central
+
+    @cached_property
+    def kernel_denominador(self):
+        """Kernel del denominador de la forma simplificada (ver _denominador)."""
+        return _compilar(_denominador(self.simplificada))
+
+    @cached_property
+    def kernel_denominador_crudo(self):
+        """Kernel del denominador tal como se escribió: conserva los huecos que simplify quita."""
+        return _compilar(_denominador(self.expr))
+
+    def evaluar_denominador(self, xs):
+        return evaluar_vector(self.kernel_denominador, xs)
+
+    def vale(self, xs, valores):
+        """
+        ¿f toma de verdad cada valor en su punto? Se evalúa la expresión
+        exacta, no el kernel: separa un valor de otro que se redondea a él.
+        Retorna: arreglo de bool (False si la evaluación agota su presupuesto)
+        """
+        try:
+            return np.array(self.con_presupuesto(_toma_valores, self.expr, [float(t) for t in xs],
+                                                 [float(v) for v in valores]), dtype=bool)
+        except presupuesto.PresupuestoAgotado:
+            return np.zeros(len(xs), dtype=bool)
+
+    def es_cero(self, xs):
+        return self.vale(xs, np.zeros(len(xs)))
+
+    def raices_en(self, ventana):
+        """Raíces de f dentro de la ventana (numéricas, con las mesetas nulas confirmadas)."""
+        return numerico.raices(self.evaluar, ventana, es_cero=self.es_cero)
+
+    def polos_en(self, ventana):
+        """Polos de f dentro de la ventana (detector numérico, sin solveset)."""
+        return numerico.polos(self.evaluar, self.evaluar_denominador, ventana)
+
+    def huecos_en(self, ventana):
+        """Singularidades evitables de f dentro de la ventana: (posiciones, límites)."""
+        return numerico.huecos(self.evaluar, lambda xs: evaluar_vector(self.kernel_denominador_crudo, xs),
+                               ventana)
+
+    @cached_property
+    def dominio(self):
+        try:
+            return self.con_presupuesto(_dominio_continuo, self.expr)
+        except Exception:
+            self.aproximados.add("dominio")
+            return numerico.dominio_aproximado(self.evaluar)
+
+    @cached_property
+    def recorrido(self):
+        """Recorrido numérico en todo R (puntos críticos, bordes, polos y límites en ±∞)."""
+        self.aproximados.add("recorrido")
+        return numerico.recorrido_aproximado(self.evaluar, self.evaluar_derivada,
+                                             huecos=self.huecos_en(numerico.VENTANA_APROXIMACION),
+                                             vale=self.vale)
+
+
+_CACHE_EXPRESIONES = CacheLRU(capacidad=128)
+
+
+# Dos niveles: texto normalizado -> forma canónica -> entrada compilada.
+# Escrituras distintas de la misma expresión (2x, x*2, 2*x) comparten entrada.
+_CACHE_TEXTOS = CacheLRU(capacidad=512)
+
+
+def _compilada_canonica(expr):
+    canonica = canonico.canonizar(expr)
+    return _CACHE_EXPRESIONES.obtener(canonica, lambda: ExpresionCompilada(canonica))
+
+
+def obtener_compilada(texto_o_expr) -> ExpresionCompilada:
+    """
+    Devuelve la entrada de caché para un texto o para una expresión SymPy
+    ya construida. La clave es la forma canónica de la expresión.
+    """
+    if isinstance(texto_o_expr, ExpresionCompilada):
+        return texto_o_expr
+    if hasattr(texto_o_expr, "free_symbols"):
+        return _compilada_canonica(costo.acotar(texto_o_expr))
+
+    if not texto_o_expr or not str(texto_o_expr).strip():
+        raise SympifyError("Entrada vacía.")
+    texto_funcion = str(texto_o_expr).strip()
+    if any(c in texto_funcion for c in [";", "{", "}", "[", "]"]):
+        raise SympifyError("Caracteres no permitidos en la expresión.")
+    clave = _normalizar_texto(texto_funcion)
+    # Las constantes enormes (9^9^9) se acotan antes de canonizar: el plegado
+    # de canonico y cualquier evalf posterior trabajan con tamaños acotados
+    canonica = _CACHE_TEXTOS.obtener(clave, lambda: canonico.canonizar(costo.acotar(_parsear(clave))))
+    return _compilada_canonica(canonica)
+
+
+def estadisticas_cache() -> dict:
+    return _CACHE_EXPRESIONES.estadisticas()
+
+
+def limpiar_cache():
+    _CACHE_TEXTOS.limpiar()
+    _CACHE_EXPRESIONES.limpiar()
+    _CACHE_TESELAS.limpiar()
+
+
+# ------------------ contadores de evaluación (benchmarks/diagnóstico) ------------------
+CONTADORES = traza.CONTADORES
+reiniciar_contadores = traza.reiniciar_contadores
 
 # ------------------ helpers evaluación ------------------
 def _to_real_float(val):
@@ -171,116 +587,650 @@ def evaluar_punto_con_pasos(expresion, valor_x: float):
 
 # ----------------- evalua expresion, devuelve float o none si no es valido en R ----------------
 def evaluar_punto(expresion, valor_x: float):
+    return evaluar_puntos(expresion, [valor_x])[0]
+
+
+def evaluar_puntos(expresion, valores_x):
+    """
+    evaluar_punto sobre varios valores de x. Las sustituciones de costo
+    desconocido (factorial, fibonacci...) se hacen todas en una sola
+    llamada con presupuesto.
+    Retorna: lista de float o None (no definido en R)
+    """
+    valores_x = [float(v) for v in valores_x]
+    traza.contar("evaluar_punto", len(valores_x))
+    try:
+        entrada = obtener_compilada(expresion)
+    except Exception:
+        return [None] * len(valores_x)
+
+    # Camino rápido: el kernel compilado (cada subtérmino repetido se evalúa una vez)
+    ys = np.full(len(valores_x), np.nan)
+    try:
+        with np.errstate(all="ignore"):
+            ys = _a_reales(entrada.kernel(np.array(valores_x)), (len(valores_x),))
+    except Exception:
+        pass
+    resultados = [float(y) if math.isfinite(y) else None for y in ys]
+    pendientes = [i for i, y in enumerate(resultados) if y is None]
+    if not pendientes:
+        return resultados
+
+    # Singularidades, valores complejos o nodos sin kernel: sustitución exacta
+    if entrada.estimacion["solo_numerico"]:
+        for i in pendientes:
+            resultados[i] = _limite_numerico(entrada, valores_x[i])
+        return resultados
+    try:
+        # Para funciones racionales se trabaja con la forma simplificada (cacheada)
+        expr_trabajo = entrada.simplificada
+        puntos = [valores_x[i] for i in pendientes]
+        traza.contar("subs", len(puntos))
+        if entrada.estimacion["sin_cota"]:
+            # Funciones de costo desconocido: todos los puntos en un proceso hijo
+            try:
+                sustituidos = entrada.con_presupuesto(_sustituir_varios, expr_trabajo, puntos)
+            except presupuesto.PresupuestoAgotado:
+                return resultados
+        else:
+            sustituidos = _sustituir_varios(expr_trabajo, puntos)
+    except Exception:
+        return resultados
+    for i, y in zip(pendientes, sustituidos):
+        resultados[i] = _valor_exacto(entrada, y, valores_x[i])
+    return resultados
+
+
+def _valor_exacto(entrada, y, valor_x):
+    """Convierte el resultado de una sustitución exacta en float o None."""
+    if y is None:
+        return None
     try:
-        # Para funciones racionales, intentar simplificar primero
-        expr_trabajo = expresion
-        try:
-            expr_trabajo = expresion.simplify()
-        except Exception:
-            pass
-        
-        # Sustituir el valor
-        y = expr_trabajo.subs(x, valor_x)
-        
         # Si el resultado aún contiene x, puede ser una indeterminación
         if y.has(x):
             try:
-                y = limit(expresion, x, valor_x)
+                y = entrada.con_presupuesto(_limite, entrada.expr, valor_x)
+            except presupuesto.PresupuestoAgotado:
+                return _limite_numerico(entrada, valor_x)
             except Exception:
                 return None
-        
+
         # Manejar casos especiales de SymPy
         if hasattr(y, 'is_finite') and y.is_finite is False:
             return None
         if hasattr(y, 'is_real') and y.is_real is None:
             return None
-        
+
         return _to_real_float(y)
-    except (ZeroDivisionError, ValueError):
-        return None
-    except Exception as e:
-        # Manejar específicamente el error de formato que mencionaste
-        error_str = str(e).lower()
-        if any(keyword in error_str for keyword in ["format", "zero._format", "sympify", "nan"]):
-            return None
+    except Exception:
         return None
-    
-    
+
+
+def _limite_numerico(entrada, valor_x: float):
+    """Límite bilateral aproximado: ambos lados deben coincidir."""
+    h = 1e-6 * max(1.0, abs(valor_x))
+    izq, der = evaluar_vector(entrada.kernel, [valor_x - h, valor_x + h])
+    if np.isfinite(izq) and np.isfinite(der) and abs(izq - der) <= 1e-4 * max(1.0, abs(izq)):
+        return float((izq + der) / 2)
+    return None
+
+# ----------------- compilación numérica (kernel NumPy) ----------------
+def _compilar(expr):
+    """
+    Kernel fusionado (cse + búferes preasignados, ver Model/compilador.py).
+    Si la expresión tiene nodos sin traducción se usa lambdify con cse.
+    """
+    try:
+        return compilador.compilar(expr, x)
+    except compilador.NoSoportado:
+        return lambdify(x, expr, modules="numpy", cse=True)
+
+
+def compilar_funcion(expresion):
+    """
+    Compila la expresión una sola vez en un kernel NumPy vectorizado.
+    Retorna: función kernel(xs) -> ndarray (puede devolver escalar si la expresión es constante)
+    """
+    return obtener_compilada(expresion).kernel
+
+
+# máximo de puntos aislados que se reevalúan de forma exacta por llamada
+_MAX_PUNTOS_EXACTOS = 50
+
+# ----------------- evalua la expresion sobre un arreglo, NaN donde no es valido en R ----------------
+def evaluar_vector(kernel, xs, expresion=None):
+    """
+    Evalúa el kernel sobre todo el arreglo xs en una sola llamada.
+    Los resultados complejos o no finitos se marcan como NaN. Si se entrega la
+    expresión, los NaN aislados (posibles singularidades evitables) se
+    recalculan con evaluar_puntos.
+    """
+    xs = np.asarray(xs, dtype=float)
+    traza.contar("evaluar_vector")
+    traza.contar("puntos_evaluados", xs.size)
+    try:
+        with np.errstate(all="ignore"):
+            ys = _a_reales(kernel(xs), xs.shape)
+    except Exception:
+        # El kernel no soporta la expresión: evaluación exacta punto a punto
+        if expresion is None:
+            return np.full(xs.shape, np.nan)
+        ys = np.array(evaluar_puntos(expresion, xs.ravel()), dtype=float).reshape(xs.shape)
+    ys[~np.isfinite(ys)] = np.nan
+
+    if expresion is not None:
+        _rellenar_aislados(expresion, xs, ys)
+    return ys
+
+
+def _a_reales(ys, forma):
+    """Copia float de ys con la forma dada; los complejos con parte imaginaria pasan a NaN."""
+    ys = np.broadcast_to(np.asarray(ys), forma)
+    if np.iscomplexobj(ys):
+        ys = np.where(np.abs(ys.imag) > 1e-10, np.nan, ys.real)
+    return np.array(ys, dtype=float)
+
+
+def _rellenar_aislados(expresion, xs, ys):
+    """Recalcula con evaluar_puntos los NaN rodeados de valores finitos (xs ordenado)."""
+    if ys.size <= 2:
+        return ys
+    nan = np.isnan(ys)
+    aislados = np.flatnonzero(nan[1:-1] & ~nan[:-2] & ~nan[2:]) + 1
+    aislados = aislados[:_MAX_PUNTOS_EXACTOS]
+    for i, y in zip(aislados, evaluar_puntos(expresion, xs[aislados])):
+        if y is not None:
+            ys[i] = y
+    return ys
+
 # -----------------------------------------------------------------------
 def obtener_asintotas_verticales(expr, ventana=(-10, 10)):
-    asintotas = []
     try:
-        expr_simplificada = expr.simplify()
-        num, den = expr_simplificada.as_numer_denom()
-        soluciones = solveset(den, x, domain=S.Reals)
+        entrada = obtener_compilada(expr)
+        return entrada.polos_en(ventana).tolist()
+    except Exception:
+        return []
 
-        # Si no es conjunto finito (intervalos/infinitos), no dibujar
-        if hasattr(soluciones, "is_FiniteSet") and not soluciones.is_FiniteSet:
-            return []
 
-        for sol in soluciones:
-            try:
-                val = float(sol.evalf())
-                if ventana[0] < val < ventana[1]:
-                    if abs(num.subs(x, sol)) > 1e-10:
-                        asintotas.append(val)
-            except Exception:
-                continue
-    except Exception:
-        pass
-    return sorted(set(asintotas))
-
-# ------------------ muestreo lineal ------------------
-def _linspace(a: float, b: float, paso: float, max_puntos: int = 20000):
-    if paso <= 0:
-        raise ValueError("El paso debe ser positivo.")
-    if a >= b:
-        raise ValueError("Ventana inválida: se requiere a < b.")
-    puntos = int((b - a) / paso) + 1
-    if puntos > max_puntos:
-        paso = (b - a) / max_puntos
-        puntos = max_puntos
-    xs = []
-    t = a
-    # epsilon para cubrir el borde derecho con acumulación flotante
-    for _ in range(puntos):
-        xs.append(t)
-        t += paso
-    if xs and xs[-1] < b:
-        xs.append(b)
-    return xs
+def _dibujar_asintotas(ax, asintotas, color="red", previas=()):
+    """
+    Reemplaza las líneas de asíntota `previas` por las de `asintotas`.
+    Retorna: lista de líneas dibujadas
+    """
+    for linea in previas:
+        linea.remove()
+    if len(asintotas) > _columnas_ejes(ax) // 4:
+        return []  # más polos que columnas: las líneas taparían la curva
+    return [ax.axvline(v, color=color, linestyle="--", linewidth=1, alpha=0.7) for v in asintotas]
+
+# ------------------ densidad de muestreo según la pantalla ------------------
+# La malla base tiene al menos _SOBREMUESTREO muestras por columna de píxeles
+# físicos del área de datos; el refinamiento adaptativo agrega puntos solo
+# donde la curva dobla. Sin ejes (lotes, benchmarks) se supone un lienzo de
+# _COLUMNAS_SIN_PANTALLA columnas.
+_SOBREMUESTREO = 1.0
+_COLUMNAS_SIN_PANTALLA = 800
+_MAX_COLUMNAS = 16384  # tope de la malla base por ventana, pase lo que pase con paso
+
+
+def _columnas_ejes(ax):
+    """Columnas de píxeles físicos del área de datos: ancho lógico del lienzo × device pixel ratio."""
+    canvas = ax.figure.canvas
+    logicas = canvas.get_width_height()[0] * ax.get_position().width
+    return max(int(logicas * canvas.device_pixel_ratio), 100)
+
+
+def paso_pantalla(ventana, ax=None, sobremuestreo=_SOBREMUESTREO, columnas=None):
+    """
+    Paso de la malla base para dibujar la ventana en los ejes dados (o en
+    columnas píxeles ya medidos), redondeado hacia abajo al espaciado de un
+    nivel de teselas (anchos parecidos comparten teselas y entradas de
+    Model.almacen).
+    Retorna: float
+    """
+    a, b = float(ventana[0]), float(ventana[1])
+    if columnas is None:
+        columnas = _COLUMNAS_SIN_PANTALLA if ax is None else _columnas_ejes(ax)
+    paso = (b - a) / (columnas * sobremuestreo)
+    return 2.0 ** _nivel_teselas(paso) / (_PUNTOS_TESELA - 1)
+
+
+# ------------------ muestreo adaptativo ------------------
+# puntos que puede agregar el refinamiento y ángulo máximo entre segmentos
+_MAX_PUNTOS_ADAPTATIVO = 4000
+_TOLERANCIA_ANGULO = math.radians(10)
+
+
+def _intervalos_a_refinar(xs, ys, tolerancia):
+    """
+    Prioridad de subdivisión de cada intervalo [xs[i], xs[i+1]] (0 = no subdividir).
+    Se marca un intervalo si el ángulo entre segmentos vecinos (en coordenadas
+    normalizadas a la ventana) supera la tolerancia, o si solo uno de sus
+    extremos está definido (borde del dominio).
+    """
+    finito = np.isfinite(ys)
+    prioridad = np.zeros(xs.size - 1)
+    if xs[-1] == xs[0]:
+        return prioridad  # ventana más angosta que la resolución de float: nada que subdividir
+
+    borde = finito[:-1] ^ finito[1:]
+    prioridad[borde] = math.pi
+
+    validos = ys[finito]
+    if validos.size >= 3:
+        bajo, alto = np.percentile(validos, [5, 95])
+        escala_y = (alto - bajo) or max(abs(alto), 1.0)
+        u = (xs - xs[0]) / (xs[-1] - xs[0])
+        v = np.where(finito, ys, 0.0) / escala_y
+        du, dv = np.diff(u), np.diff(v)
+        # ángulo entre el segmento (i-1, i) y el segmento (i, i+1)
+        cruz = du[:-1] * dv[1:] - dv[:-1] * du[1:]
+        punto = du[:-1] * du[1:] + dv[:-1] * dv[1:]
+        angulo = np.abs(np.arctan2(cruz, punto))
+        ok = finito[:-2] & finito[1:-1] & finito[2:] & (angulo > tolerancia)
+        angulo = np.where(ok, angulo, 0.0)
+        prioridad[:-1] = np.maximum(prioridad[:-1], angulo)
+        prioridad[1:] = np.maximum(prioridad[1:], angulo)
+    return prioridad
+
+
+def _muestreo_adaptativo(evaluar, xs, max_puntos=_MAX_PUNTOS_ADAPTATIVO,
+                         paso_min=None, tolerancia=_TOLERANCIA_ANGULO, max_iter=24, ys=None):
+    """
+    Parte de la malla gruesa xs y subdivide recursivamente (por mitades) los
+    intervalos donde la curva dobla más de la tolerancia.
+    evaluar(xs) -> ys con NaN donde la función no está definida. Si ys tiene
+    forma (k, n) (varias curvas en una malla común), se subdivide donde
+    cualquiera de ellas lo necesite. Si ya se conocen los valores de la
+    malla inicial se pasan en ys.
+    Retorna: (xs, ys) ordenados
+    """
+    xs = np.asarray(xs, dtype=float)
+    ys = evaluar(xs) if ys is None else np.asarray(ys, dtype=float)
+    if paso_min is None:
+        paso_min = (xs[-1] - xs[0]) * 1e-6
+
+    for _ in range(max_iter):
+        restantes = max_puntos - xs.size
+        if restantes <= 0:
+            break
+        if ys.ndim == 1:
+            prioridad = _intervalos_a_refinar(xs, ys, tolerancia)
+        else:
+            prioridad = np.max([_intervalos_a_refinar(xs, fila, tolerancia) for fila in ys], axis=0)
+        prioridad[np.diff(xs) < 2 * paso_min] = 0.0
+        idx = np.flatnonzero(prioridad > 0)
+        if idx.size == 0:
+            break
+        if idx.size > restantes:
+            idx = np.sort(idx[np.argsort(prioridad[idx])[::-1][:restantes]])
+
+        medios = (xs[idx] + xs[idx + 1]) / 2
+        xs = np.insert(xs, idx + 1, medios)
+        ys = np.insert(ys, idx + 1, evaluar(medios), axis=-1)
+    return xs, ys
+
+# ------------------ caché de teselas (x, y) por expresión ------------------
+# El nivel L parte el eje x en teselas [k * 2**L, (k + 1) * 2**L], cada una con
+# una malla base de _PUNTOS_TESELA puntos refinada de forma adaptativa. Así un
+# arrastre reutiliza las teselas vecinas y un zoom parte de las del nivel
+# vecino (más grueso o más fino) en vez de volver a evaluar todo.
+# El refinamiento de una vista agrega a lo más _MAX_PUNTOS_ADAPTATIVO puntos,
+# repartidos entre sus teselas (ver _presupuesto_tesela).
+_PUNTOS_TESELA = 65
+_MEMORIA_TESELAS_MB = 64
+
+
+def _bytes_tesela(tesela):
+    return tesela[0].nbytes + tesela[1].nbytes
+
+
+_CACHE_TESELAS = CacheLRU(capacidad=1_000_000, max_bytes=_MEMORIA_TESELAS_MB * 2**20,
+                          tamano=_bytes_tesela)
+
+
+def configurar_cache_teselas(memoria_mb: float):
+    """Límite de memoria de las teselas; desaloja de inmediato si ya se excede."""
+    _CACHE_TESELAS.limitar_memoria(int(memoria_mb * 2**20))
+
+
+def estadisticas_teselas() -> dict:
+    return _CACHE_TESELAS.estadisticas()
+
+
+def _nivel_teselas(espaciado: float) -> int:
+    """Nivel cuyas teselas tienen una malla base de espaciado <= espaciado."""
+    return math.floor(math.log2(espaciado * (_PUNTOS_TESELA - 1)))
+
+
+def _presupuesto_tesela(teselas: int) -> int:
+    """
+    Puntos que el refinamiento puede agregar a cada una de las teselas de
+    una vista: _MAX_PUNTOS_ADAPTATIVO repartido entre ellas, redondeado
+    hacia abajo a una potencia de 2. Con un mismo lienzo la cantidad de
+    teselas visibles casi no cambia al desplazar o hacer zoom, así que las
+    vistas vecinas comparten presupuesto (y teselas).
+    """
+    return 2 ** int(math.log2(max(_MAX_PUNTOS_ADAPTATIVO // max(teselas, 1), 1)))
+
+
+def _coincidencias(cx, malla, tol):
+    """
+    Para cada punto de malla, índice del punto de cx (ordenado) más cercano.
+    Retorna: (mascara_malla, indices_cx) de los que están a menos de tol
+    """
+    j = np.clip(np.searchsorted(cx, malla), 1, max(cx.size - 1, 1))
+    izq = np.minimum(j - 1, cx.size - 1)
+    der = np.minimum(j, cx.size - 1)
+    j = np.where(np.abs(cx[izq] - malla) <= np.abs(cx[der] - malla), izq, der)
+    return np.abs(cx[j] - malla) <= tol, j
+
+
+def _muestrear_tesela(entrada, nivel, k, extra):
+    ancho = 2.0 ** nivel
+    x0 = k * ancho
+    malla = x0 + ancho * np.linspace(0.0, 1.0, _PUNTOS_TESELA)
+    ys = np.full(malla.size, np.nan)
+    pendiente = np.ones(malla.size, dtype=bool)
+    tol = ancho * 1e-9
+    extra_x, extra_y = [], []
+
+    # Tesela madre (más gruesa) e hijas (más finas) ya calculadas
+    madre = _CACHE_TESELAS.buscar((entrada.expr, nivel + 1, k // 2, extra))
+    hijas = [_CACHE_TESELAS.buscar((entrada.expr, nivel - 1, h, extra)) for h in (2 * k, 2 * k + 1)]
+    for tesela, es_madre in [(madre, True)] + [(h, False) for h in hijas]:
+        if tesela is None:
+            continue
+        cx, cy = tesela
+        dentro = (cx >= x0 - tol) & (cx <= x0 + ancho + tol)
+        cx, cy = cx[dentro], cy[dentro]
+        if cx.size == 0:
+            continue
+        coincide, j = _coincidencias(cx, malla, tol)
+        nuevos = coincide & pendiente
+        ys[nuevos] = cy[j[nuevos]]
+        pendiente &= ~coincide
+        if es_madre:
+            # Los puntos que la madre ya refinó aportan detalle; de las hijas
+            # solo se toma la malla base para no acumular puntos al alejar el zoom
+            sobrantes = np.ones(cx.size, dtype=bool)
+            sobrantes[j[coincide]] = False
+            extra_x.append(cx[sobrantes])
+            extra_y.append(cy[sobrantes])
+
+    if pendiente.any():
+        ys[pendiente] = evaluar_vector(entrada.kernel, malla[pendiente])
+    xs = np.concatenate([malla] + extra_x)
+    ys = np.concatenate([ys] + extra_y)
+    orden = np.argsort(xs, kind="stable")
+    xs, ys = _muestreo_adaptativo(lambda t: evaluar_vector(entrada.kernel, t), xs[orden],
+                                  ys=ys[orden], max_puntos=_PUNTOS_TESELA + extra,
+                                  paso_min=ancho * 1e-7)
+    _rellenar_aislados(entrada, xs, ys)
+    xs.flags.writeable = False
+    ys.flags.writeable = False
+    return xs, ys
+
+
+def _tesela(entrada, nivel, k, extra):
+    return _CACHE_TESELAS.obtener((entrada.expr, nivel, k, extra),
+                                  lambda: _muestrear_tesela(entrada, nivel, k, extra))
+
+
+def muestrear_funcion(entrada, a: float, b: float, paso: float = None):
+    """
+    Muestrea la función en [a, b] uniendo teselas de la caché. La malla base
+    tiene espaciado <= paso (sin paso: el de paso_pantalla) y a lo más
+    _MAX_COLUMNAS puntos, refinada de forma adaptativa dentro de cada tesela
+    con un presupuesto común para toda la vista.
+    Retorna: (xs, ys) con NaN donde la función no está definida en R
+    """
+    entrada = obtener_compilada(entrada)
+    if not (math.isfinite(a) and math.isfinite(b)) or a >= b:
+        raise ValueError("Ventana inválida: se requiere a < b finitos.")
+    if paso is None:
+        paso = paso_pantalla((a, b))
+    nivel = _nivel_teselas(max(paso, (b - a) / _MAX_COLUMNAS))
+    ancho = 2.0 ** nivel
+    indices = range(math.floor(a / ancho), math.ceil(b / ancho))
+    extra = _presupuesto_tesela(len(indices))
+    teselas = [_tesela(entrada, nivel, k, extra) for k in indices]
+    # Teselas vecinas comparten el borde: se descarta el primer punto de cada una
+    xs = np.concatenate([t[0][1:] if i else t[0] for i, t in enumerate(teselas)])
+    ys = np.concatenate([t[1][1:] if i else t[1] for i, t in enumerate(teselas)])
+    # Recorte a [a, b] conservando un punto a cada lado para llegar a los bordes
+    i0 = max(np.searchsorted(xs, a, side="left") - 1, 0)
+    i1 = min(np.searchsorted(xs, b, side="right") + 1, xs.size)
+    return xs[i0:i1].copy(), ys[i0:i1].copy()
+
+
+def _escala_robusta(xs, ys):
+    """
+    Percentiles 2 y 98 de ys ponderados por el ancho en x que representa cada
+    muestra (el muestreo adaptativo acumula puntos cerca de los polos).
+    Retorna: (p_bajo, p_alto) o None si hay menos de 3 valores finitos
+    """
+    finito = np.isfinite(ys)
+    if np.count_nonzero(finito) < 3:
+        return None
+    anchos = np.gradient(xs)[finito]
+    validos = ys[finito]
+    orden = np.argsort(validos)
+    acumulado = np.cumsum(anchos[orden])
+    acumulado /= acumulado[-1]
+    return tuple(float(v) for v in np.interp([0.02, 0.98], acumulado, validos[orden]))
+
+
+def _cortes_discontinuidad(xs, ys, asintotas=()):
+    """
+    Máscara (len(xs) - 1) de los intervalos que no deben unirse con una recta:
+    los que contienen una asíntota vertical y los saltos con cambio de signo
+    mayores que el rango típico de la función (polos no detectados).
+    """
+    corte = np.zeros(max(xs.size - 1, 0), dtype=bool)
+    if corte.size == 0:
+        return corte
+    if len(asintotas):
+        pos = np.searchsorted(xs, np.asarray(asintotas, dtype=float))
+        pos = pos[(pos > 0) & (pos < xs.size)]
+        corte[pos - 1] = True
+
+    escala = _escala_robusta(xs, ys)
+    if escala is not None:
+        umbral = max(escala[1] - escala[0], 1e-12)
+        with np.errstate(invalid="ignore"):
+            salto = np.abs(np.diff(ys)) > umbral
+            signo = np.sign(ys[:-1]) * np.sign(ys[1:]) < 0
+        corte |= salto & signo
+    return corte
+
+
+def _datos_curva(xs, ys, asintotas=()):
+    """Un único par de arreglos con NaN en cada discontinuidad (matplotlib corta la línea en los NaN)."""
+    idx = np.flatnonzero(_cortes_discontinuidad(xs, ys, asintotas)) + 1
+    return np.insert(xs, idx, np.nan), np.insert(ys, idx, np.nan)
+
+
+def _trazar_curva(ax, xs, ys, asintotas=()):
+    """Dibuja toda la curva como un solo Line2D, sin importar cuántas discontinuidades tenga."""
+    datos_x, datos_y = _datos_curva(xs, ys, asintotas)
+    return ax.plot(datos_x, datos_y, "b", linewidth=1.5)[0]
+
+
+def _limites_y(xs, ys):
+    """
+    Cerca de los polos el muestreo adaptativo concentra puntos con valores
+    enormes que aplastarían la vista. Si el rango completo es mucho mayor
+    que el de _escala_robusta, retorna ese rango (con margen). Si no, None.
+    """
+    escala = _escala_robusta(xs, ys)
+    if escala is None:
+        return None
+    p_bajo, p_alto = escala
+    validos = ys[np.isfinite(ys)]
+    if not (validos.max() - validos.min()) > 10 * (p_alto - p_bajo) > 0:
+        return None
+    margen = (p_alto - p_bajo) * 0.1
+    return p_bajo - margen, p_alto + margen
+
+# ------------------ vista previa (mientras se escribe) ------------------
+def grafico_preliminar(texto_o_expr, ax, ventana=(-10, 10), columnas=None, titulo=None):
+    """
+    Gráfico grueso para la vista previa: evalúa la expresión sin simplificar
+    con una muestra por columna de píxeles físicos (o `columnas` muestras),
+    sin asíntotas, refinamiento ni etapas simbólicas.
+    Retorna: (ok, detalle)
+    """
+    try:
+        entrada = obtener_compilada(texto_o_expr)
+        columnas = _columnas_ejes(ax) if columnas is None else columnas
+        xs = np.linspace(float(ventana[0]), float(ventana[1]), int(columnas))
+        ys = evaluar_vector(entrada.kernel_crudo, xs)
+    except Exception as e:
+        return (False, str(e))
+
+    ax.clear()
+    ax.grid(True, alpha=0.3)
+    ax.axhline(0, color="black", linewidth=1)
+    ax.axvline(0, color="black", linewidth=1)
+    ax.set_xlabel("x")
+    ax.set_ylabel("y")
+    ax.set_title(titulo or f"f(x) = {entrada.expr}")
+    _trazar_curva(ax, xs, ys)
+    limites = _limites_y(xs, ys)
+    if limites is not None:
+        ax.set_ylim(*limites)
+    _zoom_simple(ax)
+    return (True, None)
+
+
+# ------------------ modo intervalos: una caja garantizada por columna de píxeles ------------------
+def _vertices_columnas(bordes, lo, hi, mascara, y0, y1):
+    """Rectángulos (n, 4, 2) de las columnas marcadas, recortados a [y0, y1] (sin infinitos)."""
+    i = np.flatnonzero(mascara)
+    abajo, arriba = np.clip(lo[i], y0, y1), np.clip(hi[i], y0, y1)
+    izq, der = bordes[i], bordes[i + 1]
+    return np.stack([np.column_stack([izq, abajo]), np.column_stack([der, abajo]),
+                     np.column_stack([der, arriba]), np.column_stack([izq, arriba])], axis=1)
+
+
+def _acotar_columnas(entrada, x0, x1, columnas):
+    """
+    Cotas por columna de la expresión tal como se escribió: conserva su
+    dominio (la columna de x = 1 en (x^2 - 1)/(x - 1) queda dudosa). La
+    simplificada coincide con ella donde ambas están definidas, así que
+    solo se usa para estrechar lo/hi.
+    Retorna: (bordes, lo, hi, seguro, posible)
+    """
+    bordes = np.linspace(x0, x1, columnas + 1)
+    lo, hi, seguro, posible = intervalos.acotar(entrada.expr, x, bordes)
+    if entrada.simplificada is not entrada.expr:
+        try:
+            s_lo, s_hi, _, s_posible = intervalos.acotar(entrada.simplificada, x, bordes)
+        except intervalos.NoSoportado:
+            return bordes, lo, hi, seguro, posible
+        nuevo_lo, nuevo_hi = np.maximum(lo, s_lo), np.minimum(hi, s_hi)
+        # Sin redondeo hacia afuera las dos cotas podrían no cruzarse por un ulp
+        estrechar = s_posible & (nuevo_lo <= nuevo_hi)
+        lo, hi = np.where(estrechar, nuevo_lo, lo), np.where(estrechar, nuevo_hi, hi)
+    return bordes, lo, hi, seguro, posible
+
+
+def _limites_cajas(bordes, lo, hi, seguro):
+    """Rango y a mostrar según las columnas seguras (como _limites_y sobre sus centros)."""
+    finito = seguro & np.isfinite(lo) & np.isfinite(hi)
+    if not finito.any():
+        return None
+    centros = (bordes[:-1] + bordes[1:])[finito] / 2
+    limites = _limites_y(centros, (lo[finito] + hi[finito]) / 2)
+    if limites is not None:
+        return limites
+    bajo, alto = float(lo[finito].min()), float(hi[finito].max())
+    margen = (alto - bajo) * 0.05 or 1.0
+    return bajo - margen, alto + margen
+
+
+def _trazar_intervalos(ax, entrada, x0, x1, columnas):
+    """
+    Dibuja en azul las columnas donde f está definida con certeza y en
+    naranja tenue las dudosas (polos o bordes del dominio dentro de la
+    columna). Las indefinidas con certeza quedan vacías.
+    Retorna: (coleccion_segura, coleccion_dudosa)
+    """
+    from matplotlib.collections import PolyCollection
+
+    bordes, lo, hi, seguro, posible = _acotar_columnas(entrada, x0, x1, columnas)
+    limites = _limites_cajas(bordes, lo, hi, seguro) or (-10.0, 10.0)
+    ax.set_xlim(x0, x1)
+    ax.set_ylim(*limites)
+    seguras = PolyCollection([], facecolors="b", edgecolors="b", linewidths=0.6,
+                             label="f(x) (cota por columna)")
+    dudosas = PolyCollection([], facecolors="orange", edgecolors="none", alpha=0.35,
+                             label="columna dudosa")
+    ax.add_collection(seguras)
+    ax.add_collection(dudosas)
+    cajas = (seguras, dudosas)
+    _pintar_cajas(cajas, bordes, lo, hi, seguro, posible, limites)
+    return cajas
+
+
+def _pintar_cajas(cajas, bordes, lo, hi, seguro, posible, limites):
+    y0, y1 = limites
+    margen = 10 * (y1 - y0)
+    seguras, dudosas = cajas
+    seguras.set_verts(_vertices_columnas(bordes, lo, hi, seguro, y0 - margen, y1 + margen))
+    dudosas.set_verts(_vertices_columnas(bordes, lo, hi, posible & ~seguro, y0 - margen, y1 + margen))
+
+
+def _actualizar_intervalos(cajas, entrada, x0, x1, columnas, limites):
+    bordes, lo, hi, seguro, posible = _acotar_columnas(entrada, x0, x1, columnas)
+    _pintar_cajas(cajas, bordes, lo, hi, seguro, posible, limites)
+
 
 # ------------------ gráfico principal (contrato ok/detail) ------------------
 def grafico_funcion(
     texto_o_expr,
     valor_x: float = None,
     ventana=(-10, 10),
-    paso=0.05,
+    paso=None,
     titulo=None,
     ax=None,
+    muestra=None,
+    asintotas=None,
+    modo="muestreo",
 ):
+    """
+    Grafica la función en la ventana dada. Si ya se calcularon, `muestra`
+    (xs, ys) y `asintotas` se usan directamente en vez de recalcularlos.
+    Sin paso, la densidad de muestreo sale del ancho en píxeles de los ejes
+    (paso_pantalla) y se vuelve a calcular al cambiar su tamaño.
+    Con modo="intervalos" cada columna de píxeles se dibuja con una cota
+    garantizada de f (aritmética de intervalos); si la expresión usa
+    funciones sin regla de intervalos se vuelve al muestreo.
+    Retorna: (ok, detalle)
+    """
     # Validar ventana y paso
     try:
         a, b = float(ventana[0]), float(ventana[1])
-        paso = float(paso)
+        paso = None if paso is None else float(paso)
         if a >= b:
             return (False, "Ventana inválida: se requiere a < b.")
-        if paso <= 0:
+        if paso is not None and paso <= 0:
             return (False, "El paso debe ser positivo.")
-        if (b - a) > 1e6:
-            return (False, "La ventana es demasiado grande.")
-        if paso < 1e-9:
+        if not (math.isfinite(a) and math.isfinite(b)):
+            return (False, "La ventana debe ser finita.")
+        if paso is not None and paso < 1e-9:
             return (False, "El paso es demasiado pequeño.")
     except Exception as e:
         return (False, f"Parámetros de ventana/paso inválidos: {e}")
 
     # Preparar expresión
     try:
-        if hasattr(texto_o_expr, "free_symbols"):
-            expr = texto_o_expr
-            texto_funcion = str(texto_o_expr)
+        entrada = obtener_compilada(texto_o_expr)
+        expr = entrada.expr
+        if isinstance(texto_o_expr, ExpresionCompilada):
+            texto_funcion = str(expr)
         else:
-            expr = analizar_funcion(texto_o_expr)
             texto_funcion = str(texto_o_expr)
     except SympifyError as e:
         return (False, f"Error al interpretar la función: {e}")
@@ -291,6 +1241,7 @@ def grafico_funcion(
     created_fig = False
     try:
         if ax is None:
+            import matplotlib.pyplot as plt  # solo sin ejes propios (uso fuera de la interfaz)
             fig, ax = plt.subplots(figsize=(7, 4), dpi=100)
             created_fig = True
         else:
@@ -307,47 +1258,45 @@ def grafico_funcion(
         return (False, f"No se pudo preparar los ejes/figura: {e}")
 
     # Detectar y marcar asíntotas verticales
+    lineas_asintotas = []
     try:
-        asintotas = obtener_asintotas_verticales(expr, ventana=(a, b))
-        for v in asintotas:
-            ax.axvline(v, color='red', linestyle='--', linewidth=1, alpha=0.7)
+        if asintotas is None:
+            with traza.tramo("grafico.asintotas"):
+                asintotas = obtener_asintotas_verticales(entrada, ventana=(a, b))
+        lineas_asintotas = _dibujar_asintotas(ax, asintotas)
     except Exception:
-        pass
+        asintotas = []
+
+    # Cotas por columna (modo intervalos)
+    cajas = None
+    if modo == "intervalos":
+        try:
+            with traza.tramo("grafico.intervalos"):
+                cajas = _trazar_intervalos(ax, entrada, a, b, _columnas_ejes(ax))
+        except intervalos.NoSoportado:
+            cajas = None
+        except Exception as e:
+            return (False, f"No se pudo acotar la función: {e}")
 
     # Muestreo y trazado
+    curva = None
     try:
-        xs = _linspace(a, b, paso)
-        seg_x, seg_y = [], []
-        prev_y = None
-
-        def _flush_segment():
-            if len(seg_x) > 1:  # Solo dibujar segmentos con al menos 2 puntos
-                try:
-                    ax.plot(seg_x, seg_y, "b", linewidth=1.5)
-                except Exception:
-                    pass
-            seg_x.clear()
-            seg_y.clear()
-
-        for t in xs:
-            y = evaluar_punto(expr, t)
-            if y is not None:
-                # Detectar saltos grandes para manejar discontinuidades
-                if prev_y is not None and abs(y - prev_y) > 1000:
-                    _flush_segment()
-                
-                seg_x.append(t)
-                seg_y.append(y)
-                prev_y = y
-            else:
-                _flush_segment()
-                prev_y = None
-
-        _flush_segment()
+        if cajas is None and muestra is None:
+            with traza.tramo("grafico.muestreo"):
+                muestra = muestrear_funcion(entrada, a, b, paso or paso_pantalla((a, b), ax))
+                traza.anotar(muestras=len(muestra[0]))
+        if cajas is None:
+            xs, ys = muestra
+            with traza.tramo("grafico.trazado", muestras=len(xs)):
+                curva = _trazar_curva(ax, xs, ys, asintotas)
+                limites = _limites_y(xs, ys)
+                if limites is not None:
+                    ax.set_ylim(*limites)
 
         # Marca de punto evaluado
         if valor_x is not None:
-            y_eval = evaluar_punto(expr, valor_x)
+            with traza.tramo("grafico.evaluacion"):
+                y_eval = evaluar_punto(entrada, valor_x)
             if y_eval is not None:
                 try:
                     ax.scatter([valor_x], [y_eval], color="red", s=50, zorder=5,
@@ -368,6 +1317,7 @@ def grafico_funcion(
     except Exception as e:
         if created_fig:
             try:
+                import matplotlib.pyplot as plt
                 plt.close(fig)
             except Exception:
                 pass
@@ -375,9 +1325,187 @@ def grafico_funcion(
 # ----------------- activa interaccion de zoom -----------------------
     if not ax.has_data():
         return (False, "No hay valores reales en la ventana seleccionada.")
+    def _remuestrear(x0, x1):
+        # Nueva muestra del rango visible, con la densidad del ancho actual en píxeles
+        try:
+            columnas = _columnas_ejes(ax)
+            ax.set_autoscale_on(False)
+            visibles = obtener_asintotas_verticales(entrada, ventana=(x0, x1))
+            lineas_asintotas[:] = _dibujar_asintotas(ax, visibles, previas=lineas_asintotas)
+            if cajas is not None:
+                _actualizar_intervalos(cajas, entrada, x0, x1, columnas, ax.get_ylim())
+                fig.canvas.draw_idle()
+                return
+            nuevos_xs, nuevos_ys = muestrear_funcion(entrada, x0, x1, paso_pantalla((x0, x1), ax))
+            curva.set_data(*_datos_curva(nuevos_xs, nuevos_ys, visibles))
+            fig.canvas.draw_idle()
+        except Exception:
+            pass
+
+    try:
+        _zoom_simple(ax, remuestrear=_remuestrear,
+                     evaluar=lambda t: evaluar_vector(entrada.kernel, t))
+    except Exception:
+        pass
+
+    return (True, None)
+
+# ------------------ superposición de varias funciones ------------------
+_CACHE_LOTES = CacheLRU(capacidad=32)
+
+
+def _kernel_lote(entradas):
+    """
+    Un solo kernel NumPy para todas las expresiones (lambdify con cse): las
+    subexpresiones comunes, p. ej. f y g dentro de f - g, se calculan una vez.
+    """
+    exprs = tuple(e.simplificada for e in entradas)
+    return _CACHE_LOTES.obtener(exprs, lambda: lambdify(x, list(exprs), modules="numpy", cse=True))
+
+
+def evaluar_lote(entradas, xs):
+    """
+    Evalúa todas las expresiones sobre la misma malla en una llamada.
+    Retorna: ndarray (len(entradas), len(xs)) con NaN donde no están definidas en R
+    """
+    xs = np.asarray(xs, dtype=float)
+    traza.contar("evaluar_vector")
+    traza.contar("puntos_evaluados", xs.size * len(entradas))
+    try:
+        with np.errstate(all="ignore"):
+            filas = _kernel_lote(entradas)(xs)
+            ys = np.stack([_a_reales(f, xs.shape) for f in filas])
+    except Exception:
+        # Alguna expresión no se puede evaluar en bloque: una por una
+        ys = np.stack([evaluar_vector(e.kernel, xs, e) for e in entradas])
+    ys[~np.isfinite(ys)] = np.nan
+    return ys
+
+
+def muestrear_funciones(entradas, a: float, b: float, paso: float = None):
+    """
+    Muestreo adaptativo de varias funciones en una malla común (espaciado
+    <= paso; sin paso, el de paso_pantalla): se refina donde cualquiera de
+    las curvas lo necesite.
+    Retorna: (xs, ys) con ys de forma (len(entradas), len(xs))
+    """
+    entradas = [obtener_compilada(e) for e in entradas]
+    if not (math.isfinite(a) and math.isfinite(b)) or a >= b:
+        raise ValueError("Ventana inválida: se requiere a < b finitos.")
+    if paso is None:
+        paso = paso_pantalla((a, b))
+    malla = np.linspace(a, b, math.ceil((b - a) / max(paso, (b - a) / _MAX_COLUMNAS)) + 1)
+    maximo = len(malla) + _MAX_PUNTOS_ADAPTATIVO + 1000 * (len(entradas) - 1)
+    xs, ys = _muestreo_adaptativo(lambda t: evaluar_lote(entradas, t), malla, max_puntos=maximo)
+    for entrada, fila in zip(entradas, ys):
+        _rellenar_aislados(entrada, xs, fila)
+    return xs, ys
+
+
+def _limites_y_lote(xs, ys):
+    """Unión de los rangos de cada curva (recortados como en _limites_y). None si no hace falta recortar."""
+    recortar = False
+    bajo, alto = np.inf, -np.inf
+    for fila in ys:
+        limites = _limites_y(xs, fila)
+        if limites is not None:
+            recortar = True
+        elif np.isfinite(fila).any():
+            limites = (np.nanmin(fila), np.nanmax(fila))
+        else:
+            continue
+        bajo, alto = min(bajo, limites[0]), max(alto, limites[1])
+    return (bajo, alto) if recortar and bajo < alto else None
+
+
+def grafico_funciones(
+    expresiones,
+    ventana=(-10, 10),
+    paso=None,
+    titulo=None,
+    ax=None,
+    colores=None,
+):
+    """
+    Grafica varias funciones superpuestas (p. ej. f, g y f - g). Todas se
+    evalúan juntas en una malla común; cada una conserva su color, sus
+    asíntotas y su entrada en la leyenda. Sin paso, la densidad sale del
+    ancho en píxeles de los ejes, como en grafico_funcion.
+    Retorna: (ok, detalle)
+    """
+    try:
+        a, b = float(ventana[0]), float(ventana[1])
+        paso = None if paso is None else float(paso)
+        if a >= b:
+            return (False, "Ventana inválida: se requiere a < b.")
+        if paso is not None and paso <= 0:
+            return (False, "El paso debe ser positivo.")
+    except Exception as e:
+        return (False, f"Parámetros de ventana/paso inválidos: {e}")
+
+    if not expresiones:
+        return (False, "No hay funciones para graficar.")
+    try:
+        entradas = [obtener_compilada(e) for e in expresiones]
+    except SympifyError as e:
+        return (False, f"Error al interpretar la función: {e}")
+    except Exception as e:
+        return (False, f"No se pudo preparar la función: {e}")
+    etiquetas = [str(e.expr) if isinstance(t, ExpresionCompilada) else str(t)
+                 for t, e in zip(expresiones, entradas)]
+    colores = list(colores or [f"C{i % 10}" for i in range(len(entradas))])
+
+    if ax is None:
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=(7, 4), dpi=100)
+    fig = ax.figure
+    ax.clear()
+    ax.grid(True, alpha=0.3)
+    ax.axhline(0, color="black", linewidth=1)
+    ax.axvline(0, color="black", linewidth=1)
+    ax.set_xlabel("x")
+    ax.set_ylabel("y")
+    ax.set_title(titulo or ", ".join(etiquetas))
+
+    with traza.tramo("grafico.asintotas", funciones=len(entradas)):
+        asintotas, lineas_asintotas = [], []
+        for entrada, color in zip(entradas, colores):
+            propias = obtener_asintotas_verticales(entrada, ventana=(a, b))
+            asintotas.append(propias)
+            lineas_asintotas.append(_dibujar_asintotas(ax, propias, color))
+
+    try:
+        with traza.tramo("grafico.muestreo", funciones=len(entradas)):
+            xs, ys = muestrear_funciones(entradas, a, b, paso or paso_pantalla((a, b), ax))
+            traza.anotar(muestras=xs.size)
+        curvas = []
+        for fila, propias, color, etiqueta in zip(ys, asintotas, colores, etiquetas):
+            datos_x, datos_y = _datos_curva(xs, fila, propias)
+            curvas.append(ax.plot(datos_x, datos_y, color=color, linewidth=1.5,
+                                  label=f"f(x) = {etiqueta}")[0])
+        limites = _limites_y_lote(xs, ys)
+        if limites is not None:
+            ax.set_ylim(*limites)
+        ax.legend(loc="best")
+    except Exception as e:
+        return (False, f"No se pudo trazar las funciones: {e}")
+
+    def _remuestrear(x0, x1):
+        try:
+            nuevos_xs, nuevos_ys = muestrear_funciones(entradas, x0, x1, paso_pantalla((x0, x1), ax))
+            ax.set_autoscale_on(False)
+            for entrada, curva, fila, color, lineas in zip(entradas, curvas, nuevos_ys,
+                                                           colores, lineas_asintotas):
+                visibles = obtener_asintotas_verticales(entrada, ventana=(x0, x1))
+                lineas[:] = _dibujar_asintotas(ax, visibles, color, previas=lineas)
+                curva.set_data(*_datos_curva(nuevos_xs, fila, visibles))
+            fig.canvas.draw_idle()
+        except Exception:
+            pass
+
     try:
-        _zoom_simple(ax)
+        _zoom_simple(ax, remuestrear=_remuestrear)
     except Exception:
         pass
 
-    return (True, None)
\ No newline at end of file
+    return (True, None)
@@ -0,0 +1,199 @@
+"""
+Aritmética de intervalos vectorizada sobre el árbol de SymPy.
+
+Para cada columna [lo, hi] de x se obtiene una cota garantizada de f en toda
+la columna, más dos marcas:
+    seguro  -> f está definida en toda la columna
+    posible -> f puede estar definida en alguna parte (False = indefinida con certeza)
+Soporta +, *, potencias (división incluida), sin, cos, tan, log, exp y Abs.
+Cualquier otro nodo lanza NoSoportado.
+"""
+import math
+
+import numpy as np
+import sympy as sp
+
+
+class NoSoportado(Exception):
+    """La expresión contiene operaciones sin regla de intervalos."""
+
+
+class Intervalo:
+    __slots__ = ("lo", "hi", "seguro", "posible")
+
+    def __init__(self, lo, hi, seguro, posible):
+        self.lo, self.hi = lo, hi
+        self.seguro, self.posible = seguro, posible
+
+
+def _constante(valor, forma):
+    lleno = np.ones(forma, dtype=bool)
+    return Intervalo(np.full(forma, valor), np.full(forma, valor), lleno, lleno.copy())
+
+
+def _con(a, b, lo, hi, seguro=True, posible=True):
+    """Intervalo resultado de una operación binaria: hereda las marcas de ambos operandos."""
+    return Intervalo(lo, hi, a.seguro & b.seguro & seguro, a.posible & b.posible & posible)
+
+
+def _de(a, lo, hi, seguro=True, posible=True):
+    return Intervalo(lo, hi, a.seguro & seguro, a.posible & posible)
+
+
+# ------------------ operaciones elementales ------------------
+def _sumar(a, b):
+    return _con(a, b, a.lo + b.lo, a.hi + b.hi)
+
+
+def _multiplicar(a, b):
+    productos = np.stack([a.lo * b.lo, a.lo * b.hi, a.hi * b.lo, a.hi * b.hi])
+    productos[np.isnan(productos)] = 0.0  # 0 * inf
+    return _con(a, b, productos.min(axis=0), productos.max(axis=0))
+
+
+def _reciproco(a):
+    lo, hi = a.lo, a.hi
+    cero = (lo <= 0) & (hi >= 0)
+    nuevo_lo = np.where(cero, -np.inf, 1 / hi)
+    nuevo_hi = np.where(cero, np.inf, 1 / lo)
+    # Cero solo en un borde: la cota es de un solo lado
+    nuevo_lo = np.where((lo == 0) & (hi > 0), 1 / hi, nuevo_lo)
+    nuevo_hi = np.where((hi == 0) & (lo < 0), 1 / lo, nuevo_hi)
+    return _de(a, nuevo_lo, nuevo_hi, seguro=~cero, posible=~((lo == 0) & (hi == 0)))
+
+
+def _potencia_entera(a, n):
+    if n == 0:
+        return _de(a, np.ones_like(a.lo), np.ones_like(a.hi))
+    if n < 0:
+        return _reciproco(_potencia_entera(a, -n))
+    plo, phi = a.lo ** n, a.hi ** n
+    if n % 2:
+        return _de(a, plo, phi)
+    lo = np.where(a.lo >= 0, plo, np.where(a.hi <= 0, phi, 0.0))
+    hi = np.where(a.lo >= 0, phi, np.where(a.hi <= 0, plo, np.maximum(plo, phi)))
+    return _de(a, lo, hi)
+
+
+def _potencia_real(a, p):
+    """Exponente no entero: SymPy/NumPy solo la definen en R para bases >= 0 (> 0 si p < 0)."""
+    if p > 0:
+        base = np.maximum(a.lo, 0.0)
+        return _de(a, base ** p, np.maximum(a.hi, 0.0) ** p,
+                   seguro=a.lo >= 0, posible=a.hi >= 0)
+    base_lo = np.maximum(a.lo, 0.0)
+    with np.errstate(divide="ignore"):
+        hi = np.where(base_lo > 0, base_lo ** p, np.inf)
+        lo = np.where(a.hi > 0, a.hi ** p, np.inf)
+    return _de(a, lo, hi, seguro=a.lo > 0, posible=a.hi > 0)
+
+
+def _exp(a):
+    return _de(a, np.exp(a.lo), np.exp(a.hi))
+
+
+def _log(a):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lo = np.log(np.maximum(a.lo, 0.0))
+        hi = np.where(a.hi > 0, np.log(np.maximum(a.hi, 0.0)), -np.inf)
+    return _de(a, lo, hi, seguro=a.lo > 0, posible=a.hi > 0)
+
+
+def _sin(a):
+    ancho = a.hi - a.lo
+    slo, shi = np.sin(a.lo), np.sin(a.hi)
+    lo, hi = np.minimum(slo, shi), np.maximum(slo, shi)
+    # ¿Contiene un máximo (π/2 + 2πk) o un mínimo (-π/2 + 2πk)?
+    pico = math.pi / 2 + 2 * math.pi * np.ceil((a.lo - math.pi / 2) / (2 * math.pi))
+    valle = -math.pi / 2 + 2 * math.pi * np.ceil((a.lo + math.pi / 2) / (2 * math.pi))
+    completo = ~(ancho < 2 * math.pi)  # incluye inf y NaN
+    hi = np.where(completo | (pico <= a.hi), 1.0, hi)
+    lo = np.where(completo | (valle <= a.hi), -1.0, lo)
+    return _de(a, lo, hi)
+
+
+def _cos(a):
+    return _sin(Intervalo(a.lo + math.pi / 2, a.hi + math.pi / 2, a.seguro, a.posible))
+
+
+def _tan(a):
+    polo = math.pi / 2 + math.pi * np.ceil((a.lo - math.pi / 2) / math.pi)
+    contiene = ~(a.hi - a.lo < math.pi) | (polo <= a.hi)
+    lo = np.where(contiene, -np.inf, np.tan(a.lo))
+    hi = np.where(contiene, np.inf, np.tan(a.hi))
+    return _de(a, lo, hi, seguro=~contiene)
+
+
+def _abs(a):
+    lo = np.where(a.lo >= 0, a.lo, np.where(a.hi <= 0, -a.hi, 0.0))
+    hi = np.maximum(np.abs(a.lo), np.abs(a.hi))
+    return _de(a, lo, hi)
+
+
+_FUNCIONES = {sp.sin: _sin, sp.cos: _cos, sp.tan: _tan, sp.log: _log, sp.exp: _exp, sp.Abs: _abs}
+
+
+# ------------------ evaluación del árbol ------------------
+def _evaluar(expr, x, columna, memo):
+    if expr in memo:
+        return memo[expr]
+    forma = columna.lo.shape
+
+    if expr == x:
+        resultado = columna
+    elif expr.is_number:
+        try:
+            valor = complex(expr.evalf())
+        except TypeError:  # zoo, nan
+            raise NoSoportado(f"Constante no finita: {expr}")
+        if valor.imag != 0:
+            raise NoSoportado(f"Constante no real: {expr}")
+        resultado = _constante(valor.real, forma)
+    elif expr.is_Add or expr.is_Mul:
+        operacion = _sumar if expr.is_Add else _multiplicar
+        args = [_evaluar(arg, x, columna, memo) for arg in expr.args]
+        resultado = args[0]
+        for arg in args[1:]:
+            resultado = operacion(resultado, arg)
+    elif expr.is_Pow:
+        base, exponente = expr.args
+        if exponente.is_Integer:
+            resultado = _potencia_entera(_evaluar(base, x, columna, memo), int(exponente))
+        elif exponente.is_number and exponente.is_real:
+            resultado = _potencia_real(_evaluar(base, x, columna, memo), float(exponente))
+        else:
+            # b**e = exp(e*log(b))
+            resultado = _evaluar(sp.exp(exponente * sp.log(base), evaluate=False), x, columna, memo)
+    elif expr.func in _FUNCIONES and len(expr.args) == 1:
+        resultado = _FUNCIONES[expr.func](_evaluar(expr.args[0], x, columna, memo))
+    else:
+        raise NoSoportado(f"Sin regla de intervalos para {expr.func.__name__}")
+
+    memo[expr] = resultado
+    return resultado
+
+
+def acotar(expr, x, bordes, subdivisiones=4):
+    """
+    Cota de expr en cada columna [bordes[i], bordes[i+1]]. Cada columna se
+    parte en `subdivisiones` trozos y se unen sus cotas (reduce la
+    sobreestimación por dependencia, p. ej. en x - x).
+    Retorna: (lo, hi, seguro, posible), arreglos de largo len(bordes) - 1
+    """
+    bordes = np.asarray(bordes, dtype=float)
+    n = bordes.size - 1
+    finos = np.interp(np.arange(n * subdivisiones + 1) / subdivisiones,
+                      np.arange(n + 1), bordes)
+    lleno = np.ones(finos.size - 1, dtype=bool)
+    with np.errstate(all="ignore"):
+        r = _evaluar(expr, x, Intervalo(finos[:-1], finos[1:], lleno, lleno.copy()), {})
+        forma = (n, subdivisiones)
+        lo = np.broadcast_to(r.lo, lleno.shape).reshape(forma)
+        hi = np.broadcast_to(r.hi, lleno.shape).reshape(forma)
+        posible = np.broadcast_to(r.posible, lleno.shape).reshape(forma)
+        seguro = np.broadcast_to(r.seguro, lleno.shape).reshape(forma)
+        # Los trozos indefinidos con certeza no aportan a la cota
+        # NaN (inf - inf) no acota nada: se toma toda la recta
+        lo = np.where(posible, np.where(np.isnan(lo), -np.inf, lo), np.inf).min(axis=1)
+        hi = np.where(posible, np.where(np.isnan(hi), np.inf, hi), -np.inf).max(axis=1)
+    return lo, hi, seguro.all(axis=1), posible.any(axis=1)
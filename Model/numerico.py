@@ -0,0 +1,624 @@
+import numpy as np
+from sympy import Interval, Union, FiniteSet, Float, EmptySet, oo
+
+# ------------------ aproximaciones numéricas (respaldo de las etapas simbólicas) ------------------
+# Todas reciben evaluar(xs) -> ys con NaN donde la función no está definida en R.
+VENTANA_APROXIMACION = (-10, 10)
+_PUNTOS_MALLA = 4001
+_ITERACIONES_BISECCION = 60
+
+
+def _biseccion_vectorizada(evaluar, izq, der, fizq):
+    """Biseca simultáneamente todos los intervalos [izq, der] con cambio de signo."""
+    izq, der, fizq = izq.copy(), der.copy(), fizq.copy()
+    for _ in range(_ITERACIONES_BISECCION):
+        medio = (izq + der) / 2
+        fmedio = evaluar(medio)
+        mismo = np.sign(fmedio) == np.sign(fizq)
+        izq = np.where(mismo, medio, izq)
+        fizq = np.where(mismo, fmedio, fizq)
+        der = np.where(mismo, der, medio)
+    return (izq + der) / 2
+
+
+def cambios_de_signo(evaluar, ventana=VENTANA_APROXIMACION, n=_PUNTOS_MALLA):
+    """
+    Localiza los cambios de signo de f en la ventana y los clasifica.
+    Retorna: (ceros, polos) como arreglos ordenados
+    """
+    xs = np.linspace(float(ventana[0]), float(ventana[1]), n)
+    ys = evaluar(xs)
+    exactos = xs[ys == 0]
+
+    finito = np.isfinite(ys)
+    cambio = finito[:-1] & finito[1:] & (np.sign(ys[:-1]) * np.sign(ys[1:]) < 0)
+    idx = np.flatnonzero(cambio)
+    if idx.size == 0:
+        return exactos, np.array([])
+
+    c = _biseccion_vectorizada(evaluar, xs[idx], xs[idx + 1], ys[idx])
+    fc = np.abs(evaluar(c))
+    extremos = np.minimum(np.abs(ys[idx]), np.abs(ys[idx + 1]))
+    # En un cero |f(c)| es mínimo; en un polo crece por encima de los extremos
+    es_polo = ~(fc <= extremos) | ~np.isfinite(fc)
+    ceros = np.sort(np.concatenate([exactos, c[~es_polo]]))
+    return ceros, np.sort(c[es_polo])
+
+
+def brent(f, a, b, fa, fb, xtol=1e-14, max_iter=100):
+    """
+    Método de Brent (bisección + secante + interpolación cuadrática inversa)
+    sobre un intervalo [a, b] con f(a)·f(b) < 0. f es escalar.
+    Retorna la raíz, o None si f deja de estar definida dentro del intervalo.
+    """
+    eps = np.finfo(float).eps
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+    c, fc = b, fb
+    d = e = b - a
+    for _ in range(max_iter):
+        if (fb > 0) == (fc > 0):
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        tol = 2 * eps * abs(b) + 0.5 * xtol
+        m = 0.5 * (c - b)
+        if abs(m) <= tol or fb == 0:
+            return b
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                p, q = 2 * m * s, 1 - s
+            else:
+                q, r = fa / fc, fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            else:
+                p = -p
+            if 2 * p < min(3 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+        a, fa = b, fb
+        b += d if abs(d) > tol else (tol if m > 0 else -tol)
+        fb = f(b)
+        if not np.isfinite(fb):
+            return None
+    return b
+
+
+def _minimo_dorado(f, a, b, iteraciones=60):
+    """Sección dorada: mínimo de f en [a, b] (f unimodal)."""
+    razon = (np.sqrt(5) - 1) / 2
+    c, d = b - razon * (b - a), a + razon * (b - a)
+    fc, fd = f(c), f(d)
+    for _ in range(iteraciones):
+        if fc < fd:
+            b, d, fd = d, c, fc
+            c = b - razon * (b - a)
+            fc = f(c)
+        else:
+            a, c, fc = c, d, fd
+            d = a + razon * (b - a)
+            fd = f(d)
+    return (a + b) / 2
+
+
+def _rachas_nulas(ys):
+    """Rachas de muestras consecutivas con f == 0. Retorna: (inicios, finales) como índices."""
+    nulo = ys == 0
+    if not nulo.any():
+        return np.array([], dtype=int), np.array([], dtype=int)
+    salto = np.diff(nulo.astype(np.int8))
+    inicios = np.flatnonzero(salto == 1) + 1
+    finales = np.flatnonzero(salto == -1)
+    if nulo[0]:
+        inicios = np.concatenate([[0], inicios])
+    if nulo[-1]:
+        finales = np.concatenate([finales, [ys.size - 1]])
+    return inicios, finales
+
+
+def _confirmar_rachas(xs, inicios, finales, es_cero):
+    """
+    Contrasta cada racha de ceros con la expresión exacta en su inicio, su
+    punto medio y su final: exp(-x^4) da 0.0 en la malla lejos del origen por
+    desbordamiento inferior, sin anularse. Sin es_cero se confía en la malla.
+    Retorna: matriz (3, rachas) de bool
+    """
+    puntos = np.concatenate([xs[inicios], xs[(inicios + finales) // 2], xs[finales]])
+    if es_cero is None:
+        return np.ones((3, inicios.size), dtype=bool)
+    return np.asarray(es_cero(puntos), dtype=bool).reshape(3, -1)
+
+
+def _ceros_exactos(evaluar, xs, ys, es_cero=None):
+    """
+    Ceros exactos de la malla. Un cero aislado es una raíz; una racha de
+    ceros consecutivos (abs(x) - x, floor(x), x - x) es un intervalo donde
+    f se anula y se reporta solo por sus extremos, refinados por bisección
+    salvo cuando coinciden con el borde de la ventana. Una racha que la
+    expresión exacta no confirma (desbordamiento inferior) solo aporta los
+    puntos revisados que sí son ceros (x^(10^10) en x = 0).
+    Retorna: arreglo de posiciones
+    """
+    inicios, finales = _rachas_nulas(ys)
+    if inicios.size == 0:
+        return np.array([])
+
+    aislados = inicios == finales
+    ceros = [xs[inicios[aislados]]]
+    inicios, finales = inicios[~aislados], finales[~aislados]
+    if inicios.size:
+        confirmados = _confirmar_rachas(xs, inicios, finales, es_cero)
+        meseta = confirmados.all(axis=0)
+        revisados = np.stack([inicios, (inicios + finales) // 2, finales])
+        ceros.append(xs[revisados[:, ~meseta][confirmados[:, ~meseta]]])
+        inicios, finales = inicios[meseta], finales[meseta]
+
+    marca = lambda t: np.where(evaluar(t) == 0, 1.0, -1.0)
+    # Bordes de cada meseta: entre la última muestra no nula y la primera nula
+    izq = inicios[inicios > 0]
+    der = finales[finales < xs.size - 1]
+    if izq.size:
+        ceros.append(_biseccion_vectorizada(marca, xs[izq - 1], xs[izq], np.full(izq.size, -1.0)))
+    if der.size:
+        ceros.append(_biseccion_vectorizada(marca, xs[der], xs[der + 1], np.full(der.size, 1.0)))
+    ceros.append(xs[inicios[inicios == 0]])
+    ceros.append(xs[finales[finales == xs.size - 1]])
+    return np.concatenate(ceros)
+
+
+def raices(evaluar, ventana=VENTANA_APROXIMACION, n=_PUNTOS_MALLA, es_cero=None):
+    """
+    Raíces reales de f dentro de la ventana. es_cero(xs) -> bool, si se
+    entrega, confirma con la expresión exacta los ceros que forman mesetas.
+    1. Evalúa f en una malla y detecta todos los cambios de signo a la vez.
+    2. Refina cada intervalo con Brent y descarta los que resultan ser polos.
+    3. Agrega ceros exactos de la malla (de una meseta nula, solo sus extremos)
+       y raíces dobles (mínimos locales de |f| ≈ 0).
+    Retorna: arreglo ordenado de raíces
+    """
+    a, b = float(ventana[0]), float(ventana[1])
+    xs = np.linspace(a, b, n)
+    ys = evaluar(xs)
+    escalar = lambda t: float(evaluar(np.array([t]))[0])
+    tol_x = 1e-12 * max(1.0, abs(a), abs(b))
+
+    encontradas = list(_ceros_exactos(evaluar, xs, ys, es_cero))
+
+    finito = np.isfinite(ys)
+    cambio = finito[:-1] & finito[1:] & (np.sign(ys[:-1]) * np.sign(ys[1:]) < 0)
+    for i in np.flatnonzero(cambio):
+        r = brent(escalar, xs[i], xs[i + 1], ys[i], ys[i + 1])
+        if r is None:
+            continue
+        # En un polo |f| crece al acercarse; en una raíz decrece
+        if abs(escalar(r)) <= min(abs(ys[i]), abs(ys[i + 1])):
+            encontradas.append(r)
+
+    absoluto = np.where(finito, np.abs(ys), np.inf)
+    escala = np.max(absoluto[finito]) if finito.any() else 1.0
+    minimo = np.zeros(n, dtype=bool)
+    minimo[1:-1] = (absoluto[1:-1] < absoluto[:-2]) & (absoluto[1:-1] < absoluto[2:])
+    minimo[1:-1] &= ~cambio[:-1] & ~cambio[1:] & (ys[1:-1] != 0)
+    for i in np.flatnonzero(minimo):
+        r = _minimo_dorado(lambda t: abs(escalar(t)), xs[i - 1], xs[i + 1])
+        if abs(escalar(r)) <= 1e-10 * max(1.0, escala):
+            encontradas.append(r)
+
+    if not encontradas:
+        return np.array([])
+    encontradas = np.sort(np.array(encontradas, dtype=float))
+    encontradas[np.abs(encontradas) < tol_x] = 0.0
+    # Una raíz en el borde de dos intervalos aparece dos veces
+    unicas = encontradas[np.concatenate([[True], np.diff(encontradas) > 1e3 * tol_x])]
+    return unicas
+
+
+def conjunto_finito(valores, decimales=10):
+    if len(valores) == 0:
+        return EmptySet
+    return FiniteSet(*(Float(round(float(v), decimales)) for v in valores))
+
+
+def dominio_aproximado(evaluar, ventana=VENTANA_APROXIMACION, n=_PUNTOS_MALLA):
+    """
+    Dominio estimado a partir de dónde la función toma valores finitos en la
+    ventana. Los tramos que tocan un borde de la ventana se extienden a ±∞.
+    """
+    a, b = float(ventana[0]), float(ventana[1])
+    xs = np.linspace(a, b, n)
+    definido = np.isfinite(evaluar(xs))
+    if not definido.any():
+        return EmptySet
+
+    # Bordes entre muestras definidas y no definidas, refinados por bisección
+    borde = np.flatnonzero(definido[:-1] != definido[1:])
+    if borde.size:
+        marca = lambda t: np.where(np.isfinite(evaluar(t)), 1.0, -1.0)
+        refinados = _biseccion_vectorizada(marca, xs[borde], xs[borde + 1],
+                                           np.where(definido[borde], 1.0, -1.0))
+    else:
+        refinados = np.array([])
+
+    # Cada borde (redondeado) se incluye en el tramo solo si f es finita en él
+    refinados = np.round(refinados, 10)
+    incluido = np.isfinite(evaluar(refinados)) if refinados.size else np.array([], dtype=bool)
+    tramos = []
+    inicio, abierto = (-oo, True) if definido[0] else (None, True)
+    for i, t, cerrado in zip(borde, refinados, incluido):
+        t = Float(float(t))
+        if definido[i]:
+            tramos.append(Interval(inicio, t, abierto, not cerrado))
+            inicio = None
+        else:
+            inicio, abierto = t, not cerrado
+    if inicio is not None:
+        tramos.append(Interval(inicio, oo, abierto, True))
+
+    _, polos = cambios_de_signo(evaluar, ventana, n)
+    dominio = Union(*tramos)
+    if polos.size:
+        dominio = dominio - conjunto_finito(polos)
+    return dominio
+
+
+# ------------------ recorrido (imagen) numérico ------------------
+_COLA_MAXIMA = 1e12          # las colas de la malla llegan hasta ±1e12
+_PUNTOS_COLA = 300
+_PASOS_APROXIMACION = 21     # acercamientos a cada extremo de un tramo (medias décadas)
+
+
+def _tiende_a_infinito(valores):
+    """
+    ¿La sucesión (acercándose a un extremo) diverge? Se exige que sea
+    monótona y que sus incrementos no se achiquen: así log diverge, 1/x
+    también, pero sin(x) (oscila) y atan(x) (incrementos geométricamente
+    menores) no.
+    """
+    finitos = valores[np.isfinite(valores)]
+    if finitos.size < 4:
+        return False
+    saltos = np.diff(finitos)
+    if not (np.all(saltos > 0) or np.all(saltos < 0)):
+        return False
+    if abs(finitos[-1]) > 1e100:
+        return True
+    return abs(saltos[-1]) >= 0.3 * abs(saltos[0]) and abs(saltos[-1]) > 1e-9 * (1 + abs(finitos[-1]))
+
+
+def _extremo(evaluar, borde, interior, hacia_infinito=False):
+    """
+    Comportamiento de f al acercarse a un extremo de un tramo desde `interior`.
+    Retorna: ("infinito", signo) o ("limite", valor aproximado)
+    """
+    if hacia_infinito:
+        signo_x = np.sign(borde)
+        puntos = signo_x * np.logspace(3, np.log10(_COLA_MAXIMA), _PASOS_APROXIMACION)
+    else:
+        h = abs(interior - borde)
+        puntos = borde + np.sign(interior - borde) * h * 10.0 ** (-np.arange(_PASOS_APROXIMACION) / 2)
+    valores = evaluar(puntos)
+    if _tiende_a_infinito(valores):
+        return "infinito", float(np.sign(valores[np.isfinite(valores)][-1]))
+    finitos = valores[np.isfinite(valores)]
+    return ("limite", float(finitos[-1])) if finitos.size else ("limite", None)
+
+
+def _redondear(v, decimales=10):
+    return Float(round(float(v), decimales))
+
+
+def _oscila(ys):
+    """¿f cambia de signo o entra y sale del dominio más de una vez en la cola?"""
+    finito = np.isfinite(ys)
+    if np.count_nonzero(finito[:-1] != finito[1:]) > 1:
+        return True
+    signos = np.sign(ys[finito])
+    return bool(np.any(signos[:-1] * signos[1:] < 0))
+
+
+def _alcanzado_fuera(xs, ys, punto, valor, h):
+    """¿f toma el valor en la malla lejos del punto (a más de 2h)?"""
+    resta = ys - valor
+    lejos = np.abs(xs - punto) > 2 * h
+    if np.any(lejos & (resta == 0)):
+        return True
+    par = lejos[:-1] & lejos[1:] & np.isfinite(resta[:-1]) & np.isfinite(resta[1:])
+    # Los pares que rodean al punto quedan fuera aunque sus extremos estén lejos
+    par &= ~((xs[:-1] < punto) & (xs[1:] > punto))
+    return bool(np.any(par & (np.sign(resta[:-1]) * np.sign(resta[1:]) < 0)))
+
+
+def recorrido_aproximado(evaluar, evaluar_derivada=None, ventana=VENTANA_APROXIMACION, n=_PUNTOS_MALLA,
+                         huecos=None, vale=None):
+    """
+    Recorrido de f en todo R (no solo en la ventana):
+    1. Malla densa en la ventana y colas geométricas hasta ±1e12 (salvo
+       donde f oscila: ahí las muestras saltan de un período a otro).
+    2. Parte la malla en tramos continuos (se corta donde f no está definida
+       y en los polos con cambio de signo).
+    3. En cada tramo: puntos críticos (cambios de signo de f', bisección
+       vectorizada), valores de la malla y el comportamiento en cada extremo
+       (borde del dominio, polo o ±∞: límite o divergencia).
+    4. Une los intervalos de todos los tramos y quita el límite de cada hueco
+       (posiciones, límites) que f no toma en otro punto.
+    vale(xs, valores) -> bool, si se entrega, confirma con la expresión
+    exacta que f toma de verdad el valor de cada meseta de la malla (y no
+    solo se redondea a él).
+    Retorna: conjunto de SymPy (Interval, Union, FiniteSet o EmptySet)
+    """
+    a, b = float(ventana[0]), float(ventana[1])
+    cola = np.geomspace(max(abs(a), abs(b), 1.0), _COLA_MAXIMA, _PUNTOS_COLA)
+    partes, oscila = [np.linspace(a, b, n)], {}
+    for lado in (-1, 1):
+        oscila[lado] = _oscila(evaluar(lado * cola))
+        if not oscila[lado]:
+            partes.append(lado * cola)
+    xs = np.unique(np.concatenate(partes))
+    ys = evaluar(xs)
+    finito = np.isfinite(ys)
+    if not finito.any():
+        return EmptySet
+
+    # Polos con cambio de signo entre dos muestras definidas
+    cambio = finito[:-1] & finito[1:] & (np.sign(ys[:-1]) * np.sign(ys[1:]) < 0)
+    idx = np.flatnonzero(cambio)
+    corte = np.zeros(xs.size - 1, dtype=bool)
+    posicion_polo = {}
+    if idx.size:
+        c = _biseccion_vectorizada(evaluar, xs[idx], xs[idx + 1], ys[idx])
+        fc = np.abs(evaluar(c))
+        es_polo = ~(fc <= np.minimum(np.abs(ys[idx]), np.abs(ys[idx + 1])))
+        corte[idx[es_polo]] = True
+        posicion_polo = dict(zip(idx[es_polo].tolist(), c[es_polo].tolist()))
+
+    # Bordes del dominio (definido -> indefinido) refinados por bisección
+    borde = np.flatnonzero(finito[:-1] != finito[1:])
+    posicion_borde = {}
+    if borde.size:
+        marca = lambda t: np.where(np.isfinite(evaluar(t)), 1.0, -1.0)
+        refinados = _biseccion_vectorizada(marca, xs[borde], xs[borde + 1],
+                                           np.where(finito[borde], 1.0, -1.0))
+        posicion_borde = dict(zip(borde.tolist(), refinados.tolist()))
+
+    # Tramos: rangos [i0, i1] de índices definidos sin polos en medio
+    separa = ~(finito[:-1] & finito[1:]) | corte
+    inicios = np.concatenate([[0], np.flatnonzero(separa) + 1])
+    finales = np.concatenate([np.flatnonzero(separa), [xs.size - 1]])
+
+    # Mesetas: un valor repetido en muestras vecinas se alcanza en todo el
+    # tramo (abs(x) - x vale 0 en x >= 0). Solo dentro de la ventana, porque
+    # en las colas el redondeo repite el límite; y aun dentro, el redondeo
+    # fabrica mesetas (exp(-x^4) da 0.0 lejos del origen, 1/(1+exp(x^3))
+    # da 1.0 para x < -4). Se revisan inicio, medio y final de cada meseta
+    # con la expresión exacta. El 0 exacto se distingue de cualquier valor
+    # diminuto, así que cada punto confirmado cuenta (x^(10^10) se anula en
+    # el medio); otro valor solo se distingue de su redondeo cerca del borde
+    # de la meseta, así que se exigen los tres puntos
+    en_ventana = (xs >= a) & (xs <= b)
+    igual = np.concatenate([en_ventana[:-1] & en_ventana[1:] & (ys[:-1] == ys[1:]), [False]])
+    m0, m1 = _rachas_nulas(np.where(igual, 0.0, 1.0))
+    m1 = m1 + 1  # la racha de pares k..m cubre las muestras k..m+1
+    revisados = np.stack([m0, (m0 + m1) // 2, m1])
+    confirmados = np.ones(revisados.shape, dtype=bool)
+    if vale is not None and m0.size:
+        confirmados = np.asarray(vale(xs[revisados].ravel(), ys[revisados].ravel()),
+                                 dtype=bool).reshape(revisados.shape)
+        confirmados &= (ys[m0] == 0) | confirmados.all(axis=0)
+    posicion_meseta, valor_meseta = xs[revisados[confirmados]], ys[revisados[confirmados]]
+
+    derivadas = evaluar_derivada(xs) if evaluar_derivada is not None else None
+    intervalos = []
+    for i0, i1 in zip(inicios, finales):
+        if not finito[i0]:
+            continue
+        # Valores alcanzados: extremos locales estrictos de la malla y mesetas (los
+        # extremos del tramo solo se acercan a su valor, salvo en un borde cerrado)
+        tramo = ys[i0:i1 + 1]
+        if np.ptp(tramo) == 0:
+            valores = [tramo[:1]]
+        else:
+            interior = tramo[1:-1]
+            margen = 1e-12 * (1 + np.abs(interior))  # no confundir ruido de redondeo con extremos
+            izq, der = tramo[:-2] - interior, tramo[2:] - interior
+            local = ((izq > margen) & (der > margen)) | ((izq < -margen) & (der < -margen))
+            valores = [interior[local]]
+        valores.append(valor_meseta[(posicion_meseta >= xs[i0]) & (posicion_meseta <= xs[i1])])
+        # Los extremos de la malla junto a un borde o un polo también se alcanzan
+        # (en las colas, en cambio, f ya coincide numéricamente con su límite)
+        valores.append(tramo[[0, -1]][np.array([i0 > 0, i1 < xs.size - 1])])
+        abiertos = []            # valores a los que f solo se acerca
+        infinitos = set()        # -1.0 / 1.0
+
+        # Puntos críticos: cambios de signo de f' dentro del tramo
+        if derivadas is not None and i1 > i0:
+            d = derivadas[i0:i1 + 1]
+            # Se descartan los cambios de signo que son solo ruido de cancelación
+            # (f ya plana en las colas)
+            ruido = 1e-12 * (1 + np.abs(tramo)) / np.maximum(1.0, np.abs(xs[i0:i1 + 1]))
+            d = np.where(np.abs(d) > ruido, d, 0.0)
+            ok = np.isfinite(d[:-1]) & np.isfinite(d[1:]) & (np.sign(d[:-1]) * np.sign(d[1:]) < 0)
+            j = np.flatnonzero(ok) + i0
+            # Ceros exactos de f' en la malla (no en mesetas por redondeo)
+            exacto = (d[1:-1] == 0) & (np.sign(d[:-2]) * np.sign(d[2:]) < 0)
+            valores.append(tramo[1:-1][exacto])
+            if j.size:
+                criticos = _biseccion_vectorizada(evaluar_derivada, xs[j], xs[j + 1], derivadas[j])
+                valores.append(evaluar(criticos))
+
+        # Extremos del tramo
+        for i, vecino, lado in ((i0, i0 - 1, -1), (i1, i1 + 1, 1)):
+            if (vecino < 0 or vecino >= xs.size) and oscila[lado]:
+                # Sin límite en ±∞: el tramo solo aporta el valor en el borde de la ventana
+                valores.append(ys[i:i + 1])
+                continue
+            if vecino < 0 or vecino >= xs.size:
+                tipo, v = _extremo(evaluar, lado * _COLA_MAXIMA, xs[i], hacia_infinito=True)
+            else:
+                k = min(i, vecino)
+                if k in posicion_polo:
+                    tipo, v = _extremo(evaluar, posicion_polo[k], xs[i])
+                else:
+                    pos = posicion_borde.get(k, xs[vecino])
+                    en_borde = evaluar(np.array([pos]))
+                    if np.isfinite(en_borde[0]):
+                        valores.append(en_borde)  # borde cerrado: f alcanza el valor
+                    tipo, v = _extremo(evaluar, pos, xs[i])
+            if tipo == "infinito":
+                infinitos.add(v)
+            elif v is not None:
+                abiertos.append(v)
+
+        alcanzados = np.concatenate(valores)
+        alcanzados = alcanzados[np.isfinite(alcanzados)]
+        candidatos = np.concatenate([alcanzados, abiertos])
+        inf_bajo = -1.0 in infinitos
+        inf_alto = 1.0 in infinitos
+        if candidatos.size == 0:
+            # Sin valores finitos (x, x^3 sin puntos críticos): f va de -∞ a +∞
+            if inf_bajo and inf_alto:
+                intervalos.append(Interval(-oo, oo))
+            continue
+        bajo, alto = candidatos.min(), candidatos.max()
+        lo = -oo if inf_bajo else _redondear(bajo)
+        hi = oo if inf_alto else _redondear(alto)
+        lo_abierto = inf_bajo or not np.any(np.abs(alcanzados - bajo) <= 1e-9 * max(1.0, abs(bajo)))
+        hi_abierto = inf_alto or not np.any(np.abs(alcanzados - alto) <= 1e-9 * max(1.0, abs(alto)))
+        intervalos.append(Interval(lo, hi, lo_abierto, hi_abierto))
+
+    recorrido = Union(*intervalos) if intervalos else EmptySet
+    if huecos is not None:
+        h = (b - a) / (n - 1)
+        # (x^2 - 1)/(x - 1) vale x + 1 salvo en x = 1: el 2 no se alcanza
+        faltan = [_redondear(limite) for punto, limite in zip(*huecos)
+                  if not _alcanzado_fuera(xs, ys, punto, limite, h)]
+        if faltan:
+            recorrido = recorrido - FiniteSet(*faltan)
+    return recorrido
+
+
+# ------------------ polos (asíntotas verticales) ------------------
+def _minimo_dorado_vectorizado(f, a, b, iteraciones=60):
+    """Sección dorada simultánea sobre todos los intervalos [a, b] (f vectorizada)."""
+    razon = (np.sqrt(5) - 1) / 2
+    a, b = a.copy(), b.copy()
+    c, d = b - razon * (b - a), a + razon * (b - a)
+    fc, fd = f(c), f(d)
+    for _ in range(iteraciones):
+        izquierda = ~(fc >= fd)  # NaN cuenta como mayor: se descarta ese lado
+        b = np.where(izquierda, d, b)
+        a = np.where(izquierda, a, c)
+        c, d = b - razon * (b - a), a + razon * (b - a)
+        fc, fd = f(c), f(d)
+    return (a + b) / 2
+
+
+def _explota(evaluar, candidatos, h):
+    """
+    ¿|f| crece sin cota al acercarse a cada candidato? Se compara |f| a
+    distancia h/100 y h/1e5 por cada lado; basta que un lado crezca (el otro
+    puede estar fuera del dominio). Una singularidad evitable no crece.
+    """
+    lejos, cerca = h * 1e-2, h * 1e-5
+    puntos = np.concatenate([candidatos - lejos, candidatos - cerca,
+                             candidatos + lejos, candidatos + cerca])
+    izq_lejos, izq_cerca, der_lejos, der_cerca = np.abs(evaluar(puntos)).reshape(4, -1)
+    with np.errstate(invalid="ignore"):
+        crece_izq = izq_cerca > 10 * izq_lejos
+        crece_der = der_cerca > 10 * der_lejos
+    return crece_izq | crece_der
+
+
+def _ceros_denominador(evaluar_denominador, ventana, n):
+    """
+    Ceros del denominador dentro de la ventana, en una pasada vectorizada:
+    cambios de signo, ceros exactos, mínimos locales de |den| casi nulos
+    (polos dobles, como 1/sin(x)^2) y bordes donde el denominador deja de
+    estar definido, refinados todos a la vez (bisección y sección dorada).
+    Retorna: (arreglo ordenado de posiciones, espaciado de la malla)
+    """
+    a, b = float(ventana[0]), float(ventana[1])
+    xs = np.linspace(a, b, n)
+    den = evaluar_denominador(xs)
+    finito = np.isfinite(den)
+    h = xs[1] - xs[0]
+    if not finito.any():
+        return np.array([]), h
+    candidatos = [xs[den == 0]]
+
+    cambio = np.flatnonzero(finito[:-1] & finito[1:] & (np.sign(den[:-1]) * np.sign(den[1:]) < 0))
+    if cambio.size:
+        candidatos.append(_biseccion_vectorizada(evaluar_denominador, xs[cambio],
+                                                 xs[cambio + 1], den[cambio]))
+
+    absoluto = np.where(finito, np.abs(den), np.inf)
+    escala = absoluto[finito].max()
+    minimo = np.flatnonzero((absoluto[1:-1] < absoluto[:-2]) & (absoluto[1:-1] < absoluto[2:])
+                            & (absoluto[1:-1] > 0)) + 1
+    if minimo.size:
+        c = _minimo_dorado_vectorizado(lambda t: np.abs(evaluar_denominador(t)),
+                                       xs[minimo - 1], xs[minimo + 1])
+        candidatos.append(c[np.abs(evaluar_denominador(c)) <= 1e-8 * max(1.0, escala)])
+
+    borde = np.flatnonzero(finito[:-1] != finito[1:])
+    if borde.size:
+        marca = lambda t: np.where(np.isfinite(evaluar_denominador(t)), 1.0, -1.0)
+        candidatos.append(_biseccion_vectorizada(marca, xs[borde], xs[borde + 1],
+                                                 np.where(finito[borde], 1.0, -1.0)))
+
+    candidatos = np.sort(np.concatenate(candidatos))
+    candidatos = candidatos[(candidatos > a) & (candidatos < b)]
+    if candidatos.size == 0:
+        return candidatos, h
+    # Un mismo cero puede llegar por varias vías
+    tol = 1e-9 * max(1.0, abs(a), abs(b))
+    return candidatos[np.concatenate([[True], np.diff(candidatos) > tol])] + 0.0, h  # sin -0.0
+
+
+def polos(evaluar, evaluar_denominador, ventana=VENTANA_APROXIMACION, n=_PUNTOS_MALLA):
+    """
+    Asíntotas verticales de f dentro de la ventana: ceros del denominador
+    en los que |f| crece al acercarse (se descartan las evitables).
+    Retorna: arreglo ordenado de posiciones
+    """
+    candidatos, h = _ceros_denominador(evaluar_denominador, ventana, n)
+    if candidatos.size == 0:
+        return candidatos
+    return candidatos[_explota(evaluar, candidatos, h)]
+
+
+def huecos(evaluar, evaluar_denominador, ventana=VENTANA_APROXIMACION, n=_PUNTOS_MALLA):
+    """
+    Singularidades evitables dentro de la ventana: ceros del denominador de
+    la expresión escrita en los que f (ya simplificada) sigue acotada, como
+    x = 1 en (x^2 - 1)/(x - 1).
+    Retorna: (posiciones, límite de f en cada una) como arreglos
+    """
+    candidatos, h = _ceros_denominador(evaluar_denominador, ventana, n)
+    if candidatos.size == 0:
+        return candidatos, candidatos
+    # El denominador tiene que anularse de verdad (el mínimo de exp(x^2) no es un hueco)
+    den = np.abs(evaluar_denominador(np.concatenate([candidatos, candidatos - h, candidatos + h])))
+    en_cero, izq, der = den.reshape(3, -1)
+    with np.errstate(invalid="ignore"):
+        nulo = en_cero <= 1e-6 * np.fmax(izq, der)
+    candidatos = candidatos[nulo]
+    candidatos = candidatos[~_explota(evaluar, candidatos, h)]
+    cerca = h * 1e-5
+    izq, der = evaluar(np.concatenate([candidatos - cerca, candidatos + cerca])).reshape(2, -1)
+    # Promedio de ambos lados: el error de primer orden se cancela
+    limites = np.where(np.isfinite(izq) & np.isfinite(der), (izq + der) / 2,
+                       np.where(np.isfinite(izq), izq, der))
+    # Un hueco necesita f definida al menos a un lado (si no, es el borde del dominio)
+    acotado = np.isfinite(limites)
+    return candidatos[acotado], limites[acotado]
@@ -0,0 +1,24 @@
+"""
+Precalentamiento en segundo plano: importa SymPy y el modelo, recorre el
+parser de la gramática y el compilador, y arranca el servidor de procesos
+del presupuesto con una entrada que usa el respaldo de parse_expr, para
+que el primer análisis no pague esos costos.
+"""
+
+
+def precalentar():
+    from Model import analisis, grafico
+
+    # Recorre el parser propio y el compilador una vez, sin tocar la caché
+    expr = grafico._parsear("2x^2 + sin(x)/ln(x) - sqrt(x)")
+    grafico._compilar(expr)
+    grafico._compilar(grafico.diff(expr, grafico.x))
+    analisis._recorrido_heuristico(expr)
+
+    # Fuera de la gramática: parse_expr corre en un proceso hijo con presupuesto.
+    # El primer hijo arranca el forkserver con sympy y Model.grafico precargados
+    # y queda ocioso, listo para atender el primer análisis
+    try:
+        grafico._parsear("abs(x) + exp(x)")
+    except Exception:
+        pass
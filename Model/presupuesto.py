@@ -0,0 +1,206 @@
+import multiprocessing as mp
+import os
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: sin límite de memoria por proceso
+    resource = None
+
+from Model import traza
+
+# ------------------ límites por defecto de cada operación simbólica ------------------
+TIEMPO_LIMITE = 8.0        # segundos de reloj
+MEMORIA_LIMITE_MB = 1024   # memoria adicional permitida al proceso hijo
+EN_SUBPROCESO = True       # False: se ejecuta en el mismo proceso, sin límites
+
+_PRECARGA = ["sympy", "Model.grafico"]
+_contexto = None
+_lock = threading.Lock()
+_local = threading.local()
+_libres = []   # hijos ociosos (tantos como hilos que llamaron a la vez)
+
+
+class PresupuestoAgotado(Exception):
+    """La operación superó el tiempo o la memoria asignados."""
+
+
+class OperacionCancelada(BaseException):
+    """
+    La operación fue cancelada desde afuera. Hereda de BaseException para
+    atravesar los `except Exception` del modelo sin quedar cacheada.
+    """
+
+
+def configurar(tiempo=None, memoria_mb=None, en_subproceso=None):
+    global TIEMPO_LIMITE, MEMORIA_LIMITE_MB, EN_SUBPROCESO
+    if tiempo is not None:
+        TIEMPO_LIMITE = float(tiempo)
+    if memoria_mb is not None:
+        MEMORIA_LIMITE_MB = int(memoria_mb)
+    if en_subproceso is not None:
+        EN_SUBPROCESO = bool(en_subproceso)
+
+
+class cancelable:
+    """
+    Contexto que asocia al hilo actual una función cancelado() -> bool.
+    Las operaciones con presupuesto la consultan mientras esperan al hijo.
+    """
+
+    def __init__(self, cancelado):
+        self.cancelado = cancelado
+
+    def __enter__(self):
+        self._anterior = getattr(_local, "cancelado", None)
+        _local.cancelado = self.cancelado
+        return self
+
+    def __exit__(self, *exc):
+        _local.cancelado = self._anterior
+        return False
+
+
+def _obtener_contexto():
+    # forkserver: cada hijo nace de un servidor con SymPy ya importado
+    global _contexto
+    with _lock:
+        if _contexto is None:
+            if "forkserver" in mp.get_all_start_methods():
+                _contexto = mp.get_context("forkserver")
+                _contexto.set_forkserver_preload(_PRECARGA)
+            else:
+                _contexto = mp.get_context("spawn")
+        return _contexto
+
+
+def limitar_memoria(memoria_mb):
+    """Limita el espacio de direcciones del proceso actual a su tamaño + memoria_mb."""
+    if resource is None or not memoria_mb:
+        return
+    try:
+        with open("/proc/self/statm") as f:
+            actual = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return
+    limite = actual + memoria_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limite, limite))
+
+
+class _Trabajador:
+    """
+    Proceso hijo persistente que atiende llamadas (funcion, args) una tras
+    otra. El límite de memoria se aplica una sola vez al arrancar; el hijo se
+    descarta solo cuando una llamada agota el tiempo, la memoria o se cancela.
+    """
+
+    def __init__(self, memoria_mb):
+        ctx = _obtener_contexto()
+        self.memoria_mb = memoria_mb
+        self.conexion, hijo = ctx.Pipe()
+        self.proceso = ctx.Process(target=_atender, args=(hijo, memoria_mb), daemon=True)
+        self.proceso.start()
+        hijo.close()
+
+    def descartar(self):
+        if self.proceso.is_alive():
+            self.proceso.kill()
+        self.proceso.join()
+        self.conexion.close()
+
+
+def _tomar_trabajador(memoria_mb):
+    with _lock:
+        for i, trabajador in enumerate(_libres):
+            if trabajador.memoria_mb == memoria_mb:
+                return _libres.pop(i)
+    return _Trabajador(memoria_mb)
+
+
+def _devolver_trabajador(trabajador):
+    with _lock:
+        _libres.append(trabajador)
+
+
+def cerrar():
+    """Termina los procesos hijos ociosos."""
+    with _lock:
+        trabajadores = _libres[:]
+        _libres.clear()
+    for trabajador in trabajadores:
+        trabajador.descartar()
+
+
+def _atender(conexion, memoria_mb):
+    global EN_SUBPROCESO
+    EN_SUBPROCESO = False  # el hijo ya tiene presupuesto: las llamadas anidadas corren aquí
+    limitar_memoria(memoria_mb)
+    while True:
+        try:
+            funcion, args = conexion.recv()
+        except EOFError:
+            return
+        try:
+            conexion.send(("ok", funcion(*args)))
+        except MemoryError:
+            # Tras un MemoryError el hijo puede quedar inconsistente: se descarta
+            conexion.send(("memoria", PresupuestoAgotado("Memoria agotada.")))
+            return
+        except BaseException as e:
+            try:
+                conexion.send(("error", e))
+            except Exception:
+                conexion.send(("error", RuntimeError(repr(e))))
+
+
+def ejecutar(funcion, *args, tiempo=None, memoria_mb=None):
+    """
+    Ejecuta funcion(*args) en un proceso hijo con límite de tiempo y memoria.
+    Los hijos se reutilizan entre llamadas (ver _Trabajador).
+    funcion debe poder serializarse (definida a nivel de módulo).
+    Lanza PresupuestoAgotado si se excede el presupuesto y
+    OperacionCancelada si el hilo actual fue cancelado mientras esperaba.
+    """
+    cancelado = getattr(_local, "cancelado", None)
+    if cancelado is not None and cancelado():
+        raise OperacionCancelada()
+    traza.contar(funcion.__name__.lstrip("_"))
+    if not EN_SUBPROCESO:
+        return funcion(*args)
+
+    tiempo = TIEMPO_LIMITE if tiempo is None else tiempo
+    memoria_mb = MEMORIA_LIMITE_MB if memoria_mb is None else memoria_mb
+
+    trabajador = _tomar_trabajador(memoria_mb)
+    receptor, proceso = trabajador.conexion, trabajador.proceso
+    sano = False
+    limite = time.monotonic() + tiempo
+    try:
+        try:
+            receptor.send((funcion, args))
+        except (BrokenPipeError, OSError):
+            raise PresupuestoAgotado("El proceso terminó sin responder (¿memoria agotada?).")
+        while True:
+            if receptor.poll(0.02):
+                try:
+                    estado, valor = receptor.recv()
+                except EOFError:
+                    raise PresupuestoAgotado("El proceso terminó sin responder (¿memoria agotada?).")
+                break
+            if cancelado is not None and cancelado():
+                raise OperacionCancelada()
+            if time.monotonic() > limite:
+                raise PresupuestoAgotado(f"Tiempo agotado ({tiempo:g} s).")
+            if not proceso.is_alive() and not receptor.poll():
+                raise PresupuestoAgotado("El proceso terminó sin responder (¿memoria agotada?).")
+        sano = estado != "memoria"
+    finally:
+        if sano:
+            _devolver_trabajador(trabajador)
+        else:
+            trabajador.descartar()
+
+    if estado != "ok":
+        raise valor
+    return valor
@@ -0,0 +1,157 @@
+"""
+Parser de una pasada para la gramática de la calculadora.
+
+Tokens: números (1, 2.5, .5, 1e-3), x, pi, e/E, + - * / ^ **, paréntesis y
+las funciones sin cos tan log ln sqrt (siempre con paréntesis). La
+multiplicación implícita (2x, 2(x+1), (x+1)(x-1), 2sin(x)) tiene la misma
+precedencia que *. El árbol se construye directamente con evaluate=False,
+igual que parse_expr con las transformaciones del modelo.
+
+Precedencias (como en Python): + - < * / implícita < signo unario < ^ (a
+la derecha). Cualquier cosa fuera de la gramática lanza FueraDeGramatica y
+el llamador usa parse_expr.
+"""
+import re
+
+import sympy as sp
+
+
+class FueraDeGramatica(Exception):
+    """El texto usa algo que este parser no cubre."""
+
+
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<numero>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?) |
+    (?P<nombre>[A-Za-z_][A-Za-z0-9_]*) |
+    (?P<op>\*\*|[-+*/^()])
+)""", re.VERBOSE)
+
+_X = sp.Symbol("x")
+_CONSTANTES = {"x": _X, "pi": sp.pi, "e": sp.E, "E": sp.E}
+_FUNCIONES = {"sin": sp.sin, "cos": sp.cos, "tan": sp.tan, "log": sp.log, "ln": sp.log}
+
+# Poder de enlace de los operadores binarios
+_SUMA, _PRODUCTO, _UNARIO, _POTENCIA = 10, 20, 30, 40
+_BINARIOS = {"+": _SUMA, "-": _SUMA, "*": _PRODUCTO, "/": _PRODUCTO, "^": _POTENCIA, "**": _POTENCIA}
+_MENOS_UNO = sp.Integer(-1)
+
+
+def _tokenizar(texto):
+    tokens, pos = [], 0
+    fin = len(texto.rstrip())
+    while pos < fin:
+        m = _TOKEN.match(texto, pos)
+        if m is None:
+            raise FueraDeGramatica(f"Carácter inesperado: {texto[pos]!r}")
+        pos = m.end()
+        tipo = m.lastgroup
+        valor = m.group(tipo)
+        # 2e / 2E: ¿número científico incompleto o 2*e? Lo decide parse_expr
+        if tipo == "numero" and pos < len(texto) and texto[pos] in "eE":
+            raise FueraDeGramatica("Número ambiguo")
+        tokens.append((tipo, valor))
+    tokens.append(("fin", None))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.i = 0
+
+    def _ver(self):
+        return self.tokens[self.i]
+
+    def _tomar(self):
+        token = self.tokens[self.i]
+        self.i += 1
+        return token
+
+    def _esperar(self, valor):
+        tipo, v = self._tomar()
+        if v != valor:
+            raise FueraDeGramatica(f"Se esperaba {valor!r}")
+
+    def _inicia_primario(self):
+        tipo, valor = self._ver()
+        return tipo in ("numero", "nombre") or valor == "("
+
+    def expresion(self, minimo=0):
+        izquierda = self._prefijo()
+        while True:
+            tipo, valor = self._ver()
+            if tipo == "op" and valor in _BINARIOS:
+                poder = _BINARIOS[valor]
+                if poder <= minimo:
+                    break
+                self._tomar()
+                # ^ asocia a la derecha: el lado derecho admite otra ^
+                derecha = self.expresion(poder - 1 if poder == _POTENCIA else poder)
+                izquierda = _binario(valor, izquierda, derecha)
+            elif self._inicia_primario():
+                # Multiplicación implícita
+                if _PRODUCTO <= minimo:
+                    break
+                izquierda = _binario("*", izquierda, self.expresion(_PRODUCTO))
+            else:
+                break
+        return izquierda
+
+    def _prefijo(self):
+        tipo, valor = self._tomar()
+        if tipo == "numero":
+            return sp.Float(valor) if any(c in valor for c in ".eE") else sp.Integer(valor)
+        if tipo == "nombre":
+            if valor in _CONSTANTES:
+                return _CONSTANTES[valor]
+            if valor in _FUNCIONES or valor == "sqrt":
+                self._esperar("(")
+                argumento = self.expresion()
+                self._esperar(")")
+                if valor == "sqrt":
+                    return sp.sqrt(argumento, evaluate=False)
+                return _FUNCIONES[valor](argumento, evaluate=False)
+            raise FueraDeGramatica(f"Nombre desconocido: {valor}")
+        if valor == "(":
+            dentro = self.expresion()
+            self._esperar(")")
+            return dentro
+        if valor == "-":
+            return _negativo(self.expresion(_UNARIO))
+        if valor == "+":
+            return self.expresion(_UNARIO)
+        raise FueraDeGramatica(f"Token inesperado: {valor!r}")
+
+
+def _negativo(a):
+    # Como parse_expr: -2 es un número, -x es (-1)*x
+    return -a if a.is_Number else sp.Mul(_MENOS_UNO, a, evaluate=False)
+
+
+def _args(expr, tipo):
+    # Cadenas a + b + c quedan en un solo Add (como en parse_expr)
+    return expr.args if isinstance(expr, tipo) else (expr,)
+
+
+def _binario(op, a, b):
+    if op == "+":
+        return sp.Add(*_args(a, sp.Add), b, evaluate=False)
+    if op == "-":
+        return sp.Add(*_args(a, sp.Add), _negativo(b), evaluate=False)
+    if op == "*":
+        return sp.Mul(*_args(a, sp.Mul), b, evaluate=False)
+    if op == "/":
+        return sp.Mul(*_args(a, sp.Mul), sp.Pow(b, _MENOS_UNO, evaluate=False), evaluate=False)
+    return sp.Pow(a, b, evaluate=False)
+
+
+def parsear(texto):
+    """
+    Retorna: expresión de SymPy (evaluate=False)
+    Lanza: FueraDeGramatica
+    """
+    parser = _Parser(_tokenizar(texto))
+    expr = parser.expresion()
+    if parser._ver()[0] != "fin":
+        raise FueraDeGramatica("Sobran tokens")
+    return expr
@@ -0,0 +1,137 @@
+"""
+Trazas livianas por etapa: duración, llamadas simbólicas y evaluaciones.
+
+    t = Traza("x^2")
+    with activa(t):
+        with tramo("dominio"):
+            ...
+            anotar(muestras=len(xs))
+    t.exportar_json(ruta) / t.exportar_chrome(ruta)
+
+Fuera de `activa` los tramos no registran nada (solo cuestan un getattr).
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# ------------------ contadores globales ------------------
+# Los incrementan grafico (evaluaciones, subs) y presupuesto (cada operación
+# simbólica, por nombre). Cada tramo guarda la diferencia entre su inicio y su fin;
+# al ser globales, un tramo puede incluir trabajo de otro hilo que corra a la vez.
+CONTADORES = {"evaluar_punto": 0, "evaluar_vector": 0, "puntos_evaluados": 0}
+_candado = threading.Lock()
+_local = threading.local()
+
+
+def contar(clave, n=1):
+    with _candado:
+        CONTADORES[clave] = CONTADORES.get(clave, 0) + n
+
+
+def reiniciar_contadores():
+    with _candado:
+        for clave in CONTADORES:
+            CONTADORES[clave] = 0
+
+
+def _foto():
+    with _candado:
+        return dict(CONTADORES)
+
+
+# ------------------ traza ------------------
+class Traza:
+    """Lista de tramos de un análisis. Se puede compartir entre hilos."""
+
+    def __init__(self, titulo=""):
+        self.titulo = titulo
+        self.origen = time.perf_counter()
+        self.tramos = []
+        self._candado = threading.Lock()
+
+    def agregar(self, registro):
+        with self._candado:
+            self.tramos.append(registro)
+
+    def resumen(self):
+        """Retorna: lista de tramos ordenados por inicio (copias)."""
+        with self._candado:
+            return sorted((dict(t) for t in self.tramos), key=lambda t: t["inicio_ms"])
+
+    def a_dict(self):
+        return {"titulo": self.titulo, "tramos": self.resumen()}
+
+    def exportar_json(self, ruta):
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.a_dict(), f, indent=2, ensure_ascii=False)
+
+    def exportar_chrome(self, ruta):
+        """Formato Trace Event (chrome://tracing, Perfetto): eventos completos 'X' en µs."""
+        pid = os.getpid()
+        eventos = [{
+            "name": t["nombre"],
+            "cat": "analisis",
+            "ph": "X",
+            "ts": round(t["inicio_ms"] * 1000, 3),
+            "dur": round(t["duracion_ms"] * 1000, 3),
+            "pid": pid,
+            "tid": t["hilo"],
+            "args": {**t["contadores"], **t["atributos"]},
+        } for t in self.resumen()]
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": eventos, "displayTimeUnit": "ms",
+                       "otherData": {"titulo": self.titulo}}, f, ensure_ascii=False)
+
+
+@contextmanager
+def activa(traza):
+    """Registra en `traza` los tramos que se abran en el hilo actual."""
+    previa = getattr(_local, "traza", None)
+    _local.traza = traza
+    _local.pila = []
+    try:
+        yield traza
+    finally:
+        _local.traza = previa
+        _local.pila = []
+
+
+def traza_actual():
+    return getattr(_local, "traza", None)
+
+
+@contextmanager
+def tramo(nombre, **atributos):
+    """Mide el bloque como un tramo de la traza activa (si la hay)."""
+    traza = getattr(_local, "traza", None)
+    if traza is None:
+        yield
+        return
+    registro = {"nombre": nombre, "hilo": threading.get_ident(),
+                "nivel": len(_local.pila), "atributos": dict(atributos)}
+    antes = _foto()
+    inicio = time.perf_counter()
+    _local.pila.append(registro)
+    try:
+        yield
+    except BaseException as e:
+        registro["atributos"]["error"] = type(e).__name__
+        raise
+    finally:
+        fin = time.perf_counter()
+        _local.pila.pop()
+        despues = _foto()
+        registro["inicio_ms"] = (inicio - traza.origen) * 1000
+        registro["duracion_ms"] = (fin - inicio) * 1000
+        registro["contadores"] = {k: v - antes.get(k, 0) for k, v in despues.items()
+                                  if v != antes.get(k, 0)}
+        traza.agregar(registro)
+
+
+def anotar(**atributos):
+    """Agrega atributos (p. ej. muestras=n) al tramo abierto más interno."""
+    pila = getattr(_local, "pila", None)
+    if pila:
+        pila[-1]["atributos"].update(atributos)
@@ -0,0 +1,104 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog)
+from PyQt6.QtCore import Qt
+
+
+class DiagnosticoDialog(QDialog):
+    """Muestra los tramos de la última traza y permite exportarlos."""
+
+    COLUMNAS = ["Etapa", "Inicio (ms)", "Duración (ms)", "Llamadas / evaluaciones", "Detalles"]
+
+    def __init__(self, traza, parent=None):
+        super().__init__(parent)
+        self.traza = traza
+        self.setWindowTitle("Diagnóstico del análisis")
+        self.setMinimumSize(720, 380)
+
+        layout = QVBoxLayout()
+
+        title_label = QLabel(f"⏱ Diagnóstico: {traza.titulo}")
+        title_label.setObjectName("titleLabel")
+        layout.addWidget(title_label)
+
+        # Tabla de tramos (sangría según el anidamiento)
+        tramos = traza.resumen()
+        self.tabla = QTableWidget(len(tramos), len(self.COLUMNAS))
+        self.tabla.setHorizontalHeaderLabels(self.COLUMNAS)
+        self.tabla.verticalHeader().setVisible(False)
+        self.tabla.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.tabla.horizontalHeader().setStretchLastSection(True)
+        for fila, t in enumerate(tramos):
+            contadores = ", ".join(f"{k}={v}" for k, v in t["contadores"].items())
+            detalles = ", ".join(f"{k}={v}" for k, v in t["atributos"].items())
+            celdas = ["    " * t["nivel"] + t["nombre"], f"{t['inicio_ms']:.1f}",
+                      f"{t['duracion_ms']:.1f}", contadores, detalles]
+            for col, texto in enumerate(celdas):
+                item = QTableWidgetItem(texto)
+                if col in (1, 2):
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.tabla.setItem(fila, col, item)
+        layout.addWidget(self.tabla)
+
+        # Exportación
+        botones = QHBoxLayout()
+        self.json_button = QPushButton("Exportar JSON")
+        self.chrome_button = QPushButton("Exportar Chrome trace")
+        self.json_button.clicked.connect(self._exportar_json)
+        self.chrome_button.clicked.connect(self._exportar_chrome)
+        botones.addWidget(self.json_button)
+        botones.addWidget(self.chrome_button)
+        layout.addLayout(botones)
+
+        self.setLayout(layout)
+
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #1e1e2f;
+                color: #f1f2f6;
+            }
+            QLabel#titleLabel {
+                font-size: 18px;
+                font-weight: bold;
+                color: #1abc9c;
+                padding: 10px;
+            }
+            QTableWidget {
+                background-color: #1e272e;
+                color: #f1f2f6;
+                gridline-color: #2a2a40;
+                border: 1px solid #1abc9c;
+                border-radius: 8px;
+                font-family: 'Consolas', 'Courier New', monospace;
+            }
+            QHeaderView::section {
+                background-color: #2a2a40;
+                color: #1abc9c;
+                padding: 4px;
+                border: none;
+            }
+            QPushButton {
+                background-color: #00d2d3;
+                color: #2c3e50;
+                font-size: 14px;
+                font-weight: bold;
+                border: none;
+                border-radius: 6px;
+                padding: 10px;
+                margin: 10px;
+            }
+            QPushButton:hover {
+                background-color: #00a8b5;
+            }
+        """)
+
+    def _exportar_json(self):
+        ruta, _ = QFileDialog.getSaveFileName(self, "Exportar traza", "traza.json", "JSON (*.json)")
+        if ruta:
+            self.traza.exportar_json(ruta)
+
+    def _exportar_chrome(self):
+        ruta, _ = QFileDialog.getSaveFileName(self, "Exportar Chrome trace", "traza.trace.json",
+                                              "Chrome trace (*.json)")
+        if ruta:
+            self.traza.exportar_chrome(ruta)
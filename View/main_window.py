@@ -1,11 +1,8 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLineEdit, QPushButton, QLabel, QFormLayout,
-                             QFrame, QCompleter, QSizePolicy)
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
+                             QFrame, QCompleter, QSizePolicy, QProgressBar, QCheckBox)
 from PyQt6.QtGui import QIcon, QFont
-from PyQt6.QtCore import Qt, QSize
-from Model.grafico import grafico_funcion
+from PyQt6.QtCore import Qt, QSize, QTimer
 
 
 class MainWindow(QMainWindow):
@@ -62,6 +59,15 @@ class MainWindow(QMainWindow):
 
         form_layout.addRow("Evaluar en x:", self.x_value_input)
         layout.addLayout(form_layout)
+
+        # Vista previa: grafica mientras se escribe y luego analiza
+        self.live_preview_checkbox = QCheckBox("Vista previa en vivo")
+        self.live_preview_checkbox.setChecked(True)
+        layout.addWidget(self.live_preview_checkbox)
+
+        # Modo intervalos: cotas garantizadas por columna en vez de muestreo
+        self.interval_mode_checkbox = QCheckBox("Gráfico garantizado (intervalos)")
+        layout.addWidget(self.interval_mode_checkbox)
         
         # Botones principales (Analizar y Paso a Paso)
         self.analyze_button = self._make_button("Analizar Función", "system-search")
@@ -69,6 +75,17 @@ class MainWindow(QMainWindow):
         
         layout.addWidget(self.analyze_button)
         layout.addWidget(self.steptostep_button)
+
+        # Diagnóstico opcional: tiempos por etapa del último análisis
+        self.diagnostic_button = self._make_button("Diagnóstico", "utilities-system-monitor")
+        self.diagnostic_button.setEnabled(False)
+        layout.addWidget(self.diagnostic_button)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setTextVisible(True)
+        self.progress_bar.hide()
+        layout.addWidget(self.progress_bar)
         layout.addSpacing(20)
         
         # Sección de resultados
@@ -125,14 +142,41 @@ class MainWindow(QMainWindow):
         panel.setObjectName("panel")
         layout = QVBoxLayout(panel)
 
-        self.figure = Figure(figsize=(5, 3), dpi=100)
-        self.canvas = FigureCanvas(self.figure)
-        self.ax = self.figure.add_subplot(111)
-        self.ax.grid(True, linestyle='--', alpha=0.6)
-
-        layout.addWidget(self.canvas)
+        # El lienzo de matplotlib se crea después de mostrar la ventana
+        # (importar matplotlib es lo más lento del arranque)
+        self._plot_layout = layout
+        self._canvas = None
+        QTimer.singleShot(0, self._ensure_canvas)
         return panel
 
+    def _ensure_canvas(self):
+        if self._canvas is None:
+            from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+            from matplotlib.figure import Figure
+
+            self.figure = Figure(figsize=(5, 3), dpi=100)
+            self._canvas = FigureCanvas(self.figure)
+            self._ax = self.figure.add_subplot(111)
+            self._ax.grid(True, linestyle='--', alpha=0.6)
+            self._plot_layout.addWidget(self._canvas)
+        return self._canvas
+
+    @property
+    def canvas(self):
+        return self._ensure_canvas()
+
+    @property
+    def ax(self):
+        self._ensure_canvas()
+        return self._ax
+
+    def plot_columns(self):
+        # Columnas de píxeles físicos del área de datos (lo mismo que mide
+        # Model.grafico, sin importar el modelo en el hilo de la interfaz)
+        canvas = self.canvas
+        logical = canvas.get_width_height()[0] * self._ax.get_position().width
+        return max(int(logical * canvas.device_pixel_ratio), 100)
+
     def _make_button(self, text, icon_name=None):
         btn = QPushButton(text)
         if icon_name:
@@ -220,6 +264,16 @@ class MainWindow(QMainWindow):
                 border-radius: 12px;
                 background-color: {BG_COLOR};
             }}
+            QProgressBar {{
+                background-color: {BG_COLOR};
+                border: 1px solid {SECONDARY_COLOR};
+                border-radius: 6px;
+                text-align: center;
+            }}
+            QProgressBar::chunk {{
+                background-color: {SECONDARY_COLOR};
+                border-radius: 6px;
+            }}
             QLabel#errorLabel {{
                 color: {ERROR_COLOR};
                 font-weight: bold;
@@ -0,0 +1,52 @@
+# ------------------ corpus de expresiones para benchmarks ------------------
+# Cada categoría ejercita una zona distinta del pipeline: las racionales con
+# huecos pasan por la evaluación exacta de puntos aislados, las trigonométricas
+# por los conjuntos infinitos de solveset y las patológicas por los
+# presupuestos de tiempo.
+CORPUS = {
+    "polinomios": [
+        "x^2",
+        "x**3 - 2*x - 5",
+        "3x^4 - 2x^3 + x - 7",
+        "(x-1)*(x+2)*(x-3)*(x+4)",
+    ],
+    "racionales": [
+        "1/(x-3)",
+        "(x**3 - 1)/(x - 1)",
+        "(x^2 - 4)/(x - 2)",
+        "(2x^2 + 1)/(x^2 - 1)",
+        "x/(x^2 + 1)",
+    ],
+    "trigonometricas": [
+        "sin(x)",
+        "tan(x)",
+        "1/sin(x)",
+        "sin(x)/x",
+        "cos(x)^2 - sin(x)",
+    ],
+    "logaritmos": [
+        "ln(x)",
+        "log(x^2 + 1)",
+        "ln(x - 2)/(x - 5)",
+        "e^x",
+        "1/(e^x - 2)",
+    ],
+    "raices": [
+        "sqrt(x)",
+        "sqrt(4 - x^2)",
+        "sqrt(sqrt(x) + 1)",
+        "sqrt(x^2 + 1) + sqrt(x^2 + 1)^3",
+    ],
+    "patologicas": [
+        "sin(1/x)",
+        "sin(x)**7/(x**5 - tan(x))",
+        "tan(x)^3/(sin(x) - x)",
+    ],
+}
+
+
+def expresiones():
+    """Pares (categoria, expresion) en orden estable."""
+    for categoria, lista in CORPUS.items():
+        for texto in lista:
+            yield categoria, texto
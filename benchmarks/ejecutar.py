@@ -0,0 +1,217 @@
+"""
+Benchmarks por etapa del análisis sobre el corpus de benchmarks/corpus.py.
+
+    python -m benchmarks.ejecutar                   # tabla de tiempos
+    python -m benchmarks.ejecutar --guardar         # actualiza la línea base
+    python -m benchmarks.ejecutar --comparar        # sale con código 1 si hay regresiones
+
+Cada repetición parte con la caché de expresiones vacía, así que se mide el
+costo en frío de cada expresión; los costos de primer uso del proceso
+(imports perezosos de SymPy, procesos hijos del presupuesto) se pagan antes,
+en un precalentamiento sin medir. Se reporta el mínimo de las repeticiones.
+La comparación es relativa a la máquina: ver comparar().
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from Model import grafico, presupuesto
+from benchmarks.corpus import expresiones
+
+LINEA_BASE = Path(__file__).with_name("linea_base.json")
+VENTANA = (-10.0, 10.0)
+
+
+# ------------------ etapas medidas ------------------
+def _etapas(texto, ax):
+    """Genera (nombre_etapa, funcion) en el orden del pipeline. Comparten estado vía el dict."""
+    estado = {}
+
+    def parseo():
+        estado["entrada"] = grafico.obtener_compilada(texto)
+
+    def compilacion():
+        estado["entrada"].kernel
+
+    def evaluar_punto():
+        for t in np.linspace(VENTANA[0], VENTANA[1], 25):
+            grafico.evaluar_punto(estado["entrada"], float(t))
+
+    def evaluar_vector():
+        grafico.evaluar_vector(estado["entrada"].kernel, np.linspace(VENTANA[0], VENTANA[1], 20001))
+
+    def dominio():
+        estado["entrada"].dominio
+
+    def interceptos():
+        estado["entrada"].raices_en(VENTANA)
+
+    def asintotas():
+        estado["asintotas"] = grafico.obtener_asintotas_verticales(estado["entrada"], VENTANA)
+
+    def recorrido():
+        estado["entrada"].recorrido
+
+    def muestreo():
+        estado["muestra"] = grafico.muestrear_funcion(estado["entrada"], VENTANA[0], VENTANA[1],
+                                                      grafico.paso_pantalla(VENTANA, ax))
+
+    def grafico_():
+        grafico.grafico_funcion(estado["entrada"], ax=ax, ventana=VENTANA,
+                                muestra=estado["muestra"], asintotas=estado["asintotas"])
+        ax.figure.canvas.draw()
+
+    return [("parseo", parseo), ("compilacion", compilacion), ("evaluar_punto", evaluar_punto),
+            ("evaluar_vector", evaluar_vector), ("dominio", dominio), ("interceptos", interceptos),
+            ("asintotas", asintotas), ("recorrido", recorrido), ("muestreo", muestreo),
+            ("grafico", grafico_)]
+
+
+def medir(texto, ax, repeticiones):
+    """
+    Retorna: {etapa: {"ms": mínimo, "evaluaciones": ..., "puntos": ...}} o
+             {"error": mensaje} si alguna etapa falla.
+    """
+    mejores = {}
+    for _ in range(repeticiones):
+        grafico.limpiar_cache()
+        for nombre, funcion in _etapas(texto, ax):
+            grafico.reiniciar_contadores()
+            inicio = time.perf_counter()
+            try:
+                funcion()
+            except Exception as e:
+                return {"error": f"{nombre}: {e}"}
+            ms = (time.perf_counter() - inicio) * 1000
+            c = grafico.CONTADORES
+            previo = mejores.get(nombre)
+            if previo is None or ms < previo["ms"]:
+                mejores[nombre] = {"ms": round(ms, 3),
+                                   "evaluaciones": c["evaluar_punto"] + c["evaluar_vector"],
+                                   "puntos": c["puntos_evaluados"] + c["evaluar_punto"]}
+    return mejores
+
+
+def precalentar(textos, ax):
+    """Recorre todas las etapas una vez con cada texto, sin guardar los tiempos."""
+    for texto in textos:
+        medir(texto, ax, 1)
+
+
+# ------------------ reporte y comparación ------------------
+def _tabla(resultados):
+    etapas = [nombre for nombre, _ in _etapas("x", None)]
+    ancho = max(len(t) for t in resultados) + 2
+    lineas = ["expresion".ljust(ancho) + "".join(e[:12].rjust(13) for e in etapas)]
+    for texto, medidas in resultados.items():
+        if "error" in medidas:
+            lineas.append(texto.ljust(ancho) + "  ERROR " + medidas["error"])
+            continue
+        lineas.append(texto.ljust(ancho) + "".join(f"{medidas[e]['ms']:13.2f}" for e in etapas))
+    total = {e: sum(m[e]["ms"] for m in resultados.values() if "error" not in m) for e in etapas}
+    lineas.append("TOTAL (ms)".ljust(ancho) + "".join(f"{total[e]:13.2f}" for e in etapas))
+    return "\n".join(lineas)
+
+
+def comparar(resultados, base, tolerancia, minimo_ms):
+    """
+    Regresiones respecto de la línea base, que puede venir de otra máquina:
+    cada tiempo base se escala por la razón mediana actual/base de todas las
+    etapas (las de menos de minimo_ms, puro ruido, no entran en la mediana) y
+    solo cuenta como regresión lo que se aleja de esa escala. Los conteos de
+    evaluaciones y puntos no dependen de la máquina: cualquier aumento es una
+    regresión.
+    Retorna: (lista de (texto, etapa, medida, esperado, actual), escala)
+    """
+    pares, conteos = [], []
+    for texto, medidas in resultados.items():
+        previas = base.get("resultados", {}).get(texto)
+        if not previas or "error" in medidas or "error" in previas:
+            continue
+        for etapa, m in medidas.items():
+            previa = previas.get(etapa, {})
+            if previa.get("ms") is not None:
+                pares.append((texto, etapa, previa["ms"], m["ms"]))
+            for medida in ("evaluaciones", "puntos"):
+                if previa.get(medida) is not None and m.get(medida) is not None:
+                    conteos.append((texto, etapa, medida, previa[medida], m[medida]))
+    razones = [actual / anterior for _, _, anterior, actual in pares if anterior >= minimo_ms]
+    escala = float(np.median(razones)) if razones else 1.0
+
+    regresiones = []
+    for texto, etapa, anterior, actual in pares:
+        esperado = anterior * escala
+        if actual > esperado * (1 + tolerancia) and actual - esperado > minimo_ms:
+            regresiones.append((texto, etapa, "ms", esperado, actual))
+    regresiones.extend(c for c in conteos if c[4] > c[3])
+    return regresiones, escala
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks por etapa del análisis de funciones.")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--filtro", default=None, help="solo categorías que contengan este texto")
+    parser.add_argument("--guardar", action="store_true", help="escribe la línea base")
+    parser.add_argument("--comparar", action="store_true", help="compara contra la línea base")
+    parser.add_argument("--tolerancia", type=float, default=1.0, help="aumento relativo permitido (1.0 = +100%%)")
+    parser.add_argument("--minimo-ms", type=float, default=5.0, help="ignora diferencias menores a esto")
+    parser.add_argument("--sin-subprocesos", action="store_true",
+                        help="ejecuta las etapas simbólicas en el mismo proceso (sin presupuesto)")
+    parser.add_argument("--json", default=None, help="escribe los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    if args.sin_subprocesos:
+        presupuesto.configurar(en_subproceso=False)
+
+    fig, ax = plt.subplots(figsize=(7, 4), dpi=100)
+    seleccion = [(c, t) for c, t in expresiones() if not args.filtro or args.filtro in c]
+    # Una expresión por categoría alcanza para recorrer todos los caminos de primer uso
+    primeras = {}
+    for categoria, texto in seleccion:
+        primeras.setdefault(categoria, texto)
+    precalentar(primeras.values(), ax)
+    resultados = {}
+    for categoria, texto in seleccion:
+        resultados[texto] = medir(texto, ax, args.repeticiones)
+        print(f"[{categoria}] {texto}", file=sys.stderr)
+    plt.close(fig)
+
+    print(_tabla(resultados))
+    datos = {"python": sys.version.split()[0], "numpy": np.__version__,
+             "sympy": __import__("sympy").__version__, "resultados": resultados}
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(datos, indent=2, ensure_ascii=False), encoding="utf-8")
+    if args.guardar:
+        LINEA_BASE.write_text(json.dumps(datos, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Línea base guardada en {LINEA_BASE}", file=sys.stderr)
+    if args.comparar:
+        if not LINEA_BASE.exists():
+            print("No hay línea base; ejecute con --guardar.", file=sys.stderr)
+            return 2
+        regresiones, escala = comparar(resultados, json.loads(LINEA_BASE.read_text(encoding="utf-8")),
+                                       args.tolerancia, args.minimo_ms)
+        print(f"Escala respecto de la línea base: ×{escala:.2f}", file=sys.stderr)
+        for texto, etapa, medida, esperado, ahora in regresiones:
+            if medida == "ms":
+                print(f"REGRESIÓN {texto} [{etapa}]: {esperado:.2f} ms esperados -> {ahora:.2f} ms",
+                      file=sys.stderr)
+            else:
+                print(f"REGRESIÓN {texto} [{etapa}]: {esperado} {medida} en la línea base -> {ahora}",
+                      file=sys.stderr)
+        return 1 if regresiones else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
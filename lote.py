@@ -0,0 +1,221 @@
+"""
+Análisis por lotes sin interfaz gráfica.
+
+Lee una expresión por línea (archivo o stdin), analiza cada una en un pool
+de procesos y escribe los resultados a medida que terminan, en el mismo
+orden de entrada.
+
+Ejemplos:
+    python lote.py funciones.txt --formato jsonl > resultados.jsonl
+    cat funciones.txt | python lote.py - --formato csv --salida resultados.csv
+    python lote.py funciones.txt --formato npz --salida muestras.npz
+"""
+import argparse
+import csv
+import json
+import multiprocessing as mp
+import os
+import signal
+import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import numpy as np
+
+CAMPOS = ["expresion", "ok", "error", "dominio", "y_intercepto", "x_interceptos",
+          "asintotas", "recorrido", "aproximados", "segundos"]
+
+
+# ------------------ trabajo de cada proceso ------------------
+def _inicializar(memoria_mb, con_cache=True):
+    from Model import almacen, presupuesto
+    # El pool ya aísla cada expresión: no se anidan procesos hijos por etapa
+    presupuesto.configurar(en_subproceso=False)
+    presupuesto.limitar_memoria(memoria_mb)
+    almacen.configurar(activo=con_cache)
+
+
+class TiempoAgotado(BaseException):
+    """
+    Límite por expresión. Hereda de BaseException para que los
+    `except Exception` del modelo no lo conviertan en una aproximación.
+    """
+
+
+def _tiempo_agotado(signum, frame):
+    raise TiempoAgotado("Tiempo agotado.")
+
+
+def _analizar_una(texto, ventana, paso, tiempo, con_muestras):
+    from Model import analisis
+
+    registro = {"expresion": texto, "ok": False, "error": None}
+    inicio = time.perf_counter()
+    # setitimer no existe en Windows: ahí solo rige el presupuesto de memoria
+    alarma = hasattr(signal, "setitimer")
+    if alarma:
+        signal.signal(signal.SIGALRM, _tiempo_agotado)
+        signal.setitimer(signal.ITIMER_REAL, tiempo)
+    try:
+        resultado = analisis.analizar(texto, ventana=ventana, paso=paso)
+        registro.update({
+            "ok": True,
+            "dominio": str(resultado["dominio"]),
+            "y_intercepto": resultado["y_intercepto"],
+            "x_interceptos": resultado["x_interceptos"],
+            "asintotas": list(resultado["asintotas"]),
+            "recorrido": str(resultado["recorrido"]),
+            "aproximados": resultado["aproximados"],
+        })
+        if con_muestras:
+            xs, ys = resultado["muestra"]
+            registro["muestra"] = (xs, ys)
+    except (TiempoAgotado, MemoryError) as e:
+        registro["error"] = f"{type(e).__name__}: {e}"
+    except Exception as e:
+        registro["error"] = str(e)
+    finally:
+        if alarma:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    registro["segundos"] = round(time.perf_counter() - inicio, 4)
+    return registro
+
+
+# ------------------ escritores (streaming) ------------------
+class _EscritorJSONL:
+    def __init__(self, salida):
+        self.salida = salida
+
+    def escribir(self, registro):
+        if "muestra" in registro:
+            xs, ys = registro.pop("muestra")
+            registro["muestra"] = {"x": xs.tolist(), "y": [None if np.isnan(v) else v for v in ys.tolist()]}
+        self.salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self.salida.flush()
+
+    def cerrar(self):
+        pass
+
+
+class _EscritorCSV:
+    def __init__(self, salida):
+        self.salida = salida
+        self.csv = csv.DictWriter(salida, fieldnames=CAMPOS, extrasaction="ignore")
+        self.csv.writeheader()
+
+    def escribir(self, registro):
+        fila = dict(registro)
+        for campo in ("x_interceptos", "asintotas", "aproximados"):
+            if fila.get(campo) is not None:
+                fila[campo] = ";".join(str(v) for v in fila[campo])
+        self.csv.writerow(fila)
+        self.salida.flush()
+
+    def cerrar(self):
+        pass
+
+
+class _EscritorNPZ:
+    """
+    Escribe un .npz incremental: por cada expresión i guarda f{i}_x, f{i}_y
+    y f{i}_meta (JSON con el resto del registro). Se carga con np.load.
+    """
+
+    def __init__(self, ruta):
+        self.zip = zipfile.ZipFile(ruta, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+        self.i = 0
+
+    def _guardar(self, nombre, arreglo):
+        with self.zip.open(nombre + ".npy", "w", force_zip64=True) as f:
+            np.lib.format.write_array(f, np.asanyarray(arreglo), allow_pickle=False)
+
+    def escribir(self, registro):
+        xs, ys = registro.pop("muestra", (np.array([]), np.array([])))
+        self._guardar(f"f{self.i}_x", xs)
+        self._guardar(f"f{self.i}_y", ys)
+        self._guardar(f"f{self.i}_meta", np.array(json.dumps(registro, ensure_ascii=False)))
+        self.i += 1
+
+    def cerrar(self):
+        self.zip.close()
+
+
+# ------------------ orquestación ------------------
+def _leer_expresiones(origen):
+    for linea in origen:
+        linea = linea.strip()
+        if linea and not linea.startswith("#"):
+            yield linea
+
+
+def procesar(expresiones, escritor, procesos, ventana, paso, tiempo, memoria_mb,
+             con_muestras=False, tareas_por_proceso=200, con_cache=True):
+    """
+    Analiza las expresiones en un pool y entrega cada registro al escritor en
+    orden. Como máximo hay 2 * procesos tareas en vuelo, así la memoria no
+    crece con el tamaño de la entrada. Con con_cache=False no se lee ni se
+    escribe la caché persistente de análisis.
+    """
+    metodo = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+    total = 0
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=mp.get_context(metodo),
+                             initializer=_inicializar, initargs=(memoria_mb, con_cache),
+                             max_tasks_per_child=tareas_por_proceso) as pool:
+        pendientes = deque()
+        for texto in expresiones:
+            pendientes.append(pool.submit(_analizar_una, texto, ventana, paso, tiempo, con_muestras))
+            if len(pendientes) >= 2 * procesos:
+                escritor.escribir(pendientes.popleft().result())
+                total += 1
+        while pendientes:
+            escritor.escribir(pendientes.popleft().result())
+            total += 1
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análisis por lotes de funciones (sin interfaz gráfica).")
+    parser.add_argument("entrada", nargs="?", default="-", help="archivo con una expresión por línea ('-' = stdin)")
+    parser.add_argument("--formato", choices=["jsonl", "csv", "npz"], default="jsonl")
+    parser.add_argument("--salida", default="-", help="archivo de salida ('-' = stdout; npz requiere archivo)")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--tiempo", type=float, default=30.0, help="segundos máximos por expresión")
+    parser.add_argument("--memoria", type=int, default=1024, help="MB adicionales por proceso")
+    parser.add_argument("--ventana", type=float, nargs=2, default=(-10.0, 10.0), metavar=("A", "B"))
+    parser.add_argument("--paso", type=float, default=None,
+                        help="espaciado de la muestra (por omisión, el de un gráfico de 800 píxeles de ancho)")
+    parser.add_argument("--muestras", action="store_true", help="incluir las muestras (x, y) en jsonl")
+    parser.add_argument("--sin-cache", action="store_true", help="no usar la caché persistente de análisis")
+    args = parser.parse_args(argv)
+
+    if args.formato == "npz" and args.salida == "-":
+        parser.error("el formato npz requiere --salida")
+
+    origen = sys.stdin if args.entrada == "-" else open(args.entrada, encoding="utf-8")
+    if args.formato == "npz":
+        escritor = _EscritorNPZ(args.salida)
+        salida = None
+    else:
+        salida = sys.stdout if args.salida == "-" else open(args.salida, "w", encoding="utf-8", newline="")
+        escritor = _EscritorJSONL(salida) if args.formato == "jsonl" else _EscritorCSV(salida)
+
+    try:
+        total = procesar(_leer_expresiones(origen), escritor, max(1, args.procesos),
+                         tuple(args.ventana), args.paso, args.tiempo, args.memoria,
+                         con_muestras=args.muestras or args.formato == "npz",
+                         con_cache=not args.sin_cache)
+    finally:
+        escritor.cerrar()
+        if origen is not sys.stdin:
+            origen.close()
+        if salida not in (None, sys.stdout):
+            salida.close()
+    print(f"{total} expresiones analizadas.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,5 +7,7 @@ if __name__ == '__main__':
     app = QApplication(sys.argv)
     window = MainWindow()
     controller = Controller(view=window)
+    app.aboutToQuit.connect(controller.shutdown)
     window.show()
+    controller.warm_up()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,21 @@
+"""Configuración común de las pruebas del modelo."""
+import pytest
+
+from Model import grafico, presupuesto
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _sin_subprocesos():
+    """Las etapas simbólicas corren en el mismo proceso, sin presupuesto."""
+    presupuesto.configurar(en_subproceso=False)
+    yield
+    presupuesto.configurar(en_subproceso=True)
+
+
+@pytest.fixture
+def compilada():
+    """compilada(texto) -> ExpresionCompilada construida con la caché vacía."""
+    def construir(texto):
+        grafico.limpiar_cache()
+        return grafico.obtener_compilada(texto)
+    return construir
@@ -0,0 +1,45 @@
+"""Forma canónica (Model.canonico) y entradas compartidas de la caché."""
+import warnings
+
+import pytest
+import sympy as sp
+from sympy.core.sympify import SympifyError
+
+from Model import canonico, grafico
+
+
+@pytest.fixture(autouse=True)
+def _cache_vacia():
+    grafico.limpiar_cache()
+
+
+def test_escrituras_equivalentes_comparten_entrada():
+    entradas = [grafico.obtener_compilada(t) for t in ("2x", "x*2", "x+x", "2*x")]
+    assert all(e is entradas[0] for e in entradas)
+    assert grafico.estadisticas_cache()["tamano"] == 1
+    assert len({canonico.huella(e.expr) for e in entradas}) == 1
+
+
+@pytest.mark.parametrize("a, b", [
+    ("x/2", "0.5x"),           # 1/2 exacto no es el flotante 0.5
+    ("x/x", "1"),              # x/x no se cancela: x = 0 queda fuera del dominio
+    ("log(x)-log(x)", "0"),
+])
+def test_formas_distintas(a, b):
+    ea, eb = grafico.obtener_compilada(a), grafico.obtener_compilada(b)
+    assert ea is not eb
+    assert canonico.huella(ea.expr) != canonico.huella(eb.expr)
+
+
+@pytest.mark.parametrize("texto", ["foo(", "foo()", "x>1"])
+def test_rechaza_lo_que_no_es_expresion(texto):
+    # Error de sintaxis normal, sin avisos de SymPy ni un Mul con una tupla dentro
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        with pytest.raises(SympifyError):
+            grafico.obtener_compilada(texto)
+
+
+def test_canonizar_rechaza_relaciones():
+    with pytest.raises(SympifyError):
+        canonico.canonizar(sp.Symbol("x") > 1)
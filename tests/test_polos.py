@@ -0,0 +1,37 @@
+"""Asíntotas verticales (Model.numerico.polos) y corte de la curva en cada polo."""
+import numpy as np
+import pytest
+
+from Model import grafico, numerico
+
+
+VENTANA = numerico.VENTANA_APROXIMACION
+
+CASOS = [
+    ("tan(x)", [k * np.pi / 2 for k in (-5, -3, -1, 1, 3, 5)]),
+    ("1/sin(x)", [k * np.pi for k in range(-3, 4)]),
+    ("1/(e^x-2)", [np.log(2)]),
+    ("1/(x-3)", [3.0]),
+]
+
+
+@pytest.mark.parametrize("texto, esperado", CASOS)
+def test_polos(texto, esperado, compilada):
+    np.testing.assert_allclose(compilada(texto).polos_en(VENTANA), esperado, atol=1e-8)
+
+
+@pytest.mark.parametrize("texto", ["(x^2-1)/(x-1)", "sin(x)/x", "x^2", "exp(x)"])
+def test_sin_polos(texto, compilada):
+    assert compilada(texto).polos_en(VENTANA).size == 0
+
+
+@pytest.mark.parametrize("texto, esperado", CASOS)
+def test_la_curva_no_une_los_lados_de_un_polo(texto, esperado, compilada):
+    entrada = compilada(texto)
+    asintotas = grafico.obtener_asintotas_verticales(entrada, VENTANA)
+    xs, ys = grafico.muestrear_funcion(entrada, *VENTANA)
+    datos_x, datos_y = grafico._datos_curva(xs, ys, asintotas)
+    unido = np.isfinite(datos_y[:-1]) & np.isfinite(datos_y[1:])
+    for polo in esperado:
+        cruza = (datos_x[:-1] < polo) & (datos_x[1:] > polo)
+        assert not np.any(cruza & unido), f"un segmento cruza x = {polo}"
@@ -0,0 +1,74 @@
+"""Raíces numéricas (Model.numerico.raices) dentro de la ventana (-10, 10)."""
+import numpy as np
+import pytest
+
+from Model import numerico
+
+
+VENTANA = numerico.VENTANA_APROXIMACION
+
+
+# Una meseta nula se reporta por sus extremos, no muestra por muestra
+@pytest.mark.parametrize("texto, esperado", [
+    ("abs(x)-x", [0.0, 10.0]),
+    ("(x+abs(x))/2", [-10.0, 0.0]),
+    ("x-x", [-10.0, 10.0]),
+])
+def test_mesetas_nulas(texto, esperado, compilada):
+    np.testing.assert_allclose(compilada(texto).raices_en(VENTANA), esperado, atol=1e-9)
+
+
+# Muestras que se redondean a 0.0 sin que f se anule no son raíces
+@pytest.mark.parametrize("texto, esperado", [
+    ("exp(-x^4)", []),
+    ("1/(1+exp(x^3))", []),
+    ("x*exp(-x^6)", [0.0]),
+    ("x^(10^10)", [0.0]),
+])
+def test_desbordamiento_inferior(texto, esperado, compilada):
+    np.testing.assert_allclose(compilada(texto).raices_en(VENTANA), esperado, atol=1e-9)
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("x^2-2", [-2 ** 0.5, 2 ** 0.5]),
+    ("x*(x-5)*(x+10)", [-10.0, 0.0, 5.0]),        # ceros exactos de la malla, uno en el borde
+    ("x^3", [0.0]),
+    ("1/x", []),                                  # el cambio de signo es un polo
+])
+def test_ceros_exactos_y_cambios_de_signo(texto, esperado, compilada):
+    np.testing.assert_allclose(compilada(texto).raices_en(VENTANA), esperado, atol=1e-9)
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("x^2", [0.0]),
+    ("(x-1)^2", [1.0]),
+    ("(x-2)^2*(x+3)", [-3.0, 2.0]),
+])
+def test_raices_dobles(texto, esperado, compilada):
+    np.testing.assert_allclose(compilada(texto).raices_en(VENTANA), esperado, atol=1e-6)
+
+
+@pytest.mark.parametrize("texto, esperado", [("x-10", [10.0]), ("x+10", [-10.0])])
+def test_raices_en_el_borde_de_la_ventana(texto, esperado, compilada):
+    np.testing.assert_allclose(compilada(texto).raices_en(VENTANA), esperado, atol=1e-9)
+
+
+@pytest.mark.parametrize("texto, posicion, limite", [
+    ("(x^2-1)/(x-1)", 1.0, 2.0),
+    ("(x^2-4)/(x-2)", 2.0, 4.0),
+    ("sin(x)/x", 0.0, 1.0),
+])
+def test_huecos_evitables(texto, posicion, limite, compilada):
+    posiciones, limites = compilada(texto).huecos_en(VENTANA)
+    np.testing.assert_allclose(posiciones, [posicion], atol=1e-9)
+    np.testing.assert_allclose(limites, [limite], atol=1e-6)
+
+
+@pytest.mark.parametrize("texto, ventana", [
+    ("1/x", (-10, 10)),            # polo, no hueco
+    ("x^2", (-10, 10)),
+    ("(x^2-9)/(x-3)", (0, 3)),     # en el borde de la ventana no cuenta
+])
+def test_sin_huecos(texto, ventana, compilada):
+    posiciones, limites = compilada(texto).huecos_en(ventana)
+    assert posiciones.size == 0 and limites.size == 0
@@ -0,0 +1,57 @@
+"""Recorrido numérico (Model.numerico.recorrido_aproximado) de casos conocidos."""
+import pytest
+from sympy import Interval, Union, oo
+
+
+# Los extremos numéricos son Float: los esperados se escriben con decimales
+@pytest.mark.parametrize("texto", ["x", "-x", "2x+1", "x^3", "x^3+x", "x+sin(x)", "tan(x)"])
+def test_impares_y_lineales_cubren_r(texto, compilada):
+    assert compilada(texto).recorrido == Interval(-oo, oo)
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("(x^2-1)/(x-1)", Union(Interval.open(-oo, 2.0), Interval.open(2.0, oo))),
+    ("(x^2-4)/(x-2)", Union(Interval.open(-oo, 4.0), Interval.open(4.0, oo))),
+    ("x^3/x", Interval.open(0.0, oo)),
+    # El límite en el hueco se alcanza en otro punto: no se quita
+    ("x^2*(x-1)/(x-1)", Interval(0.0, oo)),
+    ("(x^3-1)/(x-1)", Interval(0.75, oo)),
+])
+def test_huecos_evitables(texto, esperado, compilada):
+    assert compilada(texto).recorrido == esperado
+
+
+@pytest.mark.parametrize("texto", ["1/sin(x)", "1/cos(x)", "sec(x)"])
+def test_reciprocas_trigonometricas(texto, compilada):
+    assert compilada(texto).recorrido == Union(Interval(-oo, -1.0), Interval(1.0, oo))
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("x^2", Interval(0.0, oo)),
+    ("sin(x)", Interval(-1.0, 1.0)),
+    ("exp(-x^2)", Interval.Lopen(0.0, 1.0)),
+    ("1/x", Union(Interval.open(-oo, 0.0), Interval.open(0.0, oo))),
+    ("x+1/x", Union(Interval(-oo, -2.0), Interval(2.0, oo))),
+])
+def test_casos_conocidos(texto, esperado, compilada):
+    assert compilada(texto).recorrido == esperado
+
+
+# Valores que f mantiene en una meseta se alcanzan: el intervalo es cerrado ahí
+@pytest.mark.parametrize("texto, esperado", [
+    ("abs(x)-x", Interval(0.0, oo)),
+    ("(x+abs(x))/2", Interval(0.0, oo)),
+    ("sqrt(x^2)-x", Interval(0.0, oo)),
+    ("x^(10^10)", Interval(0.0, oo)),
+])
+def test_mesetas(texto, esperado, compilada):
+    assert compilada(texto).recorrido == esperado
+
+
+# Mesetas que solo existen por redondeo (0.0 por desbordamiento inferior, 1.0 por 1 + 1e-55) no se alcanzan
+@pytest.mark.parametrize("texto, esperado", [
+    ("exp(-x^4)", Interval.Lopen(0.0, 1.0)),
+    ("1/(1+exp(x^3))", Interval.open(0.0, 1.0)),
+])
+def test_mesetas_por_redondeo(texto, esperado, compilada):
+    assert compilada(texto).recorrido == esperado
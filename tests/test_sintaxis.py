@@ -0,0 +1,30 @@
+"""Parser de la calculadora (Model.sintaxis) contra parse_expr."""
+import pytest
+
+from Model import canonico, grafico, sintaxis
+
+
+@pytest.mark.parametrize("texto", [
+    # multiplicación implícita
+    "2x", "2 x", "pi x", "2x^2+3x-1", "(x+1)(x-1)", "(x)(x)", "2(x+1)", "x(x+1)", "2sin(x)",
+    "1/2x", ".5x", "3.5e-2x", "E^2x",
+    # potencias: ^ y ** asocian a la derecha
+    "x^2^3", "x**2", "x^-2", "2^-x", "e^x",
+    # signo unario
+    "-x^2", "-2^x", "--x",
+    # funciones (√ y sqrt sin paréntesis los agrega la normalización)
+    "sqrt x", "√x", "sqrt(x+1)", "ln(x)", "log(x)/x", "sin(x)^2+cos(x)^2",
+])
+def test_coincide_con_parse_expr(texto):
+    normalizado = grafico._normalizar_texto(texto)
+    propio = canonico.canonizar(sintaxis.parsear(normalizado))
+    respaldo = canonico.canonizar(grafico._parsear_respaldo(normalizado))
+    assert propio == respaldo
+
+
+@pytest.mark.parametrize("texto", [
+    "abs(x)", "factorial(x)", "y", "sin", "sin x", "sqrt x", "2e", "x<1", "x!", "x,1", "x+", "(x",
+])
+def test_fuera_de_gramatica(texto):
+    with pytest.raises(sintaxis.FueraDeGramatica):
+        sintaxis.parsear(texto)